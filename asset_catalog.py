@@ -0,0 +1,193 @@
+# asset_catalog.py
+import os
+import time
+import sqlite3
+from collections import namedtuple
+
+import run_report
+from asset_scanner import IMAGE_EXTENSIONS, scan_categories, web_path
+from build_cache import hash_file
+from image_probe import image_size
+
+# Local database of every organized asset (rebuildable from assets/ with a rescan)
+CATALOG_PATH = '.asset-catalog.sqlite3'
+
+SCHEMA_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS assets (
+    path TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    hashed_path TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS assets_by_category ON assets (category, name);
+CREATE INDEX IF NOT EXISTS assets_by_hash ON assets (sha256);
+CREATE TABLE IF NOT EXISTS derivatives (
+    path TEXT NOT NULL REFERENCES assets (path) ON DELETE CASCADE,
+    width INTEGER NOT NULL,
+    format TEXT NOT NULL,
+    output TEXT NOT NULL,
+    PRIMARY KEY (path, width, format)
+) WITHOUT ROWID;
+'''
+
+# One catalog row; name and path line up with os.DirEntry
+AssetRecord = namedtuple('AssetRecord', 'path category name size mtime sha256 width height hashed_path')
+
+_COLUMNS = ', '.join(AssetRecord._fields)
+
+class Catalog:
+    """SQLite catalog of the organized assets
+
+    Holds path, size, mtime, content hash, category, pixel dimensions,
+    published (hashed) path and thumbnail derivatives per file. Writers keep
+    it current with refresh() for the paths they touched, or sync() to
+    reconcile whole categories with the disk; readers get rows per category
+    in name order straight from an index. Every write method commits.
+    """
+
+    def __init__(self, path=CATALOG_PATH):
+        # Set by open_catalog when it filled the catalog from the disk
+        self.synced = False
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA foreign_keys = ON')
+        if path != ':memory:':
+            self.db.execute('PRAGMA journal_mode = WAL')
+            self.db.execute('PRAGMA synchronous = NORMAL')
+
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            # Everything in here can be rebuilt from the files themselves
+            self.db.executescript('DROP TABLE IF EXISTS derivatives; DROP TABLE IF EXISTS assets;')
+        self.db.executescript(SCHEMA)
+        self.db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def is_empty(self):
+        return self.db.execute('SELECT 1 FROM assets LIMIT 1').fetchone() is None
+
+    def get(self, path):
+        row = self.db.execute(f'SELECT {_COLUMNS} FROM assets WHERE path = ?', (path,)).fetchone()
+        return AssetRecord._make(row) if row else None
+
+    def entries(self, category):
+        """Rows of one category, sorted by file name"""
+        cursor = self.db.execute(f'SELECT {_COLUMNS} FROM assets WHERE category = ? ORDER BY name', (category,))
+        return [AssetRecord._make(row) for row in cursor]
+
+    def _record(self, path, category, st, previous):
+        """Row for a file, or None if the previous one is still current
+
+        The hash is only recomputed when size or mtime moved, and the
+        dimensions, published path and derivatives only when the hash did.
+        """
+        if previous and previous.size == st.st_size and previous.mtime == st.st_mtime_ns:
+            return None
+        started = time.perf_counter()
+        sha256 = hash_file(path)
+        if previous and previous.sha256 == sha256:
+            width, height, hashed = previous.width, previous.height, previous.hashed_path
+        else:
+            width, height = image_size(path) or (None, None)
+            hashed = None
+        run_report.file_time(path, time.perf_counter() - started, 'hash')
+        run_report.count('files_hashed')
+        run_report.count('bytes_hashed', st.st_size)
+        return AssetRecord(path, category, os.path.basename(path), st.st_size, st.st_mtime_ns,
+                           sha256, width, height, hashed)
+
+    def _write(self, records, removed):
+        stale = [(r.path,) for r in records if (self.get(r.path) or r).sha256 != r.sha256]
+        self.db.executemany('DELETE FROM derivatives WHERE path = ?', stale)
+        self.db.executemany(
+            f'INSERT INTO assets ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (path) DO UPDATE SET category = excluded.category, name = excluded.name, '
+            'size = excluded.size, mtime = excluded.mtime, sha256 = excluded.sha256, '
+            'width = excluded.width, height = excluded.height, hashed_path = excluded.hashed_path',
+            records)
+        self.db.executemany('DELETE FROM assets WHERE path = ?', [(path,) for path in removed])
+        self.db.commit()
+
+    def refresh(self, paths):
+        """Bring the rows of some asset paths (assets/<category>/<file>) up to date
+
+        Files that are gone are dropped. Returns (updated, removed) counts.
+        """
+        records = []
+        removed = []
+        for path in run_report.track(paths, len(paths), 'catalog'):
+            path = path.replace('\\', '/')
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                removed.append(path)
+                continue
+            category = os.path.basename(os.path.dirname(path))
+            record = self._record(path, category, st, self.get(path))
+            if record:
+                records.append(record)
+        self._write(records, removed)
+        return len(records), len(removed)
+
+    def sync(self, categories, root='assets', extensions=IMAGE_EXTENSIONS):
+        """Reconcile whole categories with the disk (one scandir per folder)
+
+        Returns (updated, removed) counts.
+        """
+        scanned = scan_categories(categories, root, extensions)
+        previous = {}
+        for category in categories:
+            previous.update((record.path, record) for record in self.entries(category))
+
+        records = []
+        total = sum(len(scanned.get(category, ())) for category in categories)
+        found = ((category, entry) for category in categories for entry in scanned.get(category, ()))
+        for category, entry in run_report.track(found, total, 'catalog'):
+            path = web_path(entry)
+            record = self._record(path, category, entry.stat(), previous.pop(path, None))
+            if record:
+                records.append(record)
+        removed = list(previous)
+        self._write(records, removed)
+        return len(records), len(removed)
+
+    def set_hashed_paths(self, mapping):
+        """Record published copies (path -> hashed path)"""
+        self.db.executemany('UPDATE assets SET hashed_path = ? WHERE path = ?',
+                            [(hashed, path) for path, hashed in mapping.items()])
+        self.db.commit()
+
+    def set_derivatives(self, derivatives):
+        """Record thumbnails (path -> [(width, format, output)]) for catalogued paths"""
+        known = {path for path, in self.db.execute('SELECT path FROM assets')}
+        for path, items in derivatives.items():
+            if path not in known:
+                continue
+            self.db.execute('DELETE FROM derivatives WHERE path = ?', (path,))
+            self.db.executemany('INSERT INTO derivatives (path, width, format, output) VALUES (?, ?, ?, ?)',
+                                [(path, width, fmt, output) for width, fmt, output in items])
+        self.db.commit()
+
+def open_catalog(categories, path=CATALOG_PATH, rescan=False):
+    """Open the catalog, filling it from the disk when new (or when asked to)"""
+    catalog = Catalog(path)
+    if rescan or catalog.is_empty():
+        with run_report.phase('catalog'):
+            updated, removed = catalog.sync(categories)
+        catalog.synced = True
+        print(f"  🗂️  Catalog synced from disk: {updated} updated, {removed} removed")
+    return catalog
@@ -0,0 +1,32 @@
+# asset_categories.py
+
+# The one category table shared by the organizers, the manifest and the gallery
+CATEGORIES = {
+    'characters': {
+        'keywords': ['thanos', 'proxima', 'ebony', 'corvus', 'black-dwarf'],
+        'title': 'Characters',
+        'description': 'Thanos and members of the Black Order'
+    },
+    'stones': {
+        'keywords': ['power', 'time', 'mind', 'reality', 'space', 'soul'],
+        'title': 'Infinity Stones',
+        'description': 'The six Infinity Stones in different resolutions'
+    },
+    'enemies': {
+        'keywords': ['outriders'],
+        'title': 'Enemies',
+        'description': 'Thanos\' alien forces'
+    },
+    'misc': {
+        'keywords': [],
+        'title': 'Miscellaneous',
+        'description': 'Images that matched no other category'
+    }
+}
+
+# No keywords point here: organize_marvel.py files unmatched images under
+# it, while organizer.py leaves them in the root for a human to look at
+MISC_CATEGORY = 'misc'
+
+# Categories that always exist, even while empty
+CORE_CATEGORIES = [category for category in CATEGORIES if category != MISC_CATEGORY]
@@ -0,0 +1,122 @@
+# asset_classifier.py
+import os
+import re
+from bisect import bisect_right
+
+def _trie_pattern(keywords):
+    """Build a regex that matches any keyword, with shared prefixes merged"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node):
+        is_end = '' in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        pattern = '(?:' + '|'.join(branches) + ')'
+        # Greedy optional, so the longest keyword at a position wins
+        return pattern + '?' if is_end else pattern
+
+    return build(trie)
+
+class KeywordClassifier:
+    """Maps filenames to categories using the keywords in a CATEGORIES dict
+
+    All keywords are compiled once into a single prefix-merged regex, so the
+    cost of classifying a name depends on its length rather than on the
+    number of keywords. Matching is case-insensitive. When several keywords
+    match, the category listed first in CATEGORIES wins, exactly as the old
+    nested loops behaved.
+    """
+
+    def __init__(self, categories, default=None):
+        self.default = default
+        self.categories = list(categories)
+
+        priority = {}
+        for rank, data in enumerate(categories.values()):
+            for keyword in data.get('keywords', ()):
+                keyword = keyword.lower()
+                if keyword and keyword not in priority:
+                    priority[keyword] = rank
+
+        # The regex reports the longest keyword starting at each position;
+        # any shorter keyword at that position is one of its prefixes.
+        self._rank = {}
+        for keyword, rank in priority.items():
+            for i in range(1, len(keyword)):
+                rank = min(rank, priority.get(keyword[:i], rank))
+            self._rank[keyword] = rank
+
+        if priority:
+            # Zero-width lookahead so overlapping keywords are all seen
+            self._pattern = re.compile('(?=(' + _trie_pattern(priority) + '))')
+        else:
+            self._pattern = None
+
+    def classify(self, name):
+        """Return the category for a filename, or the default"""
+        if self._pattern is None:
+            return self.default
+
+        best = None
+        for match in self._pattern.finditer(name.lower()):
+            rank = self._rank[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if best == 0:
+                    break
+
+        return self.default if best is None else self.categories[best]
+
+    def classify_many(self, names):
+        """Classify a batch of filenames in one regex pass
+
+        Returns a list of categories in the same order as names.
+        """
+        names = list(names)
+        result = [self.default] * len(names)
+        if self._pattern is None or not names:
+            return result
+
+        # Keywords never contain newlines, so no match can span two names
+        lowered = [name.lower() for name in names]
+        starts = []
+        offset = 0
+        for name in lowered:
+            starts.append(offset)
+            offset += len(name) + 1
+        text = '\n'.join(lowered)
+
+        best = [None] * len(names)
+        for match in self._pattern.finditer(text):
+            index = bisect_right(starts, match.start()) - 1
+            rank = self._rank[match.group(1)]
+            if best[index] is None or rank < best[index]:
+                best[index] = rank
+
+        for index, rank in enumerate(best):
+            if rank is not None:
+                result[index] = self.categories[rank]
+        return result
+
+    def classify_entries(self, batches):
+        """Classify batches of scanned entries (anything with .name and .path) as they arrive
+
+        Each batch is classified in one pass as soon as it is produced, so a
+        streaming scan and the classifier overlap. Returns (entries,
+        categories) in a fixed order whatever the batch order: shallower
+        paths first (so files in the root win name and duplicate ties as
+        they always did), then by path.
+        """
+        pairs = []
+        for batch in batches:
+            pairs.extend(zip(batch, self.classify_many([entry.name for entry in batch])))
+        pairs.sort(key=lambda pair: (pair[0].path.count(os.sep), pair[0].path))
+        return [entry for entry, _ in pairs], [category for _, category in pairs]
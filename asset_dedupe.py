@@ -0,0 +1,86 @@
+# asset_dedupe.py
+import os
+
+from asset_scanner import scan_images, IMAGE_EXTENSIONS
+from build_cache import hash_file
+
+# keep-both: move duplicates in under a new name (the old behaviour)
+# skip:      leave duplicates where they are
+# hardlink:  give the duplicate its new name as a hard link to the existing copy
+DEDUPE_POLICIES = ('keep-both', 'skip', 'hardlink')
+DEFAULT_DEDUPE_POLICY = 'keep-both'
+
+class DuplicateFinder:
+    """Finds files whose bytes already exist in a destination folder
+
+    Files are only hashed when another file in the same folder has exactly
+    the same size, and each file is hashed at most once per run. Files that
+    are planned to move in but have not moved yet are tracked by their
+    logical destination and read from their current location.
+    """
+
+    def __init__(self, extensions=IMAGE_EXTENSIONS):
+        self.extensions = extensions
+        self._sizes = {}
+        self._hashes = {}
+
+    def _by_size(self, directory):
+        """size -> [(logical path, content path)] for a folder, scanned once"""
+        sizes = self._sizes.get(directory)
+        if sizes is None:
+            sizes = {}
+            for entry in scan_images(directory, self.extensions):
+                path = f'{directory}/{entry.name}'
+                sizes.setdefault(entry.stat().st_size, []).append((path, path))
+            self._sizes[directory] = sizes
+        return sizes
+
+    def _hash(self, path):
+        digest = self._hashes.get(path)
+        if digest is None:
+            digest = hash_file(path)
+            self._hashes[path] = digest
+        return digest
+
+    def find(self, directory, source, size):
+        """Return the logical path of an identical file in directory, or None"""
+        candidates = self._by_size(directory).get(size)
+        if not candidates:
+            return None
+
+        digest = self._hash(source)
+        for logical, content in candidates:
+            if self._hash(content) == digest:
+                return logical
+        return None
+
+    def add(self, directory, destination, source, size):
+        """Record a file that is planned to move into directory"""
+        self._by_size(directory).setdefault(size, []).append((destination, source))
+
+def link_duplicates(links):
+    """Replace planned duplicates with hard links to the file they duplicate
+
+    links is a list of (source, destination, target). Each destination is
+    created as a hard link to target and the source is then removed.
+    Returns (linked count, [(source, destination, error)]).
+    """
+    linked = 0
+    failed = []
+    for source, destination, target in links:
+        try:
+            os.link(target, destination)
+            os.remove(source)
+            linked += 1
+        except OSError as e:
+            failed.append((source, destination, e))
+    return linked, failed
+
+def print_dedupe_report(policy, duplicates, bytes_saved, failed=(), indent='  '):
+    """Print one summary line for the duplicates found during a run"""
+    if not duplicates:
+        return
+    action = 'hard-linked' if policy == 'hardlink' else 'skipped (left in place)'
+    print(f"{indent}♻️  {duplicates} duplicate(s) {action}, {bytes_saved / (1024 * 1024):.1f} MB saved")
+    for source, destination, error in failed:
+        print(f"{indent}❌ {source} → {destination}: {error}")
@@ -0,0 +1,72 @@
+# asset_naming.py
+import os
+
+def split_density(name):
+    """Split 'power-stone@3x' into ('power-stone', '3x'), or (name, None)"""
+    if '@' not in name:
+        return name, None
+    parts = name.split('@')
+    return parts[0], parts[1]
+
+def asset_key(filename):
+    """Loader key for a file: ebony-maw.png -> ebonyMaw, power-stone@3x.png -> powerStone"""
+    base, _ = split_density(os.path.splitext(filename)[0])
+    words = [w for w in base.replace('_', '-').split('-') if w]
+    if not words:
+        return base
+    return words[0].lower() + ''.join(w[:1].upper() + w[1:].lower() for w in words[1:])
+
+class NameIndex:
+    """Hands out collision-free destination names without probing the disk
+
+    Each destination directory is listed once, the first time it is used.
+    After that every name handed out is recorded in memory, and a counter
+    per (directory, stem, extension) remembers where the next free suffix
+    is, so N files with the same name cost O(N) in total instead of O(N²)
+    os.path.exists calls.
+
+    Two suffix schemes are supported, matching the organizer scripts:
+      plain:   thanos.png        -> thanos_1.png
+      density: power-stone@3x.png -> power-stone@3x_1.png (base@suffix_N)
+    """
+
+    def __init__(self):
+        self._taken = {}
+        self._counters = {}
+
+    def _names_in(self, directory):
+        """Set of (normalised) names already present in a directory"""
+        taken = self._taken.get(directory)
+        if taken is None:
+            taken = set()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        taken.add(os.path.normcase(entry.name))
+            except FileNotFoundError:
+                pass
+            self._taken[directory] = taken
+        return taken
+
+    def claim(self, directory, filename, density=False):
+        """Reserve a free name in directory and return the destination path"""
+        taken = self._names_in(directory)
+
+        if os.path.normcase(filename) not in taken:
+            taken.add(os.path.normcase(filename))
+            return f'{directory}/{filename}'
+
+        name, ext = os.path.splitext(filename)
+        base, suffix = split_density(name) if density else (name, None)
+        stem = f'{base}@{suffix}' if suffix is not None else name
+
+        key = (directory, stem, ext)
+        counter = self._counters.get(key, 1)
+        candidate = f'{stem}_{counter}{ext}'
+        while os.path.normcase(candidate) in taken:
+            counter += 1
+            candidate = f'{stem}_{counter}{ext}'
+
+        self._counters[key] = counter + 1
+        taken.add(os.path.normcase(candidate))
+        return f'{directory}/{candidate}'
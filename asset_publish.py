@@ -0,0 +1,82 @@
+# asset_publish.py
+import os
+import shutil
+
+# Content-hashed copies live in their own tree so the scanners never see them
+PUBLISH_DIR = 'assets/hashed'
+
+# Hex digits of the content hash put into published names
+FINGERPRINT_LENGTH = 6
+
+def fingerprint_name(filename, sha256, length=FINGERPRINT_LENGTH):
+    """power-stone@3x.png -> power-stone@3x.3f9a1c.png"""
+    stem, ext = os.path.splitext(filename)
+    return f'{stem}.{sha256[:length]}{ext}'
+
+def hashed_path(path, sha256, publish_dir=PUBLISH_DIR):
+    """Published location of a logical path like assets/stones/x.png"""
+    folder, filename = os.path.split(path)
+    category = os.path.basename(folder)
+    return f'{publish_dir}/{category}/{fingerprint_name(filename, sha256)}'
+
+def _place(source, destination, mode):
+    """Hard-link (falling back to a copy) or copy source to destination"""
+    part_path = f'{destination}.{os.getpid()}.part'
+    if mode == 'link':
+        try:
+            os.link(source, part_path)
+            os.replace(part_path, destination)
+            return
+        except OSError:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    shutil.copy2(source, part_path)
+    os.replace(part_path, destination)
+
+def publish_assets(records, mode='link', publish_dir=PUBLISH_DIR):
+    """Write content-hashed copies of catalogued assets
+
+    records is category -> list of catalog rows (with path and sha256).
+    Each file gets an immutable name with its content hash in it under
+    publish_dir/<category>/, as a hard link where possible so no extra
+    bytes are stored. Files already published are skipped. Older hashed
+    names are kept so pages from previous deploys keep working.
+    Returns a dict of logical path -> hashed path.
+    """
+    mapping = {}
+    created = 0
+    for category, rows in records.items():
+        if not rows:
+            continue
+        folder = f'{publish_dir}/{category}'
+        os.makedirs(folder, exist_ok=True)
+        existing = set(os.listdir(folder))
+
+        for record in rows:
+            destination = hashed_path(record.path, record.sha256, publish_dir)
+            if os.path.basename(destination) not in existing:
+                _place(record.path, destination, mode)
+                created += 1
+            mapping[record.path] = destination
+
+    print(f"  🔖 Published {len(mapping)} fingerprinted asset(s) to {publish_dir}/ ({created} new)")
+    return mapping
+
+def published_paths(files, publish_dir=PUBLISH_DIR):
+    """Map logical paths to hashed paths for files that have been published
+
+    files is path -> record with a 'sha256'. Each publish folder is listed
+    once, so this costs one listdir per category, not one stat per file.
+    """
+    listings = {}
+    mapping = {}
+    for path, record in files.items():
+        destination = hashed_path(path, record['sha256'], publish_dir)
+        folder, name = destination.rsplit('/', 1)
+        names = listings.get(folder)
+        if names is None:
+            names = set(os.listdir(folder)) if os.path.isdir(folder) else set()
+            listings[folder] = names
+        if name in names:
+            mapping[path] = destination
+    return mapping
@@ -0,0 +1,104 @@
+# asset_relocator.py
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Concurrent moves in flight; raise for high-latency network storage
+DEFAULT_WORKERS = 8
+
+# Same-filesystem renames are grouped so each task does many os.replace calls
+RENAME_BATCH_SIZE = 256
+
+def _device(directory, devices):
+    """st_dev of a directory, looked up once per directory"""
+    device = devices.get(directory)
+    if device is None:
+        device = os.stat(directory).st_dev
+        devices[directory] = device
+    return device
+
+def _rename_batch(moves):
+    """Rename a batch of files on the same filesystem"""
+    failed = []
+    for source, destination in moves:
+        try:
+            os.replace(source, destination)
+        except OSError as e:
+            failed.append((source, destination, e))
+    return failed
+
+def _copy_move(source, destination):
+    """Move a file across filesystems; returns the number of bytes copied"""
+    folder, name = os.path.split(destination)
+    part_path = os.path.join(folder, f'.{name}.part')
+    try:
+        shutil.copy2(source, part_path)
+        os.replace(part_path, destination)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    size = os.path.getsize(destination)
+    os.remove(source)
+    return size
+
+def relocate(plan, workers=DEFAULT_WORKERS):
+    """Carry out a full move plan of (source, destination) pairs
+
+    Moves within one filesystem are done as batched os.replace calls;
+    moves across filesystems are copied on a bounded thread pool. Nothing
+    is printed per file: the returned dict holds the aggregated counts,
+    bytes copied, elapsed time and any (source, destination, error)
+    failures.
+    """
+    start = time.perf_counter()
+    result = {'renamed': 0, 'copied': 0, 'bytes_copied': 0, 'failed': [], 'seconds': 0.0}
+
+    devices = {}
+    renames = []
+    copies = []
+    for source, destination in plan:
+        try:
+            same_device = _device(os.path.dirname(source) or '.', devices) == \
+                _device(os.path.dirname(destination) or '.', devices)
+        except OSError as e:
+            result['failed'].append((source, destination, e))
+            continue
+        (renames if same_device else copies).append((source, destination))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        rename_jobs = [pool.submit(_rename_batch, renames[i:i + RENAME_BATCH_SIZE])
+                       for i in range(0, len(renames), RENAME_BATCH_SIZE)]
+        copy_jobs = [(source, destination, pool.submit(_copy_move, source, destination))
+                     for source, destination in copies]
+
+        result['renamed'] = len(renames)
+        for job in rename_jobs:
+            failed = job.result()
+            result['renamed'] -= len(failed)
+            result['failed'].extend(failed)
+
+        for source, destination, job in copy_jobs:
+            try:
+                result['bytes_copied'] += job.result()
+                result['copied'] += 1
+            except OSError as e:
+                result['failed'].append((source, destination, e))
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def failed_sources(result):
+    """Set of source paths that could not be moved"""
+    return {source for source, _, _ in result['failed']}
+
+def print_relocation_report(result, indent='  '):
+    """Print one summary line for a relocation run, plus any failures"""
+    moved = result['renamed'] + result['copied']
+    line = f"{indent}🚚 Moved {moved} file(s) in {result['seconds']:.2f}s"
+    if result['copied']:
+        line += f" ({result['copied']} copied across devices, {result['bytes_copied'] / (1024 * 1024):.1f} MB)"
+    print(line)
+    for source, destination, error in result['failed']:
+        print(f"{indent}❌ {source} → {destination}: {error}")
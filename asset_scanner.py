@@ -0,0 +1,134 @@
+# asset_scanner.py
+import os
+import re
+import queue
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+
+# Extensions recognised as images (matched case-insensitively)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif')
+
+# Concurrent scandir calls of a recursive walk; listing a folder is mostly
+# waiting on the filesystem (especially on network mounts), not CPU
+WALK_WORKERS = 16
+
+# Folders a recursive walk never enters, wherever they are (plus hidden ones)
+SKIPPED_DIRS = frozenset({'node_modules', 'venv', '__pycache__'})
+
+def extension_set(extensions=IMAGE_EXTENSIONS):
+    """Build the lower-cased lookup set used to match file extensions"""
+    return frozenset(ext.lower() for ext in extensions)
+
+def is_image_name(name, extensions=IMAGE_EXTENSIONS):
+    """Check a filename against the image extensions"""
+    if not isinstance(extensions, frozenset):
+        extensions = extension_set(extensions)
+    return os.path.splitext(name)[1].lower() in extensions
+
+def scan_images(directory='.', extensions=IMAGE_EXTENSIONS):
+    """List the image files in a directory with a single scandir pass
+
+    Returns os.DirEntry objects sorted by name. Each entry caches its own
+    stat result, so callers can read entry.stat().st_size without another
+    syscall per file.
+    """
+    wanted = extension_set(extensions)
+    entries = []
+
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if os.path.splitext(entry.name)[1].lower() not in wanted:
+                    continue
+                if entry.is_file():
+                    entries.append(entry)
+    except FileNotFoundError:
+        return []
+
+    entries.sort(key=lambda e: e.name)
+    return entries
+
+def scan_categories(categories, root='assets', extensions=IMAGE_EXTENSIONS):
+    """Scan every category folder under root once
+
+    Returns a dict of category -> list of DirEntry. Categories whose folder
+    does not exist are left out.
+    """
+    result = {}
+    for category in categories:
+        folder = os.path.join(root, category)
+        if not os.path.isdir(folder):
+            continue
+        result[category] = scan_images(folder, extensions)
+    return result
+
+def web_path(entry):
+    """Forward-slash path of an entry, suitable for HTML and JSON"""
+    return entry.path.replace('\\', '/')
+
+def glob_matcher(patterns):
+    """Compile shell-style globs into one match function (None for no patterns)
+
+    Patterns are matched against forward-slash paths relative to the walk
+    root, and '*' also matches '/', so 'drop/*' covers everything below drop/.
+    """
+    if not patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(pattern) for pattern in patterns)).match
+
+def walk_images(root='.', extensions=IMAGE_EXTENSIONS, include=(), exclude=(), skip=(), workers=WALK_WORKERS):
+    """Yield the image files below root in batches, one batch per folder
+
+    Folders are listed with scandir on a thread pool: every subfolder found
+    is submitted right away, and each folder's images are yielded as soon
+    as its listing completes, so callers can start on the first batches
+    while the rest of the tree is still being walked. Batch order follows
+    completion order, not the tree.
+
+    include and exclude are globs (see glob_matcher); a file is kept when it
+    matches an include pattern (or there are none) and no exclude pattern.
+    Folders matching an exclude pattern, hidden folders, SKIPPED_DIRS and
+    the relative paths in skip are not entered. Symlinked folders are not
+    followed. Entries are os.DirEntry objects with cached stats.
+    """
+    wanted = extension_set(extensions)
+    included = glob_matcher(include)
+    excluded = glob_matcher(exclude)
+    skip = frozenset(skip)
+
+    def list_folder(path, relative):
+        files = []
+        folders = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    child = f'{relative}/{entry.name}' if relative else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name.startswith('.') or entry.name in SKIPPED_DIRS or child in skip:
+                            continue
+                        if excluded and (excluded(child) or excluded(child + '/')):
+                            continue
+                        folders.append((entry.path, child))
+                    elif os.path.splitext(entry.name)[1].lower() in wanted and entry.is_file():
+                        if included and not included(child):
+                            continue
+                        if excluded and excluded(child):
+                            continue
+                        files.append(entry)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            pass
+        return files, folders
+
+    # Finished listings arrive on a queue in completion order
+    finished = queue.SimpleQueue()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pool.submit(list_folder, root, '').add_done_callback(finished.put)
+        outstanding = 1
+        while outstanding:
+            files, folders = finished.get().result()
+            outstanding -= 1
+            for path, relative in folders:
+                pool.submit(list_folder, path, relative).add_done_callback(finished.put)
+            outstanding += len(folders)
+            if files:
+                yield files
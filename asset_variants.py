@@ -0,0 +1,78 @@
+# asset_variants.py
+import os
+import re
+from collections import namedtuple
+
+from asset_naming import split_density
+
+# Pixel densities every group of resolution variants should have
+REQUIRED_DENSITIES = (1, 2, 3)
+
+_DENSITY_SUFFIX = re.compile(r'(\d+(?:\.\d+)?)x')
+
+# base is the name without density suffix; variants are (density, item)
+# pairs, lowest density first, with density None for a file that has no
+# variants at all
+VariantGroup = namedtuple('VariantGroup', 'base variants')
+
+def parse_density(filename):
+    """'power-stone@3x.png' -> ('power-stone', 3.0); names without a density -> (stem, None)"""
+    stem = os.path.splitext(filename)[0]
+    base, suffix = split_density(stem)
+    match = _DENSITY_SUFFIX.fullmatch(suffix) if suffix else None
+    if not match:
+        return stem, None
+    return base, float(match.group(1))
+
+def density_label(density):
+    """3.0 -> '3x', 1.5 -> '1.5x'"""
+    return f'{density:g}x'
+
+def group_variants(items, path=lambda item: item.path):
+    """Group files (anything with a path) that are resolution variants of one image
+
+    Variants share folder, base name and extension: power-stone@1x.png and
+    power-stone@3x.png form one group. A plain power-stone.png next to them
+    counts as its 1x variant, as on iOS. Groups keep the order in which
+    their first file appears.
+    """
+    groups = {}
+    for item in items:
+        folder, filename = os.path.split(path(item))
+        base, density = parse_density(filename)
+        key = (folder, base, os.path.splitext(filename)[1].lower())
+        groups.setdefault(key, []).append((density, item))
+
+    result = []
+    for (_, base, _), variants in groups.items():
+        densities = {density for density, _ in variants}
+        if len(variants) > 1 and None in densities:
+            plain = [item for density, item in variants if density is None]
+            variants = [pair for pair in variants if pair[0] is not None]
+            if 1.0 in densities:
+                # Both name.png and name@1x.png: the plain file stays on its own
+                result.extend(VariantGroup(base, [(None, item)]) for item in plain)
+            else:
+                variants.append((1.0, plain[0]))
+                result.extend(VariantGroup(base, [(None, item)]) for item in plain[1:])
+        variants.sort(key=lambda pair: pair[0] or 0.0)
+        result.append(VariantGroup(base, variants))
+    return result
+
+def highest_densities(items, path=lambda item: item.path):
+    """The highest-density file of each group, the source for anything derived"""
+    return [group.variants[-1][1] for group in group_variants(items, path)]
+
+def is_variant_group(group):
+    return group.variants[0][0] is not None
+
+def missing_densities(group, required=REQUIRED_DENSITIES):
+    """Labels of the required densities a variant group has no file for"""
+    if not is_variant_group(group):
+        return []
+    present = {density for density, _ in group.variants}
+    return [density_label(density) for density in required if density not in present]
+
+def density_srcset(group, url, prefix=''):
+    """srcset value with x descriptors ('a@1x.png 1x, a@3x.png 3x')"""
+    return ', '.join(f'{prefix}{url(item)} {density_label(density)}' for density, item in group.variants)
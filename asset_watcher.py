@@ -0,0 +1,161 @@
+# asset_watcher.py
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from asset_scanner import IMAGE_EXTENSIONS, scan_images, extension_set, is_image_name
+
+# Quiet time after the last event before a burst is handed over
+DEBOUNCE_SECONDS = 0.75
+
+# A steady stream of events is still flushed this often
+MAX_BATCH_DELAY = 5.0
+
+# How often the polling fallback lists the directory
+POLL_INTERVAL = 1.0
+
+# inotify flags (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+def _load_inotify():
+    """libc with the inotify calls, or None where they do not exist"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+class InotifyWatcher:
+    """Reports files finished writing into (or moved into) one directory"""
+
+    def __init__(self, directory):
+        libc = _load_inotify()
+        if libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"cannot watch {directory}")
+
+    def wait(self, timeout):
+        """Names of files that changed, waiting up to timeout seconds for the first"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        names = set()
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip(b'\0')
+            pos += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback that lists the directory and reports new or changed files
+
+    A file is only reported once its size and mtime held still for one
+    poll, so half-copied files are not picked up.
+    """
+
+    def __init__(self, directory, extensions=IMAGE_EXTENSIONS, interval=POLL_INTERVAL):
+        self.directory = directory
+        self.extensions = extensions
+        self.interval = interval
+        self.seen = self._snapshot()
+        self.pending = {}
+
+    def _snapshot(self):
+        snapshot = {}
+        for entry in scan_images(self.directory, self.extensions):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            snapshot[entry.name] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = self._snapshot()
+        names = set()
+        pending = {}
+        for name, state in current.items():
+            if self.seen.get(name) == state:
+                continue
+            if self.pending.get(name) == state:
+                names.add(name)
+            else:
+                pending[name] = state
+        # Reported files count as seen; unsettled ones are looked at again
+        self.seen = {name: state for name, state in current.items() if name not in pending}
+        self.pending = pending
+        return names
+
+    def close(self):
+        pass
+
+def open_watcher(directory='.', extensions=IMAGE_EXTENSIONS, poll_interval=POLL_INTERVAL):
+    """inotify watcher for directory, or the polling fallback where it is unavailable"""
+    try:
+        return InotifyWatcher(directory)
+    except OSError:
+        return PollingWatcher(directory, extensions, poll_interval)
+
+def watch_batches(directory='.', extensions=IMAGE_EXTENSIONS, debounce=DEBOUNCE_SECONDS, max_delay=MAX_BATCH_DELAY,
+                  poll_interval=POLL_INTERVAL):
+    """Yield sorted lists of image names dropped into directory, one per burst
+
+    Events are collected until none arrived for debounce seconds (or
+    max_delay passed since the first one), so copying a folder of images
+    gives one batch instead of one per file. Names that are no longer
+    there when the burst ends are left out. Runs until interrupted.
+    """
+    wanted = extension_set(extensions)
+    watcher = open_watcher(directory, extensions, poll_interval)
+    backend = 'inotify' if isinstance(watcher, InotifyWatcher) else f'polling every {poll_interval:g}s'
+    print(f"\n👀 Watching {os.path.abspath(directory)} for new images ({backend}) - Ctrl+C to stop")
+    try:
+        while True:
+            names = watcher.wait(3600)
+            if not names:
+                continue
+            started = time.monotonic()
+            while True:
+                remaining = max_delay - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                more = watcher.wait(min(debounce, remaining))
+                if not more:
+                    break
+                names |= more
+
+            batch = sorted(name for name in names
+                           if is_image_name(name, wanted) and os.path.isfile(os.path.join(directory, name)))
+            if batch:
+                yield batch
+    finally:
+        watcher.close()
@@ -0,0 +1,231 @@
+# atlas_builder.py
+import io
+import os
+import json
+import argparse
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it only the layout can be computed
+    Image = None
+
+from asset_scanner import scan_categories, web_path, IMAGE_EXTENSIONS
+from asset_naming import asset_key
+from image_probe import image_size
+from build_cache import load_cache, write_if_changed
+from boot_tiers import BOOT_PLAN_PATH
+
+ATLAS_DIR = 'assets/atlas'
+
+# The categories AssetLoader fetches at boot
+BOOT_CATEGORIES = ('characters', 'stones', 'enemies')
+
+# Tiers of assets/boot.json left out of the atlas: AssetLoader fetches them
+# (and index.html preloads them) one by one before it requests the atlas
+SKIP_TIERS = ('critical',)
+
+# Largest atlas edge; 4096 is safe for canvas and WebGL on current devices
+DEFAULT_MAX_SIZE = 4096
+
+# Transparent gap around each sprite so neighbours never bleed when scaled
+DEFAULT_PADDING = 2
+
+def _split_free(free, x, y, w, h):
+    """Cut a placed rectangle out of the free list (MaxRects split)"""
+    result = []
+    for fx, fy, fw, fh in free:
+        if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+            result.append((fx, fy, fw, fh))
+            continue
+        if x > fx:
+            result.append((fx, fy, x - fx, fh))
+        if x + w < fx + fw:
+            result.append((x + w, fy, fx + fw - x - w, fh))
+        if y > fy:
+            result.append((fx, fy, fw, y - fy))
+        if y + h < fy + fh:
+            result.append((fx, y + h, fw, fy + fh - y - h))
+
+    # Drop free rectangles contained in another one
+    pruned = []
+    for i, a in enumerate(result):
+        contained = False
+        for j, b in enumerate(result):
+            if i != j and b[0] <= a[0] and b[1] <= a[1] and \
+                    a[0] + a[2] <= b[0] + b[2] and a[1] + a[3] <= b[1] + b[3] and (a != b or i > j):
+                contained = True
+                break
+        if not contained:
+            pruned.append(a)
+    return pruned
+
+def maxrects_pack(sizes, width, height):
+    """Pack (key, w, h) rectangles into a width x height bin
+
+    Uses MaxRects with the best-short-side-fit heuristic, largest sprites
+    first. Returns (placements, leftovers): key -> (x, y) for the sprites
+    that fit, and the (key, w, h) items that did not.
+    """
+    free = [(0, 0, width, height)]
+    placements = {}
+    leftovers = []
+
+    for key, w, h in sorted(sizes, key=lambda s: (max(s[1], s[2]), s[1] * s[2]), reverse=True):
+        best = None
+        for fx, fy, fw, fh in free:
+            if w <= fw and h <= fh:
+                score = (min(fw - w, fh - h), max(fw - w, fh - h))
+                if best is None or score < best[0]:
+                    best = (score, fx, fy)
+        if best is None:
+            leftovers.append((key, w, h))
+            continue
+        _, x, y = best
+        placements[key] = (x, y)
+        free = _split_free(free, x, y, w, h)
+
+    return placements, leftovers
+
+def _next_pow2(n):
+    size = 1
+    while size < n:
+        size *= 2
+    return size
+
+def plan_atlases(sprites, max_size=DEFAULT_MAX_SIZE, padding=DEFAULT_PADDING):
+    """Lay sprites out over as few atlases as possible
+
+    sprites is a list of (key, w, h). Each atlas starts at the smallest
+    power-of-two square that could hold the remaining sprites and grows
+    until they fit or max_size is reached; whatever is left goes to the
+    next atlas. Returns a list of (width, height, {key: (x, y, w, h)}).
+    """
+    remaining = [(key, w + 2 * padding, h + 2 * padding) for key, w, h in sprites]
+    too_big = [key for key, w, h in remaining if w > max_size or h > max_size]
+    if too_big:
+        raise ValueError(f"sprite(s) larger than {max_size}px: {', '.join(too_big)}")
+
+    atlases = []
+    while remaining:
+        area = sum(w * h for _, w, h in remaining)
+        longest = max(max(w, h) for _, w, h in remaining)
+        side = min(max_size, _next_pow2(max(longest, int(area ** 0.5))))
+
+        while True:
+            placements, leftovers = maxrects_pack(remaining, side, side)
+            if not leftovers or side >= max_size:
+                break
+            side *= 2
+            side = min(side, max_size)
+
+        frames = {}
+        used_w = used_h = 0
+        for key, w, h in remaining:
+            if key in placements:
+                x, y = placements[key]
+                frames[key] = (x + padding, y + padding, w - 2 * padding, h - 2 * padding)
+                used_w, used_h = max(used_w, x + w), max(used_h, y + h)
+        atlases.append((used_w, used_h, frames))
+        remaining = leftovers
+
+    return atlases
+
+def tier_paths(tiers, plan_path=BOOT_PLAN_PATH):
+    """Paths (every resolution variant) the boot plan puts in some tiers; empty without a plan"""
+    plan = load_cache(plan_path)
+    return {variant['path'] for tier in tiers for asset in plan.get('tiers', {}).get(tier, {}).get('assets', ())
+            for variant in asset.get('variants') or [asset]}
+
+def build_atlas(categories=BOOT_CATEGORIES, name='boot', max_size=DEFAULT_MAX_SIZE,
+                padding=DEFAULT_PADDING, output_dir=ATLAS_DIR, skip_tiers=SKIP_TIERS):
+    """Pack the organized assets of some categories into atlas images
+
+    Writes <output_dir>/<name>-N.png and <output_dir>/<name>.json with a
+    frame (image, x, y, w, h) per loader key, e.g. "ebonyMaw". Assets the
+    boot plan puts in skip_tiers are left out. Returns the frame data, or
+    None when there was nothing to pack.
+    """
+    print(f"🧩 Building atlas '{name}' from: {', '.join(categories)}")
+
+    scanned = scan_categories(categories, 'assets', IMAGE_EXTENSIONS)
+    skip = tier_paths(skip_tiers)
+    if skip:
+        print(f"  ⏭️  Leaving out {len(skip)} file(s) of the {', '.join(skip_tiers)} tier(s) in {BOOT_PLAN_PATH}")
+    sprites = []
+    sources = {}
+    for category, entries in scanned.items():
+        for entry in entries:
+            if web_path(entry) in skip:
+                continue
+            key = asset_key(entry.name)
+            if key in sources:
+                print(f"  ⚠️  {entry.name:25} → skipped (key '{key}' already used)")
+                continue
+            dimensions = image_size(entry.path)
+            if not dimensions:
+                print(f"  ⚠️  {entry.name:25} → skipped (unreadable header)")
+                continue
+            sources[key] = (web_path(entry), category)
+            sprites.append((key, dimensions[0], dimensions[1]))
+
+    if not sprites:
+        print("  No images to pack")
+        return None
+
+    atlases = plan_atlases(sprites, max_size, padding)
+    images = [f'{output_dir}/{name}-{i}.png' for i in range(len(atlases))]
+
+    data = {
+        'meta': {'images': images, 'padding': padding, 'sizes': [[w, h] for w, h, _ in atlases]},
+        'frames': {}
+    }
+    for index, (_, _, frames) in enumerate(atlases):
+        for key, (x, y, w, h) in sorted(frames.items()):
+            path, category = sources[key]
+            data['frames'][key] = {'image': index, 'x': x, 'y': y, 'w': w, 'h': h,
+                                   'category': category, 'source': path}
+
+    if Image is None:
+        print("  ❌ Pillow is not installed - cannot write atlas images (pip install Pillow)")
+        return None
+
+    os.makedirs(output_dir, exist_ok=True)
+    for index, (width, height, frames) in enumerate(atlases):
+        sheet = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        for key, (x, y, _, _) in frames.items():
+            with Image.open(sources[key][0]) as sprite:
+                sheet.paste(sprite.convert('RGBA'), (x, y))
+        # Encoded in memory so an unchanged sheet keeps its file, mtime and ETag
+        buffer = io.BytesIO()
+        sheet.save(buffer, 'PNG')
+        written = write_if_changed(images[index], buffer.getvalue())
+        state = "" if written else ", unchanged"
+        print(f"  ✅ {images[index]} ({width}x{height}, {len(frames)} sprites{state})")
+
+    write_if_changed(f'{output_dir}/{name}.json', json.dumps(data, indent=2))
+    print(f"  ✅ Frames: {output_dir}/{name}.json ({len(data['frames'])} keys)")
+    return data
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack organized assets into texture atlases")
+    parser.add_argument('--categories', nargs='+', default=list(BOOT_CATEGORIES),
+                        help="asset categories to pack (default: %(default)s)")
+    parser.add_argument('--name', default='boot', help="atlas name (default: %(default)s)")
+    parser.add_argument('--max-size', type=int, default=DEFAULT_MAX_SIZE,
+                        help="largest atlas edge in pixels (default: %(default)s)")
+    parser.add_argument('--padding', type=int, default=DEFAULT_PADDING,
+                        help="transparent pixels around each sprite (default: %(default)s)")
+    parser.add_argument('--skip-tiers', nargs='*', default=list(SKIP_TIERS),
+                        help=f"boot tiers from {BOOT_PLAN_PATH} to leave out, none to pack everything "
+                             f"(default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists('assets'):
+        print("❌ Error: 'assets' folder not found!")
+        print("👉 Please run organizer.py first to organize your images")
+        return
+
+    build_atlas(args.categories, args.name, args.max_size, args.padding, skip_tiers=args.skip_tiers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+# benchmark.py
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import shutil
+import struct
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import importlib.util
+
+from run_report import proc_syscalls
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BASELINE_PATH = 'benchmark-baseline.json'
+
+DEFAULT_SIZES = ('1k', '10k')
+
+# A stage regresses when a metric grows by more than this over the baseline
+DEFAULT_THRESHOLD = 0.25
+
+# Timings this small are noise; they never count as regressions
+MIN_SECONDS = 0.05
+
+# Share of the corpus that already sits in assets/, so drops collide with it
+SEEDED_SHARE = 0.1
+
+# Stages in run order: (name, corpus it needs). "fresh" regenerates the drop
+# folder first; "organized" runs on whatever the previous stages left behind.
+STAGES = (
+    ('organize_images', 'fresh'),
+    ('create_asset_manifest', 'organized'),
+    ('create_asset_manifest (warm)', 'organized'),
+    ('generate_html_gallery', 'organized'),
+    ('generate_html_gallery (warm)', 'organized'),
+    ('organize_assets', 'fresh'),
+)
+
+# Metrics compared against the baseline
+COMPARED = ('wall', 'cpu', 'peak_rss_kb', 'syscalls')
+
+KEYWORDS = ['thanos', 'proxima-midnight', 'ebony-maw', 'corvus-glaive', 'black-dwarf',
+            'power-stone', 'time-stone', 'mind-stone', 'reality-stone', 'space-stone', 'soul-stone',
+            'outriders']
+UNMATCHED = ['concept', 'sketch', 'logo', 'background', 'card-back']
+EXTENSIONS = ['.png', '.png', '.png', '.PNG', '.Png', '.jpg', '.JPG', '.jpeg', '.webp', '.gif']
+
+def parse_size(text):
+    """'10k' -> 10000, '1M' -> 1000000"""
+    match = re.fullmatch(r'(\d+)([kKmM]?)', text.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"bad corpus size: {text}")
+    return int(match.group(1)) * {'': 1, 'k': 1000, 'm': 1000000}[match.group(2).lower()]
+
+def _chunk(kind, payload):
+    return struct.pack('>I', len(payload)) + kind + payload + struct.pack('>I', zlib.crc32(kind + payload))
+
+def fake_png(width, height, rng):
+    """A small PNG with a real header and a random (undecodable) body"""
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    body = zlib.compress(rng.randbytes(rng.randrange(64, 512)), 1)
+    return b'\x89PNG\r\n\x1a\n' + _chunk(b'IHDR', ihdr) + _chunk(b'IDAT', body) + _chunk(b'IEND', b'')
+
+def fake_jpeg(width, height, rng):
+    """JFIF APP0 and SOF0 segments with the given size, then random bytes"""
+    app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
+    sof0 = b'\xff\xc0' + struct.pack('>HBHHB', 17, 8, height, width, 3) + b'\x01\x22\x00\x02\x11\x01\x03\x11\x01'
+    return b'\xff\xd8' + app0 + sof0 + rng.randbytes(rng.randrange(64, 512)) + b'\xff\xd9'
+
+def fake_image(ext, width, height, rng):
+    ext = ext.lower()
+    if ext in ('.jpg', '.jpeg'):
+        return fake_jpeg(width, height, rng)
+    if ext == '.gif':
+        return b'GIF89a' + struct.pack('<HH', width, height) + rng.randbytes(rng.randrange(64, 512))
+    if ext == '.webp':
+        body = b'VP8X' + struct.pack('<I', 10) + b'\x00' * 4 + \
+            (width - 1).to_bytes(3, 'little') + (height - 1).to_bytes(3, 'little')
+        body += rng.randbytes(rng.randrange(64, 512))
+        return b'RIFF' + struct.pack('<I', len(body) + 4) + b'WEBP' + body
+    return fake_png(width, height, rng)
+
+def corpus_names(count, rng):
+    """File names like an artist's drop folder
+
+    Mostly keyword matches with variants, some unmatched names, density
+    suffixes, mixed-case extensions, and names that repeat up to case.
+    """
+    names = set()
+    result = []
+    while len(result) < count:
+        i = len(result)
+        if rng.random() < 0.1:
+            stem = f'{rng.choice(UNMATCHED)}-{i}'
+        else:
+            stem = f'{rng.choice(KEYWORDS)}-{rng.choice(["alt", "v2", "final", "hd", "card"])}-{i % (count // 4 + 1)}'
+        if rng.random() < 0.2:
+            stem += rng.choice(['@1x', '@2x', '@3x'])
+        if rng.random() < 0.05:
+            stem = stem.title()
+        name = stem + rng.choice(EXTENSIONS)
+        if name in names:
+            continue
+        names.add(name)
+        result.append(name)
+    return result
+
+def make_corpus(directory, count, seed=0):
+    """Fill directory with count dropped images plus a seeded assets/ tree
+
+    About SEEDED_SHARE as many files again go straight into
+    assets/<category>/ under names the drop reuses, so organizing hits
+    name collisions. A few drops are byte-identical copies of each other.
+    Returns the number of files written.
+    """
+    sys.path.insert(0, REPO_DIR)
+    from asset_categories import CATEGORIES, CORE_CATEGORIES
+    from asset_classifier import KeywordClassifier
+
+    rng = random.Random(seed)
+    names = corpus_names(count, rng)
+    classifier = KeywordClassifier(CATEGORIES)
+
+    os.makedirs(directory, exist_ok=True)
+    for category in CORE_CATEGORIES:
+        os.makedirs(os.path.join(directory, 'assets', category), exist_ok=True)
+
+    written = 0
+    previous = None
+    for name in names:
+        ext = os.path.splitext(name)[1]
+        if previous is not None and rng.random() < 0.03:
+            data = previous
+        else:
+            data = fake_image(ext, rng.randrange(64, 2048), rng.randrange(64, 2048), rng)
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(data)
+        previous = data
+        written += 1
+
+    for name, category in zip(names, classifier.classify_many(names)):
+        if category and rng.random() < SEEDED_SHARE:
+            data = fake_image(os.path.splitext(name)[1], rng.randrange(64, 2048), rng.randrange(64, 2048), rng)
+            with open(os.path.join(directory, 'assets', category, name), 'wb') as f:
+                f.write(data)
+            written += 1
+    return written
+
+def _load_script(path, name):
+    """Import a script by path (for file names that are not identifiers)"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _stage_function(stage):
+    """Import what a stage needs and return a no-argument callable"""
+    sys.path.insert(0, REPO_DIR)
+    base = stage.split(' (')[0]
+    if base == 'organize_images':
+        import organizer
+        return organizer.organize_images
+    if base == 'create_asset_manifest':
+        import organizer
+        return lambda: organizer.create_asset_manifest(placeholders=False)
+    if base == 'generate_html_gallery':
+        import gallery_generator
+        return lambda: gallery_generator.generate_html_gallery(thumbnails=False)
+    if base == 'organize_assets':
+        return _load_script(os.path.join(REPO_DIR, 'python organize_marvel.py'), 'organize_marvel').organize_assets
+    raise ValueError(f"unknown stage: {stage}")
+
+def run_stage(stage, directory):
+    """Run one stage in this process and return its measurements
+
+    Output of the stage goes to /dev/null, so the cost of printing is
+    still paid but the numbers are not skewed by a slow terminal.
+    """
+    function = _stage_function(stage)
+    os.chdir(directory)
+
+    io_before = proc_syscalls()
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        try:
+            wall = time.perf_counter()
+            cpu = time.process_time()
+            function()
+            cpu = time.process_time() - cpu
+            wall = time.perf_counter() - wall
+        finally:
+            sys.stdout = stdout
+    io_after = proc_syscalls()
+
+    result = {'wall': round(wall, 4), 'cpu': round(cpu, 4),
+              'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    if io_before and io_after:
+        result['read_syscalls'] = io_after[0] - io_before[0]
+        result['write_syscalls'] = io_after[1] - io_before[1]
+        result['syscalls'] = result['read_syscalls'] + result['write_syscalls']
+        result['syscalls_source'] = 'proc-io'
+    return result
+
+def _strace_total(path):
+    """Total syscall count from an `strace -c` summary file"""
+    with open(path) as f:
+        for line in f:
+            if line.rstrip().endswith('total'):
+                return int(line.split()[3])
+    return None
+
+def measure(stage, directory, use_strace=False):
+    """Run a stage in a fresh interpreter, so imports and RSS are its own"""
+    command = [sys.executable, os.path.abspath(__file__), '--stage', stage, '--corpus', directory]
+    summary = None
+    if use_strace:
+        summary = os.path.join(tempfile.gettempdir(), f'bench-strace-{os.getpid()}.txt')
+        command = ['strace', '-f', '-c', '-o', summary] + command
+
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    if summary:
+        # Covers every syscall of the child, imports included
+        result['syscalls'] = _strace_total(summary)
+        result['syscalls_source'] = 'strace'
+        os.remove(summary)
+    return result
+
+def run_benchmarks(sizes, workdir=None, seed=0, use_strace=False, keep=False):
+    """Generate each corpus, run every stage on it, and return the results
+
+    Returns {size label: {'files': n, 'stages': {stage: metrics}}}.
+    """
+    results = {}
+    for label, count in sizes:
+        directory = os.path.join(workdir or tempfile.mkdtemp(prefix='cardsgame-bench-'), label)
+        print(f"\n📦 Corpus {label}: {count:,} dropped file(s)")
+        stages = {}
+        for stage, needs in STAGES:
+            if needs == 'fresh':
+                shutil.rmtree(directory, ignore_errors=True)
+                started = time.perf_counter()
+                files = make_corpus(directory, count, seed)
+                print(f"  🧪 Generated {files:,} file(s) in {time.perf_counter() - started:.1f}s")
+            metrics = measure(stage, directory, use_strace)
+            stages[stage] = metrics
+            syscalls = metrics.get('syscalls')
+            kind = 'syscalls' if metrics.get('syscalls_source') == 'strace' else 'r/w syscalls'
+            print(f"  ⏱️  {stage:30} {metrics['wall']:8.3f}s wall {metrics['cpu']:8.3f}s cpu "
+                  f"{metrics['peak_rss_kb'] / 1024:7.1f} MB"
+                  + (f" {syscalls:>10,} {kind}" if syscalls is not None else ""))
+        results[label] = {'files': count, 'stages': stages}
+        if not keep:
+            shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """List (size, stage, metric, old, new) for every metric that regressed"""
+    regressions = []
+    for label, run in results.items():
+        old_stages = baseline.get('results', {}).get(label, {}).get('stages', {})
+        for stage, metrics in run['stages'].items():
+            old = old_stages.get(stage)
+            if not old:
+                continue
+            for metric in COMPARED:
+                before, after = old.get(metric), metrics.get(metric)
+                if before is None or after is None:
+                    continue
+                if metric in ('wall', 'cpu') and after < MIN_SECONDS:
+                    continue
+                if after > before * (1 + threshold):
+                    regressions.append((label, stage, metric, before, after))
+    return regressions
+
+def machine_info():
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark organize, manifest and gallery on synthetic corpora")
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES),
+                        help="corpus sizes, e.g. 1k 10k 100k 1M (default: %(default)s)")
+    parser.add_argument('--baseline', default=BASELINE_PATH,
+                        help="baseline JSON to compare against (default: %(default)s)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed growth before a metric is flagged (default: %(default)s)")
+    parser.add_argument('--json', metavar='PATH', help="also write the full results to PATH")
+    parser.add_argument('--workdir', help="where to build the corpora (default: a temp folder)")
+    parser.add_argument('--seed', type=int, default=0, help="corpus random seed (default: %(default)s)")
+    parser.add_argument('--strace', action='store_true',
+                        help="count every syscall with strace -c instead of the read/write counters in /proc")
+    parser.add_argument('--keep', action='store_true', help="leave the corpora on disk")
+    parser.add_argument('--stage', help=argparse.SUPPRESS)
+    parser.add_argument('--corpus', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    # Child mode: run one stage and report on the last line
+    if args.stage:
+        print(json.dumps(run_stage(args.stage, args.corpus)))
+        return 0
+
+    if args.strace and not shutil.which('strace'):
+        parser.error("strace is not installed")
+    sizes = [(label, parse_size(label)) for label in args.sizes]
+
+    print("=" * 50)
+    print("⏱️  ASSET PIPELINE BENCHMARK")
+    print("=" * 50)
+
+    results = run_benchmarks(sizes, args.workdir, args.seed, args.strace, args.keep)
+    report = {'machine': machine_info(), 'seed': args.seed, 'results': results}
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+    status = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('machine') != report['machine']:
+            print("\nℹ️  Baseline was recorded on a different machine or Python - compare with care")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for label, stage, metric, before, after in regressions:
+                print(f"  {label:5} {stage:30} {metric:12} {before:>12,} → {after:>12,}")
+            status = 1
+        else:
+            print(f"\n✅ No regressions against {args.baseline}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+# boot_tiers.py
+import json
+import html
+
+from asset_naming import asset_key
+from asset_scanner import glob_matcher
+from asset_variants import group_variants, is_variant_group, density_srcset
+from build_cache import load_cache, write_if_changed
+
+# Load order: what the first screen needs, what play needs, everything else
+TIERS = ('critical', 'gameplay', 'deferred')
+
+# Where assets go when no rule or usage data places them
+DEFAULT_TIER = 'deferred'
+
+# Globs over the path below assets/, checked in tier order
+TIER_RULES = {
+    'critical': ('characters/*',),
+    'gameplay': ('stones/*', 'enemies/*')
+}
+
+# Most bytes a tier may hold; assets past the budget drop to the next tier
+TIER_BUDGETS = {
+    'critical': 512 * 1024,
+    'gameplay': 4 * 1024 * 1024
+}
+
+# Optional per-asset request counts collected from play sessions:
+# {"sessions": N, "assets": {"assets/characters/thanos.png": {"boot": n, "play": n}}}
+USAGE_PATH = 'asset-usage.json'
+
+# Share of sessions that must have requested an asset before the board
+# appeared (boot) or at all during play (play) for it to get that tier
+USAGE_CRITICAL = 0.5
+USAGE_GAMEPLAY = 0.1
+
+# Tiered load list the game's loaders fetch
+BOOT_PLAN_PATH = 'assets/boot.json'
+
+# Page that gets preload hints for the critical tier
+INDEX_HTML = 'index.html'
+
+PRELOAD_START = '<!-- boot-preload:start -->'
+PRELOAD_END = '<!-- boot-preload:end -->'
+
+_RULE_MATCHERS = {tier: glob_matcher(patterns) for tier, patterns in TIER_RULES.items()}
+
+def load_usage(path=USAGE_PATH):
+    """Usage counts as {path: (boot share, play share)}, or {} without data"""
+    data = load_cache(path)
+    sessions = data.get('sessions') or 0
+    if sessions <= 0:
+        return {}
+    return {asset_path: (counts.get('boot', 0) / sessions, counts.get('play', 0) / sessions)
+            for asset_path, counts in data.get('assets', {}).items()}
+
+def rule_tier(path):
+    """First tier whose TIER_RULES match a path like assets/stones/x.png"""
+    relative = path[len('assets/'):] if path.startswith('assets/') else path
+    for tier in TIERS:
+        match = _RULE_MATCHERS.get(tier)
+        if match and match(relative):
+            return tier
+    return DEFAULT_TIER
+
+def usage_tier(shares):
+    boot, play = shares
+    if boot >= USAGE_CRITICAL:
+        return 'critical'
+    if play >= USAGE_GAMEPLAY:
+        return 'gameplay'
+    return 'deferred'
+
+def group_size(group):
+    """Bytes a variant group costs a budget: its largest file, what a dense screen fetches"""
+    return max(record.size for _, record in group.variants)
+
+def group_shares(group, usage):
+    """Highest (boot, play) shares of any file of a group, or None without data"""
+    shares = [usage[record.path] for _, record in group.variants if record.path in usage]
+    if not shares:
+        return None
+    return max(boot for boot, _ in shares), max(play for _, play in shares)
+
+def assign_tiers(records, usage=None, budgets=TIER_BUDGETS):
+    """Sort catalog rows (category -> rows) into TIERS under byte budgets
+
+    Resolution variants (name@1x.png, name@3x.png) are one asset: they
+    share a tier and count against its budget once. Usage data decides
+    the tier of every asset it covers; rules place the rest. Within a
+    tier, assets the most sessions needed early come first, then smaller
+    ones, so a budget holds as many useful assets as it can. Assets that
+    do not fit a tier's budget move down to the next tier. Returns
+    tier -> list of VariantGroups of rows in load order.
+    """
+    usage = usage or {}
+    tiers = {tier: [] for tier in TIERS}
+    shares = {}
+    for rows in records.values():
+        for group in group_variants(rows):
+            path = group.variants[0][1].path
+            shares[path] = group_shares(group, usage)
+            tiers[usage_tier(shares[path]) if shares[path] else rule_tier(path)].append(group)
+
+    def priority(group):
+        path = group.variants[0][1].path
+        boot, play = shares[path] or (0.0, 0.0)
+        return -boot, -play, group_size(group), path
+
+    for index, tier in enumerate(TIERS):
+        tiers[tier].sort(key=priority)
+        budget = budgets.get(tier)
+        if budget is None or index == len(TIERS) - 1:
+            continue
+        kept = []
+        used = 0
+        for group in tiers[tier]:
+            if used + group_size(group) <= budget:
+                kept.append(group)
+                used += group_size(group)
+            else:
+                tiers[TIERS[index + 1]].append(group)
+        tiers[tier] = kept
+    return tiers
+
+def plan_asset(group):
+    """Load list entry for one variant group
+
+    A group of variants takes its path and url from the lowest density,
+    as the manifest does, and adds a density srcset and every variant;
+    its size is the one the budget counted.
+    """
+    record = group.variants[0][1]
+    asset = {
+        'key': asset_key(record.name),
+        'path': record.path,
+        'url': record.hashed_path or record.path,
+        'category': record.category,
+        'size': group_size(group)
+    }
+    if is_variant_group(group):
+        asset['srcset'] = density_srcset(group, lambda row: row.hashed_path or row.path)
+        asset['variants'] = [{
+            'density': density,
+            'path': row.path,
+            'url': row.hashed_path or row.path,
+            'size': row.size
+        } for density, row in group.variants]
+    return asset
+
+def boot_plan(tiers, budgets=TIER_BUDGETS):
+    """The JSON load list for tier -> variant groups, one asset per group"""
+    plan = {'version': 1, 'tiers': {}}
+    for tier in TIERS:
+        assets = [plan_asset(group) for group in tiers[tier]]
+        plan['tiers'][tier] = {
+            'budget': budgets.get(tier),
+            'bytes': sum(asset['size'] for asset in assets),
+            'assets': assets
+        }
+    return plan
+
+def preload_tags(plan):
+    """<link rel="preload"> tags for the load list and the critical images
+
+    A group of variants gets one tag whose imagesrcset lets the browser
+    fetch only the density the screen needs.
+    """
+    tags = [f'<link rel="preload" href="{BOOT_PLAN_PATH}" as="fetch" crossorigin>']
+    for asset in plan['tiers']['critical']['assets']:
+        srcset = f' imagesrcset="{html.escape(asset["srcset"])}"' if asset.get('srcset') else ''
+        tags.append(f'<link rel="preload" href="{html.escape(asset["url"])}"{srcset} as="image" fetchpriority="high">')
+    return tags
+
+def write_preload_tags(tags, html_path=INDEX_HTML):
+    """Put tags between the boot-preload markers of a page (added before </head> if missing)
+
+    Returns True if the page changed.
+    """
+    try:
+        with open(html_path, 'r', encoding='utf-8') as f:
+            page = f.read()
+    except FileNotFoundError:
+        return False
+
+    indent = '    '
+    block = PRELOAD_START + ''.join(f'\n{indent}{tag}' for tag in tags) + f'\n{indent}{PRELOAD_END}'
+    start = page.find(PRELOAD_START)
+    end = page.find(PRELOAD_END, start)
+    if start != -1 and end != -1:
+        page = page[:start] + block + page[end + len(PRELOAD_END):]
+    elif '</head>' in page:
+        page = page.replace('</head>', f'{indent}{block}\n</head>', 1)
+    else:
+        return False
+    return write_if_changed(html_path, page)
+
+def write_boot_plan(records, usage_path=USAGE_PATH, plan_path=BOOT_PLAN_PATH, html_path=INDEX_HTML):
+    """Assign tiers to every catalogued asset and write the load list and preload hints
+
+    records is category -> catalog rows for all categories. Returns the plan.
+    """
+    usage = load_usage(usage_path)
+    plan = boot_plan(assign_tiers(records, usage))
+    write_if_changed(plan_path, json.dumps(plan, separators=(',', ':')))
+    write_preload_tags(preload_tags(plan), html_path)
+
+    source = f"usage data from {usage_path}" if usage else "rules"
+    print(f"  🚀 Boot tiers ({source}): {plan_path}")
+    for tier, info in plan['tiers'].items():
+        budget = f" of {info['budget'] / 1024:.0f} KB" if info['budget'] else ""
+        print(f"     - {tier}: {len(info['assets'])} asset(s), {info['bytes'] / 1024:.1f} KB{budget}")
+    return plan
@@ -0,0 +1,120 @@
+# build_cache.py
+import os
+import json
+import hashlib
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Write buffer for streamed outputs
+STREAM_BUFFER_SIZE = 256 * 1024
+
+def hash_file(path, chunk_size=HASH_CHUNK_SIZE):
+    """Return the sha256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_text(*parts):
+    """Return the sha256 hex digest of some strings"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def load_cache(path):
+    """Load a JSON cache file, or an empty dict if it is missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def save_cache(path, data):
+    """Save a JSON cache file atomically"""
+    atomic_write(path, json.dumps(data, separators=(',', ':'), sort_keys=True))
+
+def atomic_write(path, content, encoding='utf-8'):
+    """Write a file through a temporary sibling and rename it into place"""
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    tmp_path = os.path.join(folder, f'.{os.path.basename(path)}.{os.getpid()}.tmp')
+    data = content if isinstance(content, bytes) else content.encode(encoding)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_if_changed(path, content, encoding='utf-8'):
+    """Write content only when it differs from what is on disk
+
+    Returns True if the file was written, False if it was already identical.
+    """
+    data = content if isinstance(content, bytes) else content.encode(encoding)
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+
+    atomic_write(path, data)
+    return True
+
+def stream_write_if_changed(path, chunks, encoding='utf-8', buffer_size=STREAM_BUFFER_SIZE):
+    """Stream text chunks to a file, keeping it untouched if nothing changed
+
+    The chunks go to a temporary sibling through a large write buffer while
+    their hash is computed, so the full content is never held in memory.
+    Returns True if the file was replaced, False if it was byte-identical.
+    """
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    tmp_path = os.path.join(folder, f'.{os.path.basename(path)}.{os.getpid()}.tmp')
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, 'wb', buffering=buffer_size) as f:
+            for chunk in chunks:
+                data = chunk.encode(encoding)
+                digest.update(data)
+                size += len(data)
+                f.write(data)
+
+        try:
+            unchanged = os.path.getsize(path) == size and hash_file(path) == digest.hexdigest()
+        except OSError:
+            unchanged = False
+
+        if unchanged:
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def fingerprint_entry(entry, previous=None):
+    """Build the cache record for a scanned file
+
+    The content hash is reused from the previous record when path, size and
+    mtime are unchanged, so only new or modified files are read.
+    """
+    st = entry.stat()
+    record = {'size': st.st_size, 'mtime': st.st_mtime_ns}
+    if previous and previous.get('size') == record['size'] and previous.get('mtime') == record['mtime'] \
+            and previous.get('sha256'):
+        record['sha256'] = previous['sha256']
+    else:
+        record['sha256'] = hash_file(entry.path)
+    return record
@@ -0,0 +1,229 @@
+# cardsgame_assets.py
+import os
+import argparse
+from pathlib import Path
+
+import run_report
+from asset_categories import CATEGORIES, CORE_CATEGORIES
+from asset_catalog import open_catalog
+from asset_dedupe import DEDUPE_POLICIES, DEFAULT_DEDUPE_POLICY
+from asset_relocator import DEFAULT_WORKERS
+from build_cache import load_cache, save_cache
+from manifest_writer import MANIFEST_PATH
+from gallery_generator import GALLERY_OUTPUT, generate_html_gallery
+from precompress import compress_outputs
+import organizer
+
+# Pipeline order; a build runs the selected stages in this order
+STAGES = ('scan', 'classify', 'move', 'optimize', 'manifest', 'gallery', 'files', 'compress')
+
+# What runs when no stages are named
+DEFAULT_STAGES = ('scan', 'classify', 'move', 'manifest', 'gallery', 'files', 'compress')
+
+# Stages that only make sense after others in the same build
+STAGE_REQUIRES = {
+    'classify': ('scan',),
+    'move': ('scan', 'classify')
+}
+
+# Output -> the options it was last built with
+BUILD_OPTIONS_CACHE = '.build-options.json'
+
+# Options that change what an output contains; an output built with other
+# values is not up to date even when no files changed
+OUTPUT_OPTIONS = {
+    MANIFEST_PATH: ('publish', 'ndjson', 'no_thumbnails'),
+    GALLERY_OUTPUT: ('publish', 'reproducible', 'no_thumbnails')
+}
+
+class AssetBuild:
+    """State the stages of one build hand to each other in memory
+
+    catalog is the open asset catalog, batches is the scan's stream of
+    dropped files, drops and categories are those files and their
+    classification once the classify stage consumed it, and changed holds
+    the categories whose files changed in this build (None means assume
+    everything did: first run, --rescan or --full). Catalog rows are loaded
+    once, after the last stage that changes files, and shared by the
+    manifest and the gallery. built holds the OUTPUT_OPTIONS each output
+    was last written with.
+    """
+
+    def __init__(self, catalog, options, full=False):
+        self.catalog = catalog
+        self.options = options
+        self.batches = ()
+        self.drops = []
+        self.categories = []
+        self.stats = None
+        self.changed = None if full else set()
+        self.built = load_cache(BUILD_OPTIONS_CACHE)
+        self._records = None
+
+    def mark_changed(self, categories):
+        if self.changed is not None:
+            self.changed.update(categories)
+        self._records = None
+
+    def output_options(self, output):
+        return {name: getattr(self.options, name) for name in OUTPUT_OPTIONS[output]}
+
+    def same_options(self, output):
+        """Whether output was last built with the options of this build"""
+        return self.built.get(output) == self.output_options(output)
+
+    def up_to_date(self, output):
+        return self.changed == set() and os.path.exists(output) and self.same_options(output)
+
+    def mark_built(self, output):
+        if not self.same_options(output):
+            self.built[output] = self.output_options(output)
+            save_cache(BUILD_OPTIONS_CACHE, self.built)
+
+    def records(self):
+        """Catalog rows per category (published first when asked to)"""
+        if self._records is None:
+            self._records = organizer.catalog_records(self.catalog, CATEGORIES, self.options.publish)
+        return self._records
+
+def stage_scan(state):
+    # Lazy: the batches are produced while the classify stage consumes them
+    options = state.options
+    state.batches = organizer.scan_drops(options.recursive, options.include, options.exclude)
+
+def stage_classify(state):
+    state.drops, state.categories = organizer.classify_drops(state.batches)
+    matched = sum(1 for category in state.categories if category)
+    print(f"🔍 Scan: {len(state.drops)} image file(s) dropped, {matched} matched, "
+          f"{len(state.drops) - matched} left in place")
+
+def stage_move(state):
+    if not any(state.categories):
+        return
+    for category in CORE_CATEGORIES:
+        Path(f'assets/{category}').mkdir(parents=True, exist_ok=True)
+    print("🔄 Move:")
+    state.stats, touched = organizer.move_images(state.drops, state.categories, state.options.workers,
+                                                 state.options.dedupe, state.catalog)
+    state.mark_changed(touched)
+
+def stage_optimize(state):
+    state.mark_changed(organizer.optimize_images(list(CATEGORIES), state.catalog))
+
+def stage_manifest(state):
+    options = state.options
+    if state.up_to_date(MANIFEST_PATH):
+        print(f"📝 Manifest up to date: {MANIFEST_PATH}")
+    elif state.changed and os.path.exists(MANIFEST_PATH) and state.same_options(MANIFEST_PATH):
+        print("📝 Manifest:")
+        organizer.update_asset_manifest(sorted(state.changed), publish=options.publish, catalog=state.catalog,
+                                        records=state.records(), placeholders=not options.no_thumbnails,
+                                        ndjson=options.ndjson)
+    else:
+        organizer.create_asset_manifest(ndjson=options.ndjson, publish=options.publish, catalog=state.catalog,
+                                        records=state.records(), placeholders=not options.no_thumbnails)
+    state.mark_built(MANIFEST_PATH)
+
+def stage_gallery(state):
+    if state.up_to_date(GALLERY_OUTPUT):
+        print(f"🎨 Gallery up to date: {GALLERY_OUTPUT}")
+        return
+
+    # Other options change every section, so only a build like the last one can reuse them
+    options = state.options
+    dirty = sorted(state.changed) if state.changed is not None and state.same_options(GALLERY_OUTPUT) else None
+    generate_html_gallery(reproducible=options.reproducible, output_path=GALLERY_OUTPUT,
+                          thumbnails=not options.no_thumbnails, workers=options.workers,
+                          dirty=dirty, catalog=state.catalog, records=state.records())
+    state.mark_built(GALLERY_OUTPUT)
+
+def stage_files(state):
+    organizer.create_css_file()
+    organizer.create_github_pages_config()
+
+def stage_compress(state):
+    # Content-hashed, so only the outputs the other stages changed are redone
+    compress_outputs(workers=state.options.workers)
+
+STAGE_FUNCTIONS = {
+    'scan': stage_scan,
+    'classify': stage_classify,
+    'move': stage_move,
+    'optimize': stage_optimize,
+    'manifest': stage_manifest,
+    'gallery': stage_gallery,
+    'files': stage_files,
+    'compress': stage_compress
+}
+
+def resolve_stages(names):
+    """Selected stages plus the ones they need, in pipeline order"""
+    wanted = set(names)
+    for name in names:
+        wanted.update(STAGE_REQUIRES.get(name, ()))
+    return [name for name in STAGES if name in wanted]
+
+def build(catalog, options, stages=DEFAULT_STAGES):
+    """Run the pipeline stages in this process over an open catalog
+
+    Returns the AssetBuild, so callers can look at what changed.
+    """
+    state = AssetBuild(catalog, options, full=options.full or catalog.synced)
+    for name in resolve_stages(stages):
+        STAGE_FUNCTIONS[name](state)
+    return state
+
+def _options(parser):
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(DEFAULT_STAGES), metavar='STAGE',
+                        help=f"stages to run, in pipeline order (default: {' '.join(DEFAULT_STAGES)}; "
+                             f"all: {' '.join(STAGES)})")
+    parser.add_argument('--recursive', action='store_true',
+                        help="also take images from folders below this one (e.g. drop/2026-10/heroes/)")
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                        help="only take images whose relative path matches GLOB (repeatable)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help="skip images and folders whose relative path matches GLOB (repeatable)")
+    parser.add_argument('--optimize', action='store_true',
+                        help="also losslessly recompress the organized PNG files")
+    parser.add_argument('--full', action='store_true',
+                        help="rebuild the manifest and gallery even if no files changed")
+    parser.add_argument('--rescan', action='store_true',
+                        help="re-read assets/ into the catalog first (after editing it by hand)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"concurrent file moves and thumbnail processes (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--dedupe', choices=DEDUPE_POLICIES, default=DEFAULT_DEDUPE_POLICY,
+                        help="what to do with files whose bytes are already in assets/")
+    parser.add_argument('--ndjson', action='store_true',
+                        help="also write assets/manifest.ndjson with one entry per line")
+    parser.add_argument('--publish', action='store_true',
+                        help="write content-hashed copies under assets/hashed/ and record them in the manifest")
+    parser.add_argument('--reproducible', action='store_true',
+                        help="leave the build timestamp out of the gallery")
+    parser.add_argument('--no-thumbnails', action='store_true',
+                        help="point gallery tiles at the original images only, with no thumbnails or placeholders")
+    run_report.add_arguments(parser)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the card game's assets: organize, manifest and gallery")
+    commands = parser.add_subparsers(dest='command', required=True)
+    _options(commands.add_parser('build', help="run the pipeline once"))
+    _options(commands.add_parser('watch', help="build, then organize images as they are dropped in"))
+    args = parser.parse_args(argv)
+
+    stages = list(args.stages)
+    if args.optimize and 'optimize' not in stages:
+        stages.append('optimize')
+
+    with run_report.instrumented(args, f'cardsgame_assets {args.command}'), \
+            open_catalog(CATEGORIES, rescan=args.rescan) as catalog:
+        state = build(catalog, args, stages)
+        if args.command == 'watch':
+            organizer.watch(catalog, workers=args.workers, dedupe=args.dedupe, publish=args.publish,
+                            optimize=args.optimize)
+        elif state.stats:
+            print("✅ Build complete: " + ', '.join(f"{name} {count}" for name, count in state.stats.items() if count))
+        else:
+            print("✅ Build complete")
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,35 @@
 # gallery_generator.py
 import os
-from pathlib import Path
+import json
+import time
+import argparse
 import datetime
 
+import run_report
+from asset_scanner import web_path
+from asset_categories import CATEGORIES
+from asset_catalog import Catalog, open_catalog
+from asset_variants import group_variants, highest_densities, is_variant_group, density_label
+from placeholders import build_placeholders
+from image_probe import image_size
+from thumbnails import (DEFAULT_WORKERS, GALLERY_SIZES, thumbnails_available, build_derivatives, fallback_format,
+                        prune_derivatives, srcset)
+from asset_publish import published_paths
+from build_cache import (STREAM_BUFFER_SIZE, hash_file, hash_text, load_cache, save_cache,
+                         write_if_changed, stream_write_if_changed)
+
 # Configuration
-IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif')
-
-CATEGORIES = {
-    'characters': {
-        'title': 'Characters',
-        'description': 'Thanos and members of the Black Order'
-    },
-    'stones': {
-        'title': 'Infinity Stones', 
-        'description': 'The six Infinity Stones in different resolutions'
-    },
-    'enemies': {
-        'title': 'Enemies',
-        'description': 'Thanos\' alien forces'
-    }
-}
+GALLERY_OUTPUT = 'gallery.html'
+
+# Section keys and counts of the last build (file records live in the asset catalog)
+GALLERY_CACHE = '.gallery-cache.json'
+
+# Rendered category sections, one file per section key
+GALLERY_FRAGMENTS = '.gallery-fragments'
+
+# Sharded output: gallery/<category>/page-N.html plus gallery/index.html
+SHARD_OUTPUT_DIR = 'gallery'
+DEFAULT_PAGE_SIZE = 100
 
 HTML_TEMPLATE = '''<!DOCTYPE html>
 <html lang="en">
@@ -28,23 +38,23 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Marvel Infinity War Assets</title>
     <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
         
-        body {
+        body {{
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #0a0a0a 0%, #1a1a2e 100%);
             color: #f0f0f0;
             line-height: 1.6;
             min-height: 100vh;
-        }
+        }}
         
-        .container {
+        .container {{
             max-width: 1400px;
             margin: 0 auto;
             padding: 30px;
-        }
+        }}
         
-        header {
+        header {{
             text-align: center;
             padding: 50px 0;
             margin-bottom: 40px;
@@ -52,9 +62,9 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             border-radius: 20px;
             border: 2px solid #f0131e;
             box-shadow: 0 10px 30px rgba(240, 19, 30, 0.2);
-        }
+        }}
         
-        h1 {
+        h1 {{
             font-size: 3.5em;
             background: linear-gradient(90deg, #f0131e, #ffd700, #00b5e2);
             -webkit-background-clip: text;
@@ -64,17 +74,17 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             letter-spacing: 3px;
             margin-bottom: 20px;
             text-shadow: 0 5px 15px rgba(0, 0, 0, 0.5);
-        }
+        }}
         
-        .subtitle {
+        .subtitle {{
             color: #aaa;
             font-size: 1.3em;
             max-width: 800px;
             margin: 0 auto;
             padding: 0 20px;
-        }
+        }}
         
-        .stats-bar {
+        .stats-bar {{
             background: rgba(30, 30, 46, 0.8);
             border-radius: 12px;
             padding: 20px;
@@ -84,29 +94,29 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             flex-wrap: wrap;
             gap: 20px;
             border: 1px solid #333;
-        }
+        }}
         
-        .stat-item {
+        .stat-item {{
             text-align: center;
             padding: 15px;
             min-width: 150px;
-        }
+        }}
         
-        .stat-number {
+        .stat-number {{
             font-size: 2.5em;
             font-weight: bold;
             color: #ffd700;
             display: block;
-        }
+        }}
         
-        .stat-label {
+        .stat-label {{
             color: #bbb;
             font-size: 0.9em;
             text-transform: uppercase;
             letter-spacing: 1px;
-        }
+        }}
         
-        .category {
+        .category {{
             margin-bottom: 70px;
             background: rgba(25, 25, 40, 0.9);
             border-radius: 20px;
@@ -114,88 +124,88 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             box-shadow: 0 15px 35px rgba(0, 0, 0, 0.4);
             border: 1px solid #333;
             transition: transform 0.3s ease;
-        }
+        }}
         
-        .category:hover {
+        .category:hover {{
             transform: translateY(-5px);
             border-color: #444;
-        }
+        }}
         
-        .category-header {
+        .category-header {{
             display: flex;
             align-items: center;
             margin-bottom: 25px;
             padding-bottom: 15px;
             border-bottom: 2px solid #333;
-        }
+        }}
         
-        .category-title {
+        .category-title {{
             font-size: 2.2em;
             color: #ffd700;
             flex-grow: 1;
-        }
+        }}
         
-        .category-count {
+        .category-count {{
             background: #f0131e;
             color: white;
             padding: 8px 20px;
             border-radius: 20px;
             font-weight: bold;
             font-size: 1.2em;
-        }
+        }}
         
-        .category-description {
+        .category-description {{
             color: #ccc;
             font-size: 1.1em;
             margin-bottom: 30px;
             line-height: 1.8;
-        }
+        }}
         
-        .gallery {
+        .gallery {{
             display: grid;
             grid-template-columns: repeat(auto-fill, minmax(280px, 1fr));
             gap: 25px;
-        }
+        }}
         
-        .gallery-item {
+        .gallery-item {{
             background: rgba(40, 40, 60, 0.95);
             border-radius: 15px;
             overflow: hidden;
             transition: all 0.3s ease;
             border: 1px solid #444;
             position: relative;
-        }
+        }}
         
-        .gallery-item:hover {
+        .gallery-item:hover {{
             transform: translateY(-10px) scale(1.02);
             box-shadow: 0 20px 40px rgba(240, 19, 30, 0.3);
             border-color: #f0131e;
             z-index: 10;
-        }
+        }}
         
-        .gallery-img-container {
+        .gallery-img-container {{
             width: 100%;
             height: 220px;
             overflow: hidden;
             position: relative;
-        }
+        }}
         
-        .gallery-img {
+        .gallery-img {{
             width: 100%;
             height: 100%;
             object-fit: cover;
             transition: transform 0.5s ease;
-        }
+        }}
         
-        .gallery-item:hover .gallery-img {
+        .gallery-item:hover .gallery-img {{
             transform: scale(1.1);
-        }
+        }}
         
-        .gallery-info {
+        .gallery-info {{
             padding: 20px;
-        }
+        }}
         
-        .gallery-name {
+        .gallery-name {{
             font-weight: bold;
             color: #fff;
             font-size: 1.2em;
@@ -203,22 +213,22 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             white-space: nowrap;
             overflow: hidden;
             text-overflow: ellipsis;
-        }
+        }}
         
-        .gallery-meta {
+        .gallery-meta {{
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-top: 10px;
-        }
+        }}
         
-        .gallery-size {
+        .gallery-size {{
             color: #888;
             font-family: 'Courier New', monospace;
             font-size: 0.9em;
-        }
+        }}
         
-        .resolution-badge {
+        .resolution-badge {{
             background: linear-gradient(45deg, #00b5e2, #0088cc);
             color: white;
             padding: 4px 12px;
@@ -226,36 +236,57 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             font-size: 0.8em;
             font-weight: bold;
             letter-spacing: 1px;
-        }
+        }}
         
-        footer {
+        footer {{
             text-align: center;
             padding: 40px;
             color: #888;
             margin-top: 60px;
             border-top: 1px solid #333;
             font-size: 0.9em;
-        }
+        }}
         
-        .update-time {
+        .update-time {{
             color: #00b5e2;
             font-weight: bold;
-        }
+        }}
         
-        @media (max-width: 768px) {
-            .gallery {
+        .page-nav {{
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            gap: 20px;
+            margin: 20px 0;
+            color: #bbb;
+        }}
+        
+        .page-nav a {{
+            color: #00b5e2;
+            font-weight: bold;
+            text-decoration: none;
+        }}
+        
+        .page-links {{
+            display: flex;
+            flex-wrap: wrap;
+            gap: 10px;
+        }}
+        
+        @media (max-width: 768px) {{
+            .gallery {{
                 grid-template-columns: repeat(auto-fill, minmax(220px, 1fr));
-            }
+            }}
             
-            h1 {
+            h1 {{
                 font-size: 2.2em;
-            }
+            }}
             
-            .stats-bar {
+            .stats-bar {{
                 flex-direction: column;
                 align-items: center;
-            }
-        }
+            }}
+        }}
     </style>
 </head>
 <body>
@@ -278,12 +309,29 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
     </div>
     
     <script>
+        // Drop a tile's placeholder once its image is there (load does not
+        // bubble, so listen while capturing)
+        function revealTile(img) {{
+            const container = img.closest('.gallery-img-container');
+            if (container) {{
+                container.style.background = '';
+            }}
+        }}
+        document.addEventListener('load', function(event) {{
+            if (event.target.classList && event.target.classList.contains('gallery-img')) {{
+                revealTile(event.target);
+            }}
+        }}, true);
+        
         // Add simple interactivity
-        document.addEventListener('DOMContentLoaded', function() {
+        document.addEventListener('DOMContentLoaded', function() {{
             // Add click to view larger image
             const images = document.querySelectorAll('.gallery-img');
-            images.forEach(img => {
-                img.addEventListener('click', function() {
+            images.forEach(img => {{
+                if (img.complete && img.naturalWidth) {{
+                    revealTile(img);
+                }}
+                img.addEventListener('click', function() {{
                     const src = this.src;
                     const overlay = document.createElement('div');
                     overlay.style.cssText = `
@@ -313,23 +361,27 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                     overlay.appendChild(largeImg);
                     document.body.appendChild(overlay);
                     
-                    overlay.addEventListener('click', () => {
+                    overlay.addEventListener('click', () => {{
                         document.body.removeChild(overlay);
-                    });
-                });
-            });
+                    }});
+                }});
+            }});
             
             // Update year in footer
             document.getElementById('current-year').textContent = new Date().getFullYear();
-        });
+        }});
     </script>
 </body>
 </html>'''
 
-def get_image_info(filepath):
+# The page is streamed around the category sections
+TEMPLATE_HEAD, TEMPLATE_TAIL = HTML_TEMPLATE.split('{categories_html}')
+
+def get_image_info(filepath, size=None, dimensions=None):
     """Get information about an image file"""
     name = os.path.basename(filepath)
-    size = os.path.getsize(filepath)
+    if size is None:
+        size = os.path.getsize(filepath)
     
     # Format size
     if size < 1024:
@@ -345,6 +397,10 @@ def get_image_info(filepath):
         res = name.split('@')[1].split('.')[0]
         resolution = res
     
+    # Get pixel dimensions from the file header
+    if dimensions is None:
+        dimensions = image_size(filepath)
+    
     # Format display name
     display_name = name.replace('-', ' ').replace('_', ' ').replace('@', ' ').replace('.png', '').replace('.jpg', '').title()
     
@@ -353,51 +409,89 @@ def get_image_info(filepath):
         'path': filepath.replace('\\', '/'),  # Fix path for web
         'size': size_str,
         'resolution': resolution,
-        'display_name': display_name
+        'display_name': display_name,
+        'width': dimensions[0] if dimensions else None,
+        'height': dimensions[1] if dimensions else None
     }
 
-def generate_html_gallery():
-    """Generate an HTML file displaying all images"""
-    print("🎨 Generating HTML gallery...")
+def variant_srcset(variants, prefix='', thumbnails=''):
+    """srcset for the resolution variants of one image, after any thumbnail candidates
+
+    Width descriptors when every variant's width is known (so the tile's
+    sizes decide), density descriptors otherwise. A variant whose width a
+    thumbnail already covers is left out.
+    """
+    if not all(width for _, _, width in variants):
+        return ', '.join(f'{prefix}{url} {density_label(density)}' for density, url, _ in variants)
+    candidates = [thumbnails] if thumbnails else []
+    taken = {candidate.rsplit(' ', 1)[1] for candidate in thumbnails.split(', ')} if thumbnails else set()
+    for _, url, width in variants:
+        if f'{width}w' not in taken:
+            taken.add(f'{width}w')
+            candidates.append(f'{prefix}{url} {width}w')
+    return ', '.join(candidates)
+
+def variant_info(base, variants, infos):
+    """Tile info for a group of resolution variants (infos in the group's density order)
+
+    The tile shows the lowest density by default and lets srcset pick the
+    variant the screen needs; its badge lists the densities there are.
+    """
+    return dict(
+        infos[0],
+        display_name=base.replace('-', ' ').replace('_', ' ').title(),
+        resolution=' · '.join(density_label(density) for density, _ in variants),
+        size=infos[0]['size'] if len(infos) == 1 else f"{infos[0]['size']} – {infos[-1]['size']}",
+        variants=[(density, info['path'], info['width']) for (density, _), info in zip(variants, infos)]
+    )
+
+def render_gallery_item(info, derivatives=(), prefix=''):
+    """Render the HTML for a single gallery tile
+
+    prefix is prepended to every URL, for pages that live below the site root.
+    """
+    resolution_badge = ""
+    if info['resolution']:
+        resolution_badge = f'<div class="resolution-badge">{info["resolution"]}</div>'
     
-    categories_html = ""
-    stats_html = ""
-    total_images = 0
+    # Intrinsic size lets the browser reserve the box before the image loads
+    size_attrs = ""
+    if info['width'] and info['height']:
+        size_attrs = f' width="{info["width"]}" height="{info["height"]}"'
     
-    for category_name, category_data in CATEGORIES.items():
-        category_path = f'assets/{category_name}'
-        
-        if not os.path.exists(category_path):
-            continue
-        
-        # Get all images in this category
-        images = []
-        for ext in IMAGE_EXTENSIONS:
-            images.extend(list(Path(category_path).glob(f'*{ext}')))
-            images.extend(list(Path(category_path).glob(f'*{ext.upper()}')))
-        
-        if not images:
-            continue
-        
-        # Sort images by name
-        images.sort()
-        
-        # Update total
-        total_images += len(images)
-        
-        # Generate gallery items for this category
-        gallery_items = ""
-        for img_path in images:
-            info = get_image_info(str(img_path))
-            
-            resolution_badge = ""
-            if info['resolution']:
-                resolution_badge = f'<div class="resolution-badge">{info["resolution"]}</div>'
-            
-            gallery_items += f'''
+    # Only fetch and decode tiles as they scroll into view
+    load_attrs = ' loading="lazy" decoding="async"'
+    
+    # Thumbnails let the browser fetch a tile-sized file; src stays the original for enlarging
+    src = prefix + info['path']
+    img_tag = f'''<img src="{src}"{size_attrs}{load_attrs} alt="{info['display_name']}" class="gallery-img" title="Click to enlarge">'''
+    variants = info.get('variants')
+    if variants and not derivatives:
+        img_tag = f'''<img src="{src}" srcset="{variant_srcset(variants, prefix)}" sizes="{GALLERY_SIZES}"{size_attrs}{load_attrs} alt="{info['display_name']}" class="gallery-img" title="Click to enlarge">'''
+    if derivatives:
+        # Both lists end at the full-size image(s), so a tile wider than every thumbnail stays sharp
+        if variants:
+            webp_srcset = variant_srcset(variants, prefix, srcset(derivatives, 'webp', prefix=prefix))
+            img_srcset = variant_srcset(variants, prefix, srcset(derivatives, fallback_format(info['path']), prefix=prefix))
+        else:
+            webp_srcset = srcset(derivatives, 'webp', info['path'], info['width'], prefix)
+            img_srcset = srcset(derivatives, fallback_format(info['path']), info['path'], info['width'], prefix)
+        img_tag = f'''<picture>
+                        <source type="image/webp" srcset="{webp_srcset}" sizes="{GALLERY_SIZES}">
+                        <img src="{src}" srcset="{img_srcset}" sizes="{GALLERY_SIZES}"{size_attrs}{load_attrs} alt="{info['display_name']}" class="gallery-img" title="Click to enlarge">
+                    </picture>'''
+    
+    # Until the image arrives the tile shows its blurred preview over its dominant color
+    container_attrs = ''
+    if info.get('placeholder'):
+        placeholder = info['placeholder']
+        container_attrs = (f' style="background: {placeholder["color"]} url({placeholder["lqip"]}) '
+                           f'center / cover no-repeat"')
+    
+    return f'''
             <div class="gallery-item">
-                <div class="gallery-img-container">
-                    <img src="{info['path']}" alt="{info['display_name']}" class="gallery-img" title="Click to enlarge">
+                <div class="gallery-img-container"{container_attrs}>
+                    {img_tag}
                 </div>
                 <div class="gallery-info">
                     <div class="gallery-name" title="{info['display_name']}">{info['display_name']}</div>
@@ -408,9 +502,13 @@ def generate_html_gallery():
                 </div>
             </div>
             '''
-        
-        # Add category section
-        categories_html += f'''
+
+def iter_category_section(category_data, images, files=None, derivatives=None, prefix=''):
+    """Yield the HTML of a category section piece by piece"""
+    files = files or {}
+    derivatives = derivatives or {}
+    
+    yield f'''
         <section class="category">
             <div class="category-header">
                 <h2 class="category-title">{category_data['title']}</h2>
@@ -418,18 +516,217 @@ def generate_html_gallery():
             </div>
             <p class="category-description">{category_data['description']}</p>
             <div class="gallery">
-                {gallery_items}
+                '''
+    
+    # One tile per image, with its resolution variants in a single srcset
+    # (timed per tile when profiling)
+    report = run_report.active()
+    for group in group_variants(images, web_path):
+        if report:
+            started, cpu = time.perf_counter(), time.process_time()
+        infos = []
+        for _, entry in group.variants:
+            entry_path = web_path(entry)
+            record = files.get(entry_path)
+            dimensions = (record['width'], record['height']) if record and record.get('width') else None
+            entry_info = get_image_info(entry_path, record['size'] if record else None, dimensions)
+            if record and record.get('url'):
+                entry_info['path'] = record['url']
+            infos.append(entry_info)
+        info = variant_info(group.base, group.variants, infos) if is_variant_group(group) else infos[0]
+        # Derivatives and placeholders come from the highest density only
+        source = web_path(group.variants[-1][1])
+        info['placeholder'] = (files.get(source) or {}).get('placeholder')
+        html = render_gallery_item(info, derivatives.get(source, ()), prefix)
+        if report:
+            elapsed = time.perf_counter() - started
+            report.add('render', elapsed, time.process_time() - cpu)
+            report.file_time(source, elapsed, 'render')
+        yield html
+    
+    yield '''
             </div>
         </section>
         '''
-        
-        # Add to stats
-        stats_html += f'''
+
+def render_category_stat(category_data, count):
+    """Render the stats bar entry for a category"""
+    return f'''
         <div class="stat-item">
-            <span class="stat-number">{len(images)}</span>
+            <span class="stat-number">{count}</span>
             <span class="stat-label">{category_data['title']}</span>
         </div>
         '''
+
+def _iter_fragment(path):
+    """Yield a cached section fragment in chunks"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for chunk in iter(lambda: f.read(STREAM_BUFFER_SIZE), ''):
+            yield chunk
+
+def _iter_and_save(chunks, path):
+    """Pass chunks through while saving them as a section fragment"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            yield chunk
+    os.replace(tmp_path, path)
+
+def _prune_fragments(keep):
+    """Remove section fragments that no longer belong to any section"""
+    try:
+        names = os.listdir(GALLERY_FRAGMENTS)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name not in keep:
+            os.remove(os.path.join(GALLERY_FRAGMENTS, name))
+
+def _renderer_digest():
+    """Fingerprint of this module, so markup changes invalidate cached sections"""
+    try:
+        return hash_file(__file__)
+    except OSError:
+        return ''
+
+def collect_gallery(use_cache=True, thumbnails=True, workers=DEFAULT_WORKERS, categories=None, rescan=False,
+                    catalog=None, records=None):
+    """Load the assets of every category from the catalog and build derivatives
+
+    Returns (scanned, files, derivatives): category -> catalog rows (sorted
+    by name, only for categories with files), path -> record dict, and
+    path -> thumbnail derivatives. With a list of categories only those are
+    loaded and derivatives of the others are not pruned. Without the cache
+    the assets are read fresh from disk into a throwaway catalog.
+    
+    A caller that already has the catalog open can pass it (it is left
+    open), along with records (category -> rows) it has already loaded.
+    """
+    wanted = list(CATEGORIES) if categories is None else categories
+    if catalog is None:
+        with run_report.phase('scan'):
+            if use_cache:
+                catalog = open_catalog(CATEGORIES, rescan=rescan)
+            else:
+                catalog = Catalog(':memory:')
+                catalog.sync(wanted)
+        with catalog:
+            return collect_gallery(use_cache, thumbnails, workers, categories, catalog=catalog)
+    
+    # One indexed query per category
+    scanned = {}
+    with run_report.phase('scan'):
+        for category in wanted:
+            rows = records.get(category) if records is not None else catalog.entries(category)
+            if rows:
+                scanned[category] = rows
+    
+    files = {}
+    for rows in scanned.values():
+        for record in rows:
+            files[record.path] = {'size': record.size, 'sha256': record.sha256,
+                                  'width': record.width, 'height': record.height}
+    
+    # Point tiles at fingerprinted copies when organizer.py --publish made them
+    for path, url in published_paths(files).items():
+        files[path]['url'] = url
+    
+    # Thumbnails, WebP variants and placeholders are made only for new
+    # content and only from the highest density of each group of variants
+    sources = [record.path for rows in scanned.values() for record in highest_densities(rows)]
+    
+    # Blurred preview and dominant color shown while a tile loads
+    if thumbnails:
+        with run_report.phase('placeholders'):
+            placeholders = build_placeholders([(path, files[path]['sha256']) for path in sources], workers,
+                                              prune=categories is None)
+        for path, placeholder in placeholders.items():
+            files[path]['placeholder'] = placeholder
+    
+    derivatives = {}
+    if thumbnails and thumbnails_available():
+        with run_report.phase('thumbnails'):
+            derivatives = build_derivatives(
+                [(path, files[path]['sha256'], files[path]['width']) for path in sources], workers,
+                prune=categories is None)
+            if categories is None:
+                prune_derivatives(derivatives)
+            catalog.set_derivatives(derivatives)
+    
+    return scanned, files, derivatives
+
+def generate_html_gallery(reproducible=False, use_cache=True, output_path=GALLERY_OUTPUT,
+                          thumbnails=True, workers=DEFAULT_WORKERS, dirty=None, rescan=False,
+                          catalog=None, records=None):
+    """Generate an HTML file displaying all images
+
+    The page is streamed to disk: everything the header needs (counts and
+    section keys) comes from a metadata-only first pass, then the header,
+    each section and each tile are written in buffered chunks, so memory
+    does not grow with the rendered HTML.
+
+    Category sections are reused from cached fragments when none of their
+    files changed (by path, size, mtime and content hash), and the output
+    is left untouched when it would be byte-identical. In reproducible
+    mode the build timestamp is replaced by a content fingerprint. With
+    thumbnails on (and Pillow installed) tiles get PNG/JPEG and WebP srcsets.
+    
+    File records come from the asset catalog; rescan re-reads assets/
+    into it first. dirty is an optional list of the categories that
+    changed; the others are not even loaded when their cached section is
+    still available. catalog and records are passed on to collect_gallery.
+    """
+    print("🎨 Generating HTML gallery...")
+    
+    renderer = _renderer_digest()
+    cache = load_cache(GALLERY_CACHE) if use_cache else {}
+    
+    # Sections of clean categories, reused by key and count without a lookup
+    reusable = {}
+    if dirty is not None:
+        for category_name, info in cache.get('sections', {}).items():
+            if category_name in CATEGORIES and category_name not in dirty and info.get('renderer') == renderer \
+                    and os.path.exists(os.path.join(GALLERY_FRAGMENTS, f"{info['key']}.html")):
+                reusable[category_name] = info
+    
+    to_load = None if dirty is None else [name for name in CATEGORIES if name not in reusable]
+    scanned, files, derivatives = collect_gallery(use_cache, thumbnails, workers, to_load, rescan,
+                                                  catalog, records)
+    
+    sections = []
+    stats_html = ""
+    total_images = 0
+    section_cache = {}
+    
+    for category_name, category_data in CATEGORIES.items():
+        if category_name in reusable:
+            info = reusable[category_name]
+            total_images += info['count']
+            stats_html += render_category_stat(category_data, info['count'])
+            sections.append((category_data, None, info['key']))
+            section_cache[category_name] = info
+            continue
+        
+        images = scanned.get(category_name)
+        
+        if not images:
+            continue
+        
+        # Update total
+        total_images += len(images)
+        stats_html += render_category_stat(category_data, len(images))
+        
+        # Key the section on its files' content, derivatives and the category text
+        key_parts = [renderer, category_name, category_data['title'], category_data['description']]
+        for entry in images:
+            path = web_path(entry)
+            record = files[path]
+            key_parts.extend([path, record['size'], record['sha256'], record.get('url', ''),
+                              bool(record.get('placeholder'))])
+            key_parts.extend(output for _, _, output in derivatives.get(path, ()))
+        sections.append((category_data, images, hash_text(*key_parts)))
+        section_cache[category_name] = {'key': sections[-1][2], 'count': len(images), 'renderer': renderer}
     
     # Add total to stats
     stats_html = f'''
@@ -439,25 +736,246 @@ def generate_html_gallery():
     </div>
     ''' + stats_html
     
-    # Generate final HTML
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d at %H:%M:%S")
+    if reproducible:
+        build_id = hash_text(*(key for _, _, key in sections))
+        timestamp = f"build {build_id[:12]}"
+    else:
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d at %H:%M:%S")
+    
+    if use_cache:
+        os.makedirs(GALLERY_FRAGMENTS, exist_ok=True)
+    reused = 0
+    
+    def html_chunks():
+        nonlocal reused
+        yield TEMPLATE_HEAD.format(
+            total_images=total_images,
+            category_count=len(scanned) + len(reusable),
+            stats_html=stats_html
+        )
+        for category_data, images, section_key in sections:
+            fragment = os.path.join(GALLERY_FRAGMENTS, f'{section_key}.html')
+            if use_cache and os.path.exists(fragment):
+                reused += 1
+                yield from _iter_fragment(fragment)
+                continue
+            section = iter_category_section(category_data, images, files, derivatives)
+            yield from (_iter_and_save(section, fragment) if use_cache else section)
+        yield TEMPLATE_TAIL.format(timestamp=timestamp)
+    
+    # Stream the HTML file (left untouched when the bytes would not change);
+    # tile rendering inside it is reported separately as "render"
+    with run_report.phase('write'):
+        written = stream_write_if_changed(output_path, html_chunks())
+    run_report.count('images', total_images)
+    run_report.count('sections_reused', reused)
+    
+    if use_cache:
+        _prune_fragments({f'{key}.html' for _, _, key in sections})
+        save_cache(GALLERY_CACHE, {'sections': section_cache})
+    
+    if written:
+        print(f"✅ HTML gallery generated: {output_path} ({total_images} images)")
+    else:
+        print(f"✅ HTML gallery unchanged: {output_path} ({total_images} images)")
+    if reused:
+        print(f"   ♻️  Reused {reused} cached section(s)")
+    print(f"👉 Open {output_path} in your browser to view!")
+    
+    return written
+
+def _build_timestamp(reproducible, *key_parts):
+    """Footer timestamp, or a content fingerprint in reproducible mode"""
+    if reproducible:
+        return f"build {hash_text(*key_parts)[:12]}"
+    return datetime.datetime.now().strftime("%Y-%m-%d at %H:%M:%S")
+
+def _render_page_nav(page, pages):
+    """Previous/next links for one page of a category"""
+    prev_link = f'<a href="page-{page - 1}.html" rel="prev">← Previous</a>' if page > 1 else '<span></span>'
+    next_link = f'<a href="page-{page + 1}.html" rel="next">Next →</a>' if page < pages else '<span></span>'
+    return f'''
+        <nav class="page-nav">
+            {prev_link}
+            <span><a href="../index.html">All categories</a> • Page {page} of {pages}</span>
+            {next_link}
+        </nav>
+        '''
+
+def _shard_items(images, files):
+    """JSON entries for the images on one page"""
+    items = []
+    for entry in images:
+        path = web_path(entry)
+        record = files[path]
+        item = {
+            'name': entry.name,
+            'path': path,
+            'size': record['size'],
+            'width': record['width'],
+            'height': record['height']
+        }
+        if record.get('url'):
+            item['hashed_path'] = record['url']
+        items.append(item)
+    return items
+
+def _prune_pages(folder, keep):
+    """Remove page files left over from a category that shrank"""
+    try:
+        names = os.listdir(folder)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.startswith('page-') and name not in keep:
+            os.remove(os.path.join(folder, name))
+
+def generate_sharded_gallery(page_size=DEFAULT_PAGE_SIZE, output_dir=SHARD_OUTPUT_DIR, reproducible=False,
+                             use_cache=True, thumbnails=True, workers=DEFAULT_WORKERS, rescan=False):
+    """Generate one set of pages per category instead of a single gallery.html
+
+    Writes <output_dir>/<category>/page-N.html with prev/next links, a
+    page-N.json next to each page for client-side navigation, and an
+    index.html/index.json listing every category and its pages. Pages that
+    would not change are left untouched.
+    """
+    print("🎨 Generating sharded HTML gallery...")
+    
+    scanned, files, derivatives = collect_gallery(use_cache, thumbnails, workers, rescan=rescan)
+    renderer = _renderer_digest()
+    page_size = max(1, page_size)
+    
+    # Pages sit two levels below the site root
+    prefix = '../../'
+    
+    total_images = sum(len(images) for images in scanned.values())
+    stats_html = f'''
+    <div class="stat-item">
+        <span class="stat-number">{total_images}</span>
+        <span class="stat-label">Total Images</span>
+    </div>
+    ''' + ''.join(render_category_stat(CATEGORIES[name], len(images))
+              for name, images in scanned.items() if images)
+    
+    index = {'total': total_images, 'page_size': page_size, 'categories': {}}
+    index_html = ""
+    written = 0
+    page_count = 0
+    
+    for category_name, category_data in CATEGORIES.items():
+        images = scanned.get(category_name)
+        folder = f'{output_dir}/{category_name}'
+        
+        if not images:
+            _prune_pages(folder, set())
+            continue
+        
+        # Pages hold page_size images, keeping resolution variants together
+        groups = group_variants(images, web_path)
+        pages = (len(groups) + page_size - 1) // page_size
+        keep = set()
+        
+        for page in range(1, pages + 1):
+            page_images = [entry for group in groups[(page - 1) * page_size:page * page_size]
+                           for _, entry in group.variants]
+            items = _shard_items(page_images, files)
+            nav = _render_page_nav(page, pages)
+            timestamp = _build_timestamp(reproducible, renderer, category_name, page, pages,
+                                         *(files[item['path']]['sha256'] for item in items))
+            
+            def page_chunks():
+                yield TEMPLATE_HEAD.format(
+                    total_images=total_images,
+                    category_count=len(scanned),
+                    stats_html=stats_html
+                )
+                yield nav
+                yield from iter_category_section(category_data, page_images, files, derivatives, prefix)
+                yield nav
+                yield TEMPLATE_TAIL.format(timestamp=timestamp)
+            
+            page_json = {
+                'category': category_name,
+                'title': category_data['title'],
+                'page': page,
+                'pages': pages,
+                'total': len(images),
+                'root': prefix,
+                'html': f'page-{page}.html',
+                'prev': f'page-{page - 1}.json' if page > 1 else None,
+                'next': f'page-{page + 1}.json' if page < pages else None,
+                'items': items
+            }
+            
+            html_name, json_name = f'page-{page}.html', f'page-{page}.json'
+            keep.update((html_name, json_name))
+            with run_report.phase('write'):
+                written += stream_write_if_changed(f'{folder}/{html_name}', page_chunks())
+                written += write_if_changed(f'{folder}/{json_name}', json.dumps(page_json, separators=(',', ':')))
+            page_count += 1
+        
+        _prune_pages(folder, keep)
+        
+        index['categories'][category_name] = {
+            'title': category_data['title'],
+            'count': len(images),
+            'pages': pages,
+            'first': f'{category_name}/page-1.json'
+        }
+        page_links = ''.join(f'<a href="{category_name}/page-{page}.html">{page}</a>'
+                             for page in range(1, pages + 1))
+        index_html += f'''
+        <section class="category">
+            <div class="category-header">
+                <h2 class="category-title"><a href="{category_name}/page-1.html">{category_data['title']}</a></h2>
+                <div class="category-count">{len(images)} images</div>
+            </div>
+            <p class="category-description">{category_data['description']}</p>
+            <nav class="page-nav page-links">Pages: {page_links}</nav>
+        </section>
+        '''
     
-    html_content = HTML_TEMPLATE.format(
+    timestamp = _build_timestamp(reproducible, renderer, json.dumps(index, sort_keys=True))
+    index_page = TEMPLATE_HEAD.format(
         total_images=total_images,
-        category_count=len([c for c in CATEGORIES if os.path.exists(f'assets/{c}')]),
-        stats_html=stats_html,
-        categories_html=categories_html,
-        timestamp=timestamp
-    )
+        category_count=len(scanned),
+        stats_html=stats_html
+    ) + index_html + TEMPLATE_TAIL.format(timestamp=timestamp)
+    with run_report.phase('write'):
+        written += write_if_changed(f'{output_dir}/index.html', index_page)
+        written += write_if_changed(f'{output_dir}/index.json', json.dumps(index, separators=(',', ':')))
+    run_report.count('images', total_images)
+    run_report.count('pages', page_count)
     
-    # Write HTML file
-    with open('gallery.html', 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    print(f"✅ Sharded gallery: {page_count} page(s) in {output_dir}/ ({total_images} images, {written} file(s) updated)")
+    print(f"👉 Open {output_dir}/index.html in your browser to view!")
     
-    print(f"✅ HTML gallery generated: gallery.html ({total_images} images)")
-    print("👉 Open gallery.html in your browser to view!")
+    return written
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the HTML asset gallery")
+    parser.add_argument('--reproducible', action='store_true',
+                        help="leave the build timestamp out so unchanged assets give identical output")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore and do not update the build cache, reading assets/ from scratch")
+    parser.add_argument('--rescan', action='store_true',
+                        help="re-read assets/ into the asset catalog first (after editing it by hand)")
+    parser.add_argument('--no-thumbnails', action='store_true',
+                        help="point tiles at the original images only, with no thumbnails or placeholders")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"processes for thumbnail rendering (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--shard', action='store_true',
+                        help=f"write paginated per-category pages under {SHARD_OUTPUT_DIR}/ instead of gallery.html")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"images per page in sharded mode (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument('--compress', action='store_true',
+                        help="write .gz (and .br) siblings of the gallery and the other web files")
+    parser.add_argument('--serve', action='store_true',
+                        help="then serve the site locally with static_server.py (ETag, ranges, .br/.gz)")
+    parser.add_argument('--port', type=int, default=None, help="port for --serve (default: 8000)")
+    run_report.add_arguments(parser)
+    args = parser.parse_args(argv)
+    
     print("=" * 50)
     print("🎨 MARVEL GALLERY GENERATOR")
     print("=" * 50)
@@ -468,7 +986,26 @@ def main():
         print("👉 Please run organizer.py first to organize your images")
         return
     
-    generate_html_gallery()
+    if not args.no_thumbnails and not thumbnails_available():
+        print("ℹ️  Pillow not installed - tiles will use the original images")
+    
+    with run_report.instrumented(args, 'gallery_generator'):
+        if args.shard:
+            generate_sharded_gallery(page_size=args.page_size, reproducible=args.reproducible,
+                                     use_cache=not args.no_cache, thumbnails=not args.no_thumbnails,
+                                     workers=args.workers, rescan=args.rescan)
+        else:
+            generate_html_gallery(reproducible=args.reproducible, use_cache=not args.no_cache,
+                                  thumbnails=not args.no_thumbnails, workers=args.workers, rescan=args.rescan)
+        if args.compress:
+            from precompress import compress_outputs
+            compress_outputs(workers=args.workers, use_cache=not args.no_cache)
+    
+    if args.serve:
+        import static_server
+        print()
+        static_server.run(port=static_server.DEFAULT_PORT if args.port is None else args.port,
+                          page=f'{SHARD_OUTPUT_DIR}/index.html' if args.shard else GALLERY_OUTPUT)
 
 if __name__ == "__main__":
     main()
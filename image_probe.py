@@ -0,0 +1,89 @@
+# image_probe.py
+import struct
+
+# Enough for PNG, GIF and WebP headers; JPEG is scanned segment by segment
+HEADER_SIZE = 32
+
+# JPEG start-of-frame markers that carry the image size (not DHT/JPG/DAC)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def _png_size(head):
+    # Signature, IHDR length and type, then width/height as big-endian uint32
+    if head[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', head[16:24])
+
+def _gif_size(head):
+    return struct.unpack('<HH', head[6:10])
+
+def _webp_size(head):
+    chunk = head[12:16]
+    if chunk == b'VP8 ':
+        # Lossy: 14-bit width/height after the frame start code
+        if head[23:26] != b'\x9d\x01\x2a':
+            return None
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L':
+        # Lossless: 14-bit (width - 1) and (height - 1) packed after 0x2F
+        if head[20] != 0x2F:
+            return None
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        # Extended: 24-bit (canvas width - 1) and (canvas height - 1)
+        return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+    return None
+
+def _jpeg_size(f):
+    """Walk JPEG marker segments until a start-of-frame marker"""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        # Skip fill bytes before the marker
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker == 0xD9 or marker == 0xDA:
+            # End of image or start of scan before any frame header
+            return None
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            # Standalone markers without a length field
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            return width, height
+        f.seek(length - 2, 1)
+        if f.read(1) != b'\xff':
+            return None
+
+def image_size(path):
+    """Read (width, height) from an image header without decoding pixels
+
+    Supports PNG, JPEG, GIF and WebP. Returns None when the format is not
+    recognised or the header is truncated.
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(HEADER_SIZE)
+            if head.startswith(b'\x89PNG\r\n\x1a\n') and len(head) >= 24:
+                return _png_size(head)
+            if head[:6] in (b'GIF87a', b'GIF89a') and len(head) >= 10:
+                return _gif_size(head)
+            if head[:4] == b'RIFF' and head[8:12] == b'WEBP' and len(head) >= 30:
+                return _webp_size(head)
+            if head[:2] == b'\xff\xd8':
+                return _jpeg_size(f)
+    except (OSError, struct.error):
+        return None
+    return None
@@ -51,6 +51,14 @@ const IMAGE_CONFIG = {
         infinityGauntlet: 'assets/ui/infinity-gauntlet.png',
         heroBackground: 'assets/ui/hero-bg.png',
         thanosBackground: 'assets/ui/thanos-bg.png'
+    },
+    
+    // Load order per group when assets/boot.json does not list an image:
+    // critical ones are waited for, the rest load after the board appears
+    bootTiers: {
+        ui: 'critical',
+        cards: 'gameplay',
+        tokens: 'gameplay'
     }
 };
 
@@ -28,12 +28,161 @@ class AssetLoader {
         this.loadedImages = {};
         this.failedImages = [];
         
+        // Known pixel sizes by path (from assets/manifest.json)
+        this.dimensions = {};
+        
+        // Fingerprinted URLs by logical path (from assets/manifest.json)
+        this.urls = {};
+        
+        // Blurred previews and dominant colors by logical path (from
+        // assets/manifest.json), shown until the real image arrives
+        this.placeholders = {};
+        this.manifestLoaded = false;
+        
+        // Boot tier by logical path (from assets/boot.json); without a plan
+        // every asset is critical and loadAll waits for all of them
+        this.tiers = {};
+        this.bootPlan = null;
+        
+        // Whether the boot atlas (assets/atlas/boot.json) provided frames
+        this.atlasLoaded = false;
+        
+        // Resolves once the gameplay and deferred tiers finished loading
+        this.backgroundLoad = Promise.resolve(true);
+        
+        // Called with (tier, success) as each tier finishes
+        this.onTierLoaded = null;
+        
         // Progress callback
         this.onProgress = null;
         
         console.log('🎮 AssetLoader initialized with', this.countAssets(), 'assets');
     }
     
+    // Record image sizes from manifest entries so canvases can be sized
+    // before the image bytes arrive (every variant of a grouped entry)
+    useManifest(entries) {
+        for (const entry of entries) {
+            if (entry.placeholder) {
+                for (const variant of entry.variants || [entry]) {
+                    this.placeholders[variant.path] = entry.placeholder;
+                }
+            }
+        }
+        for (const entry of entries.flatMap(entry => entry.variants || [entry])) {
+            if (entry.width && entry.height) {
+                this.dimensions[entry.path] = { width: entry.width, height: entry.height };
+            }
+            if (entry.hashed_path) {
+                this.urls[entry.path] = entry.hashed_path;
+            }
+        }
+    }
+    
+    // URL to fetch for a logical asset path (the fingerprinted copy if published)
+    resolveUrl(path) {
+        return this.urls[path] || path;
+    }
+    
+    // Fetch the manifest index, then only the category files we need
+    // (all categories when none are given)
+    async loadManifest(categories = null, url = 'assets/manifest.json') {
+        try {
+            const response = await fetch(url);
+            if (!response.ok) return false;
+            const index = await response.json();
+            
+            const wanted = Object.entries(index.categories || {})
+                .filter(([name]) => !categories || categories.includes(name));
+            
+            await Promise.all(wanted.map(async ([name, info]) => {
+                const categoryResponse = await fetch(`${info.path}?v=${info.hash}`);
+                if (categoryResponse.ok) {
+                    this.useManifest(await categoryResponse.json());
+                }
+            }));
+            this.manifestLoaded = true;
+            return true;
+        } catch (error) {
+            console.warn('⚠️ Asset manifest not available:', error);
+            return false;
+        }
+    }
+    
+    // Load a texture atlas built by atlas_builder.py and cut its frames out
+    // under the same keys loadAll uses, so those assets need no request of
+    // their own. Resolves false, quietly, when no atlas was built.
+    async loadAtlas(url = 'assets/atlas/boot.json') {
+        try {
+            const response = await fetch(url);
+            if (!response.ok) return false;
+            const atlas = await response.json();
+            
+            const sheets = await Promise.all(atlas.meta.images.map(src => new Promise((resolve, reject) => {
+                const img = new Image();
+                img.onload = () => resolve(img);
+                img.onerror = () => reject(new Error(`Failed to load atlas image ${src}`));
+                img.src = src;
+            })));
+            
+            for (const [name, frame] of Object.entries(atlas.frames)) {
+                const canvas = document.createElement('canvas');
+                canvas.width = frame.w;
+                canvas.height = frame.h;
+                canvas.getContext('2d').drawImage(
+                    sheets[frame.image], frame.x, frame.y, frame.w, frame.h, 0, 0, frame.w, frame.h);
+                this.loadedImages[name] = {
+                    image: canvas,
+                    path: frame.source,
+                    category: frame.category,
+                    width: frame.w,
+                    height: frame.h,
+                    fromAtlas: true
+                };
+            }
+            this.atlasLoaded = true;
+            console.log(`🧩 Atlas loaded: ${Object.keys(atlas.frames).length} frames`);
+            return true;
+        } catch (error) {
+            console.warn('⚠️ Atlas not available, loading images individually:', error);
+            return false;
+        }
+    }
+    
+    // Fetch the tiered load list written by the manifest step
+    async loadBootPlan(url = 'assets/boot.json') {
+        try {
+            const response = await fetch(url);
+            if (!response.ok) return false;
+            this.bootPlan = await response.json();
+            
+            // Every resolution variant of an asset shares its tier
+            for (const [tier, info] of Object.entries(this.bootPlan.tiers)) {
+                for (const asset of info.assets.flatMap(asset => asset.variants || [asset])) {
+                    this.tiers[asset.path] = tier;
+                    if (asset.url !== asset.path) {
+                        this.urls[asset.path] = asset.url;
+                    }
+                }
+            }
+            return true;
+        } catch (error) {
+            console.warn('⚠️ Boot plan not available, loading everything up front:', error);
+            return false;
+        }
+    }
+    
+    // Boot tier of an asset path; assets the plan does not list load with gameplay
+    tierOf(path) {
+        if (!this.bootPlan) return 'critical';
+        return this.tiers[path] || 'gameplay';
+    }
+    
+    // Get the expected size of an asset before it loads
+    getDimensions(path) {
+        return this.dimensions[path] || null;
+    }
+    
     // Count total assets
     countAssets() {
         let count = 0;
@@ -43,50 +192,120 @@ class AssetLoader {
         return count;
     }
     
-    // Load all assets
+    // Load the critical tier, then the rest in the background
+    //
+    // Resolves as soon as everything the first screen needs is there, so
+    // the board can appear while gameplay assets are still arriving;
+    // deferred assets wait until the browser is idle. The atlas is only
+    // fetched after the critical tier, so it never holds up the board;
+    // later assets it holds need no request of their own. backgroundLoad
+    // resolves when all tiers are done.
     async loadAll() {
-        console.log('🔄 Loading all assets...');
+        await Promise.all([
+            this.bootPlan ? null : this.loadBootPlan(),
+            this.manifestLoaded ? null : this.loadManifest(Object.keys(this.assets))
+        ]);
+        
+        const tiers = { critical: [], gameplay: [], deferred: [] };
+        for (const [category, categoryAssets] of Object.entries(this.assets)) {
+            for (const [name, path] of Object.entries(categoryAssets)) {
+                tiers[this.tierOf(path)].push({ name, path, category });
+                this.usePlaceholder(name, path, category);
+            }
+        }
+        
+        console.log(`🔄 Loading ${tiers.critical.length} critical assets ` +
+                    `(${tiers.gameplay.length} gameplay, ${tiers.deferred.length} deferred later)...`);
+        
+        const success = await this.loadTier('critical', tiers.critical, true);
+        
+        this.backgroundLoad = (this.atlasLoaded ? Promise.resolve(true) : this.loadAtlas())
+            .then(() => this.loadTier('gameplay', tiers.gameplay))
+            .then(gameplay => this.whenIdle().then(() => this.loadTier('deferred', tiers.deferred))
+                .then(deferred => gameplay && deferred));
         
-        const totalAssets = this.countAssets();
+        console.log(success ? '✅ Critical assets loaded' : '⚠️ Some critical assets failed');
+        return success;
+    }
+    
+    // Load one tier's assets in parallel; with progress, report to onProgress
+    async loadTier(tier, items, progress = false) {
         let loadedCount = 0;
+        const step = () => {
+            loadedCount++;
+            if (progress && this.onProgress) {
+                this.onProgress(loadedCount, items.length);
+            }
+        };
         
-        // Update progress
-        if (this.onProgress) {
-            this.onProgress(loadedCount, totalAssets);
+        if (progress && this.onProgress) {
+            this.onProgress(0, items.length);
         }
         
-        // Load assets by category
-        const categories = Object.keys(this.assets);
-        let allSuccess = true;
-        
-        for (const category of categories) {
-            console.log(`📦 Loading ${category}...`);
-            
-            const assetPromises = [];
-            const categoryAssets = this.assets[category];
-            
-            for (const [name, path] of Object.entries(categoryAssets)) {
-                assetPromises.push(
-                    this.loadSingleAsset(name, path, category)
-                        .then(success => {
-                            loadedCount++;
-                            if (this.onProgress) {
-                                this.onProgress(loadedCount, totalAssets);
-                            }
-                            if (!success) {
-                                allSuccess = false;
-                            }
-                            return success;
-                        })
-                );
+        const results = await Promise.all(items.map(({ name, path, category }) => {
+            // Already provided by an atlas
+            if (this.loadedImages[name] && this.loadedImages[name].fromAtlas) {
+                step();
+                return true;
             }
-            
-            // Wait for category to load
-            await Promise.all(assetPromises);
+            return this.loadSingleAsset(name, path, category).then(success => {
+                step();
+                return success;
+            });
+        }));
+        
+        const success = results.every(Boolean);
+        if (items.length) {
+            console.log(`📦 ${tier}: ${items.length} assets${success ? '' : ' (some failed)'}`);
+        }
+        if (this.onTierLoaded) {
+            this.onTierLoaded(tier, success);
         }
+        return success;
+    }
+    
+    // Stand in for an asset that has not arrived yet with its manifest
+    // placeholder: the tiny preview scaled up over the dominant color,
+    // at the asset's full size so layout does not shift when it loads
+    usePlaceholder(name, path, category) {
+        const placeholder = this.placeholders[path];
+        if (!placeholder || this.loadedImages[name]) return;
+        
+        const expected = this.getDimensions(path) || { width: 200, height: 200 };
+        const canvas = document.createElement('canvas');
+        canvas.width = expected.width;
+        canvas.height = expected.height;
+        const ctx = canvas.getContext('2d');
+        ctx.fillStyle = placeholder.color;
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+        
+        const preview = new Image();
+        preview.onload = () => {
+            ctx.imageSmoothingQuality = 'high';
+            ctx.drawImage(preview, 0, 0, canvas.width, canvas.height);
+        };
+        preview.src = placeholder.lqip;
         
-        console.log(allSuccess ? '✅ All assets loaded' : '⚠️ Some assets failed');
-        return allSuccess;
+        this.loadedImages[name] = {
+            image: canvas,
+            path: path,
+            category: category,
+            width: expected.width,
+            height: expected.height,
+            color: placeholder.color,
+            isPlaceholder: true
+        };
+    }
+    
+    // Resolve when the browser has nothing more urgent to do
+    whenIdle() {
+        return new Promise(resolve => {
+            if (typeof requestIdleCallback === 'function') {
+                requestIdleCallback(() => resolve(), { timeout: 2000 });
+            } else {
+                setTimeout(resolve, 200);
+            }
+        });
     }
     
     // Load single image asset
@@ -112,12 +331,13 @@ class AssetLoader {
                 
                 // Create fallback graphic
                 const fallback = this.createFallbackGraphic(name, category);
+                const expected = this.getDimensions(path);
                 this.loadedImages[name] = {
                     image: fallback,
                     path: path,
                     category: category,
-                    width: 200,
-                    height: 200,
+                    width: expected ? expected.width : 200,
+                    height: expected ? expected.height : 200,
                     isFallback: true
                 };
                 
@@ -125,7 +345,7 @@ class AssetLoader {
             };
             
             // Set source (this starts loading)
-            img.src = path;
+            img.src = this.resolveUrl(path);
             
             // Add timeout for very slow loads
             setTimeout(() => {
@@ -215,7 +435,14 @@ class AssetLoader {
     
     // Check if image loaded successfully
     isLoaded(name) {
-        return !!this.loadedImages[name];
+        const asset = this.loadedImages[name];
+        return !!asset && !asset.isPlaceholder;
+    }
+    
+    // Check if image is still the placeholder standing in for it
+    isPlaceholder(name) {
+        const asset = this.loadedImages[name];
+        return asset ? !!asset.isPlaceholder : false;
     }
     
     // Check if image is fallback
@@ -5,33 +5,83 @@ class ImageManager {
         this.images = new Map();
         this.loaded = false;
         this.loadingPromises = [];
+        
+        // Boot tier by image path, from assets/boot.json when present
+        this.tiers = {};
+        
+        // Resolves once the gameplay and deferred tiers finished loading
+        this.backgroundLoad = Promise.resolve(true);
+    }
+    
+    // Read image tiers from the load list the manifest step writes
+    async loadBootPlan(url = 'assets/boot.json') {
+        try {
+            const response = await fetch(url);
+            if (!response.ok) return false;
+            const plan = await response.json();
+            // Every resolution variant of an image shares its tier
+            for (const [tier, info] of Object.entries(plan.tiers)) {
+                for (const asset of info.assets.flatMap(asset => asset.variants || [asset])) {
+                    this.tiers[asset.path] = tier;
+                }
+            }
+            return true;
+        } catch (error) {
+            console.warn('Boot plan not available, using IMAGE_CONFIG.bootTiers:', error);
+            return false;
+        }
     }
     
-    // Preload all images
-    async preloadImages() {
+    // Boot tier of an image: the load list first, then its IMAGE_CONFIG group
+    tierOf(path, group) {
+        return this.tiers[path] || (IMAGE_CONFIG.bootTiers || {})[group] || 'critical';
+    }
+    
+    // Preload the critical images; gameplay and deferred ones follow in
+    // the background so the board can render without waiting for them
+    async preloadImages(onProgress = null) {
         console.log('Starting image preload...');
         
-        const imagesToLoad = [];
+        await this.loadBootPlan();
         
-        // Load card images
-        for (const [cardName, path] of Object.entries(IMAGE_CONFIG.cards)) {
-            imagesToLoad.push(this.loadImage(cardName, path));
-        }
-        
-        // Load other assets
-        for (const [tokenName, path] of Object.entries(IMAGE_CONFIG.tokens)) {
-            imagesToLoad.push(this.loadImage(`token_${tokenName}`, path));
+        const tiers = { critical: [], gameplay: [], deferred: [] };
+        const groups = [
+            ['cards', ''],
+            ['tokens', 'token_'],
+            ['ui', 'ui_']
+        ];
+        for (const [group, prefix] of groups) {
+            for (const [name, path] of Object.entries(IMAGE_CONFIG[group])) {
+                tiers[this.tierOf(path, group)].push([`${prefix}${name}`, path]);
+            }
         }
         
-        for (const [uiName, path] of Object.entries(IMAGE_CONFIG.ui)) {
-            imagesToLoad.push(this.loadImage(`ui_${uiName}`, path));
-        }
+        let done = 0;
+        const critical = tiers.critical.map(([key, path]) => this.loadImage(key, path).then(img => {
+            done++;
+            if (onProgress) {
+                const progress = Math.round(5 + 90 * done / tiers.critical.length);
+                onProgress(progress, `Loading images... ${done}/${tiers.critical.length}`);
+            }
+            return img;
+        }));
         
         try {
-            await Promise.all(imagesToLoad);
+            const images = await Promise.all(critical);
             this.loaded = true;
-            console.log('All images loaded successfully!');
-            return true;
+            console.log(`Critical images loaded (${tiers.gameplay.length} gameplay, ` +
+                        `${tiers.deferred.length} deferred still loading)`);
+            
+            const loadTier = items => Promise.all(items.map(([key, path]) => this.loadImage(key, path)));
+            this.backgroundLoad = loadTier(tiers.gameplay)
+                .then(() => new Promise(resolve => setTimeout(resolve, 0)))
+                .then(() => loadTier(tiers.deferred))
+                .then(() => {
+                    console.log('All images loaded successfully!');
+                    return true;
+                });
+            
+            return !images.some(img => img.isFallback);
         } catch (error) {
             console.warn('Some images failed to load:', error);
             // Continue anyway with fallback images
@@ -294,6 +294,13 @@ class InfinityGauntletGame {
         if (this.gameBoard) {
             this.gameBoard.render();
             console.log('Game board rendered');
+            
+            // Swap in card art from the tiers still loading in the background
+            imageManager.backgroundLoad.then(() => {
+                if (this.gameBoard) {
+                    this.gameBoard.render();
+                }
+            });
         }
         
         // Add game start log entries
@@ -0,0 +1,123 @@
+# manifest_writer.py
+import os
+import json
+import hashlib
+
+from build_cache import write_if_changed, stream_write_if_changed
+
+# Compact root index: one small entry per category
+MANIFEST_PATH = 'assets/manifest.json'
+
+# One JSON array per category, fetched on demand
+MANIFEST_DIR = 'assets/manifest'
+
+# Optional newline-delimited stream of every entry
+NDJSON_PATH = 'assets/manifest.ndjson'
+
+# 3: resolution variants are grouped into one entry with a srcset
+MANIFEST_VERSION = 3
+
+def compact_json(data):
+    """Serialize without whitespace"""
+    return json.dumps(data, separators=(',', ':'))
+
+def _category_record(path, entries, content):
+    """Root index record for one category file"""
+    return {
+        'path': path,
+        'count': len(entries),
+        'bytes': sum(sum(variant['size'] for variant in entry['variants']) if 'variants' in entry
+                     else entry.get('size', 0) for entry in entries),
+        'hash': hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+    }
+
+def write_manifest(categories, last_updated=None, ndjson=False, extra=None,
+                   manifest_path=MANIFEST_PATH, manifest_dir=MANIFEST_DIR, ndjson_path=NDJSON_PATH):
+    """Write the split manifest for a dict of category -> list of entries
+
+    Each category goes to its own compact file under manifest_dir, and the
+    root index lists them with their count, total bytes and a content hash
+    clients can use for cache busting. With ndjson, every entry is also
+    streamed one per line to ndjson_path. All files are written atomically
+    and left untouched when unchanged; the root index is written last so it
+    never points at a category file that is not there yet.
+    Returns the root index.
+    """
+    index = {'version': MANIFEST_VERSION, 'last_updated': last_updated, 'categories': {}}
+    if extra:
+        index.update(extra)
+
+    for category, entries in categories.items():
+        content = compact_json(entries)
+        path = f'{manifest_dir}/{category}.json'
+        write_if_changed(path, content)
+        index['categories'][category] = _category_record(path, entries, content)
+
+    # Category files from categories that no longer exist
+    keep = {f'{category}.json' for category in categories}
+    for name in os.listdir(manifest_dir) if os.path.isdir(manifest_dir) else ():
+        if name.endswith('.json') and name not in keep:
+            os.remove(os.path.join(manifest_dir, name))
+
+    if ndjson:
+        lines = (compact_json(entry) + '\n' for entries in categories.values() for entry in entries)
+        stream_write_if_changed(ndjson_path, lines)
+        index['ndjson'] = ndjson_path
+
+    write_if_changed(manifest_path, compact_json(index))
+    return index
+
+def update_manifest(categories, last_updated=None, manifest_path=MANIFEST_PATH, manifest_dir=MANIFEST_DIR):
+    """Patch an existing split manifest with new entries for some categories
+
+    Only the given category files and the root index are rewritten; other
+    categories keep their files and index records. The NDJSON stream, if
+    the index has one, is rebuilt from the category files. Returns the
+    root index, or None when there is no valid manifest to patch yet.
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != MANIFEST_VERSION:
+        return None
+
+    for category, entries in categories.items():
+        content = compact_json(entries)
+        path = f'{manifest_dir}/{category}.json'
+        write_if_changed(path, content)
+        index['categories'][category] = _category_record(path, entries, content)
+    index['last_updated'] = last_updated
+
+    ndjson_path = index.get('ndjson')
+    if ndjson_path:
+        def lines():
+            for category, info in index['categories'].items():
+                if category in categories:
+                    entries = categories[category]
+                else:
+                    with open(info['path'], 'r', encoding='utf-8') as f:
+                        entries = json.load(f)
+                for entry in entries:
+                    yield compact_json(entry) + '\n'
+        stream_write_if_changed(ndjson_path, lines())
+
+    write_if_changed(manifest_path, compact_json(index))
+    return index
+
+def read_manifest(manifest_path=MANIFEST_PATH, categories=None):
+    """Load the root index and the requested categories (all by default)
+
+    Returns a dict of category -> list of entries.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+
+    result = {}
+    for category, info in index.get('categories', {}).items():
+        if categories is not None and category not in categories:
+            continue
+        with open(info['path'], 'r', encoding='utf-8') as f:
+            result[category] = json.load(f)
+    return result
@@ -1,32 +1,31 @@
 # organize.py
 import os
-import shutil
+import argparse
 from pathlib import Path
-import json
 
-print("🎮 INFINITY GAUNTLET ORGANIZER")
-print("=" * 50)
+import run_report
+from asset_scanner import scan_images, walk_images, glob_matcher
+from asset_categories import CATEGORIES, CORE_CATEGORIES, MISC_CATEGORY
+from asset_catalog import open_catalog
+from asset_classifier import KeywordClassifier
+from asset_naming import NameIndex
+from asset_variants import group_variants, highest_densities, is_variant_group, missing_densities, density_srcset
+from asset_publish import publish_assets
+from boot_tiers import BOOT_PLAN_PATH, write_boot_plan
+from placeholders import build_placeholders
+from build_cache import write_if_changed
+from manifest_writer import MANIFEST_PATH, MANIFEST_DIR, NDJSON_PATH, write_manifest, update_manifest
+from asset_relocator import DEFAULT_WORKERS, relocate, failed_sources, print_relocation_report
+from asset_dedupe import DEDUPE_POLICIES, DEFAULT_DEDUPE_POLICY, DuplicateFinder, link_duplicates, print_dedupe_report
 
 # Configuration for GitHub Pages
 IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif')
 
-CATEGORIES = {
-    'characters': {
-        'keywords': ['thanos', 'proxima', 'ebony', 'corvus', 'black-dwarf'],
-        'title': 'Characters',
-        'description': 'Thanos and the Black Order'
-    },
-    'stones': {
-        'keywords': ['power', 'time', 'mind', 'reality', 'space', 'soul'],
-        'title': 'Infinity Stones',
-        'description': 'The six Infinity Stones'
-    },
-    'enemies': {
-        'keywords': ['outriders'],
-        'title': 'Enemies',
-        'description': 'Thanos\' forces'
-    }
-}
+# Compiled once from CATEGORIES; unmatched files stay in root
+CLASSIFIER = KeywordClassifier(CATEGORIES)
+
+# Generated or site folders a recursive scan never treats as drops
+OUTPUT_DIRS = ('assets', 'gallery', 'js', 'css')
 
 def create_folder_structure():
     """Create the folder structure for GitHub Pages"""
@@ -47,102 +46,353 @@ def create_folder_structure():
     
     return True
 
-def organize_images():
-    """Organize images into correct folders"""
-    print("\n🔄 Organizing images...")
-    
-    stats = {category: 0 for category in CATEGORIES.keys()}
+def empty_stats():
+    """Per-category counters as organize_images reports them"""
+    stats = {category: 0 for category in CORE_CATEGORIES}
     stats['other'] = 0
+    stats['duplicates'] = 0
+    return stats
+
+def scan_drops(recursive=False, include=(), exclude=()):
+    """Batches of image files dropped into the root, as os.DirEntry objects
+
+    Without recursive the root is listed in one scandir pass (one directory
+    listing for every extension). With it, the folders below are walked in
+    parallel too (except OUTPUT_DIRS) and each folder's batch is yielded as
+    soon as it is listed. include/exclude are globs on the relative path.
+    """
+    if recursive:
+        yield from walk_images('.', IMAGE_EXTENSIONS, include, exclude, skip=OUTPUT_DIRS)
+        return
     
-    # Get all image files
-    image_files = []
-    for ext in IMAGE_EXTENSIONS:
-        image_files.extend([f for f in os.listdir('.') if f.lower().endswith(ext)])
+    included = glob_matcher(include)
+    excluded = glob_matcher(exclude)
+    entries = [entry for entry in scan_images('.', IMAGE_EXTENSIONS)
+               if (not included or included(entry.name)) and not (excluded and excluded(entry.name))]
+    if entries:
+        yield entries
+
+def _timed_batches(batches):
+    """Account the time spent waiting for each batch to the scan phase"""
+    batches = iter(batches)
+    while True:
+        with run_report.phase('scan'):
+            batch = next(batches, None)
+        if batch is None:
+            return
+        yield batch
+
+def classify_drops(batches):
+    """Classify scanned batches as they arrive; returns (entries, categories) in path order"""
+    # One pass over the compiled keywords per batch, overlapping the scan
+    with run_report.phase('classify'):
+        entries, categories = CLASSIFIER.classify_entries(_timed_batches(batches))
+    run_report.count('files_scanned', len(entries))
+    return entries, categories
+
+def organize_images(workers=DEFAULT_WORKERS, dedupe=DEFAULT_DEDUPE_POLICY, catalog=None,
+                    recursive=False, include=(), exclude=()):
+    """Organize images into correct folders (and their catalog rows, when given a catalog)
+
+    With recursive, images in folders below the root are picked up too
+    (see scan_drops); the folders themselves are left in place.
+    """
+    print("\n🔄 Organizing images...")
     
-    if not image_files:
+    entries, categories = classify_drops(scan_drops(recursive, include, exclude))
+    if not entries:
         print("  No image files found in current directory")
-        return stats
+        return empty_stats()
     
-    print(f"  Found {len(image_files)} image file(s)")
-    
-    for filename in image_files:
-        category_found = False
-        
-        # Check each category
-        for category, data in CATEGORIES.items():
-            for keyword in data['keywords']:
-                if keyword in filename.lower():
-                    # Move to category folder
-                    source = filename
-                    destination = f'assets/{category}/{filename}'
-                    
-                    # Handle duplicates
-                    if os.path.exists(destination):
-                        name, ext = os.path.splitext(filename)
-                        counter = 1
-                        while os.path.exists(f'assets/{category}/{name}_{counter}{ext}'):
-                            counter += 1
-                        destination = f'assets/{category}/{name}_{counter}{ext}'
-                    
-                    shutil.move(source, destination)
-                    stats[category] += 1
-                    print(f"  📦 {filename:25} → assets/{category}/")
-                    category_found = True
-                    break
-            
-            if category_found:
-                break
-        
-        # If no category found, move to other
-        if not category_found:
-            # Keep in root if it might be important
-            print(f"  ⚠️  {filename:25} → (kept in root - not categorized)")
-            stats['other'] += 1
+    print(f"  Found {len(entries)} image file(s)")
     
+    stats, _ = move_images(entries, categories, workers, dedupe, catalog)
     return stats
 
-def create_asset_manifest():
-    """Create a JSON manifest of all assets for the game"""
-    print("\n📝 Creating asset manifest...")
+def move_images(entries, categories, workers=DEFAULT_WORKERS, dedupe=DEFAULT_DEDUPE_POLICY, catalog=None):
+    """Move classified entries into their asset folders
+
+    Returns (stats, touched): the organize_images counters and the set of
+    categories that gained files.
+    """
+    stats = empty_stats()
+    names = NameIndex()
+    dupes = DuplicateFinder(IMAGE_EXTENSIONS)
     
-    manifest = {
-        'characters': [],
-        'stones': [],
-        'enemies': [],
-        'last_updated': None
+    # Build the full move plan first
+    plan = []
+    planned_categories = []
+    planned_sizes = []
+    links = []
+    duplicate_sizes = {}
+    with run_report.phase('plan'):
+        for entry, category in zip(entries, categories):
+            filename = entry.name
+            source = os.path.normpath(entry.path)
+            
+            # If no category found, keep in root if it might be important
+            if category is None:
+                stats['other'] += 1
+                continue
+            
+            folder = f'assets/{category}'
+            size = entry.stat().st_size
+            
+            # Same bytes already in the folder (or on their way there)?
+            if dedupe != 'keep-both':
+                original = dupes.find(folder, source, size)
+                if original is not None:
+                    duplicate_sizes[source] = size
+                    if dedupe == 'hardlink':
+                        links.append((source, names.claim(folder, filename), original))
+                    continue
+            
+            # Move to category folder (duplicates get the next free name_N)
+            destination = names.claim(folder, filename)
+            dupes.add(folder, destination, source, size)
+            plan.append((source, destination))
+            planned_categories.append(category)
+            planned_sizes.append(size)
+    
+    with run_report.phase('move'):
+        result = relocate(plan, workers)
+        _, link_failures = link_duplicates(links)
+    failed = failed_sources(result)
+    for (source, _), category in zip(plan, planned_categories):
+        if source not in failed:
+            stats[category] += 1
+    run_report.count('files_moved', len(plan) - len(failed))
+    run_report.count('bytes_moved', sum(size for (source, _), size in zip(plan, planned_sizes)
+                                        if source not in failed))
+    
+    for source, _, _ in link_failures:
+        del duplicate_sizes[source]
+    stats['duplicates'] = len(duplicate_sizes)
+    run_report.count('duplicates', len(duplicate_sizes))
+    
+    # Only the files that landed in assets/ need new catalog rows
+    if catalog is not None:
+        link_failed = {source for source, _, _ in link_failures}
+        with run_report.phase('catalog'):
+            catalog.refresh([destination for source, destination in plan if source not in failed] +
+                            [destination for source, destination, _ in links if source not in link_failed])
+    
+    for category in CORE_CATEGORIES:
+        if stats[category]:
+            print(f"  📦 {stats[category]:5} file(s) → assets/{category}/")
+    if stats['other']:
+        print(f"  ⚠️  {stats['other']:5} file(s) kept in root - not categorized")
+    print_relocation_report(result)
+    print_dedupe_report(dedupe, len(duplicate_sizes), sum(duplicate_sizes.values()), link_failures)
+    
+    touched = {category for category in CORE_CATEGORIES if stats[category]}
+    touched.update(destination.split('/')[1] for source, destination, _ in links if source in duplicate_sizes)
+    return stats, touched
+
+def _file_entry(record):
+    """Manifest fields of one catalogued file"""
+    file_info = {
+        'name': os.path.splitext(record.name)[0],
+        'filename': record.name,
+        'path': record.path,
+        'size': record.size,
+        'category': record.category
     }
     
+    # Dimensions were read from the file header when it was catalogued
+    if record.width:
+        file_info['width'], file_info['height'] = record.width, record.height
+    if record.hashed_path:
+        file_info['hashed_path'] = record.hashed_path
+    return file_info
+
+def manifest_entries(records, placeholders=None):
+    """Manifest entries for the catalog rows of one category
+
+    Resolution variants (name@1x.png, name@3x.png) become one entry named
+    after their base, with a density srcset, every variant and the
+    required densities that have no file yet. Its own path and size are
+    the lowest density's, so a plain src fetches the fewest bytes.
+    placeholders (path -> {color, lqip}) adds each image's stand-in.
+    """
+    placeholders = placeholders or {}
+    result = []
+    for group in group_variants(records):
+        placeholder = placeholders.get(group.variants[-1][1].path)
+        variants = [dict(_file_entry(record), density=density) for density, record in group.variants]
+        if not is_variant_group(group):
+            entry = _file_entry(group.variants[0][1])
+            if placeholder:
+                entry['placeholder'] = placeholder
+            result.append(entry)
+            continue
+        entry = {key: value for key, value in variants[0].items() if key != 'density'}
+        entry['name'] = group.base
+        entry['srcset'] = density_srcset(group, lambda record: record.hashed_path or record.path)
+        entry['variants'] = variants
+        missing = missing_densities(group)
+        if missing:
+            entry['missing_densities'] = missing
+        if placeholder:
+            entry['placeholder'] = placeholder
+        result.append(entry)
+    return result
+
+def manifest_placeholders(records, prune=False):
+    """Placeholders (path -> {color, lqip}) for the rows of some categories"""
+    with run_report.phase('placeholders'):
+        return build_placeholders([(record.path, record.sha256) for rows in records.values()
+                                   for record in highest_densities(rows)], prune=prune)
+
+def print_missing_densities(manifest):
+    """List the variant groups (category -> entries) that lack a required density"""
+    missing = [(entry, category) for category, entries in manifest.items() for entry in entries
+               if entry.get('missing_densities')]
+    run_report.count('missing_densities', sum(len(entry['missing_densities']) for entry, _ in missing))
+    if not missing:
+        return
+    print(f"  🔍 {len(missing)} image(s) missing densities (generate these):")
+    for entry, category in missing:
+        have = ', '.join(f"{variant['density']:g}x" for variant in entry['variants'])
+        print(f"     - {category}/{entry['name']}: needs {', '.join(entry['missing_densities'])} (has {have})")
+
+def catalog_records(catalog, categories, publish=False):
+    """Catalog rows per category, published first when asked to"""
+    records = {category: catalog.entries(category) for category in categories}
+    if publish:
+        with run_report.phase('publish'):
+            catalog.set_hashed_paths(publish_assets(records))
+        records = {category: catalog.entries(category) for category in categories}
+    return records
+
+def create_asset_manifest(ndjson=False, publish=False, catalog=None, records=None, placeholders=True):
+    """Create a JSON manifest of all assets for the game
+
+    assets/manifest.json is a compact index pointing at one file per
+    category under assets/manifest/, so the game only fetches what it
+    needs. With ndjson, assets/manifest.ndjson holds every entry one per
+    line for incremental parsing. With publish, every asset also gets a
+    content-hashed copy under assets/hashed/ and its entry records it as
+    hashed_path, so hosts can serve those with immutable caching.
+    
+    Entries come from the asset catalog (one indexed query per category)
+    rather than from walking assets/, or from records (category -> rows,
+    as catalog_records returns them, already published) when the caller
+    has loaded them. Without placeholders, entries get no blurred
+    preview and no image is decoded.
+    """
+    if catalog is None and records is None:
+        with open_catalog(CATEGORIES) as catalog:
+            return create_asset_manifest(ndjson, publish, catalog, placeholders=placeholders)
+    
+    print("\n📝 Creating asset manifest...")
+    
     import datetime
-    from pathlib import Path
-    
-    # Scan assets folder
-    for category in ['characters', 'stones', 'enemies']:
-        folder_path = Path(f'assets/{category}')
-        if folder_path.exists():
-            for ext in IMAGE_EXTENSIONS:
-                for file in folder_path.glob(f'*{ext}'):
-                    file_info = {
-                        'name': file.stem,
-                        'filename': file.name,
-                        'path': str(file).replace('\\', '/'),
-                        'size': file.stat().st_size,
-                        'category': category
-                    }
-                    manifest[category].append(file_info)
-    
-    manifest['last_updated'] = datetime.datetime.now().isoformat()
-    
-    # Save manifest
-    with open('assets/manifest.json', 'w') as f:
-        json.dump(manifest, f, indent=2)
-    
-    print(f"  ✅ Manifest created: assets/manifest.json")
-    print(f"     - Characters: {len(manifest['characters'])}")
-    print(f"     - Stones: {len(manifest['stones'])}")
-    print(f"     - Enemies: {len(manifest['enemies'])}")
     
+    with run_report.phase('manifest'):
+        if records is None:
+            records = catalog_records(catalog, CATEGORIES, publish)
+        previews = manifest_placeholders(records, prune=True) if placeholders else {}
+        manifest = {category: manifest_entries(records[category], previews) for category in CATEGORIES
+                    if category != MISC_CATEGORY or records[category]}
+        
+        last_updated = datetime.datetime.now().isoformat()
+        
+        # Save manifest (root index + per-category files, written atomically)
+        write_manifest(manifest, last_updated, ndjson=ndjson, extra={'boot': BOOT_PLAN_PATH})
+        write_boot_plan(records)
+    run_report.count('manifest_entries', sum(len(entries) for entries in manifest.values()))
+    
+    print(f"  ✅ Manifest created: {MANIFEST_PATH} (+ {MANIFEST_DIR}/<category>.json)")
+    if ndjson:
+        print(f"     - Stream: {NDJSON_PATH}")
+    for category, entries in manifest.items():
+        print(f"     - {CATEGORIES[category]['title']}: {len(entries)}")
+    print_missing_densities(manifest)
+    
+    manifest['last_updated'] = last_updated
     return manifest
 
+def update_asset_manifest(categories, publish=False, catalog=None, records=None, placeholders=True, ndjson=False):
+    """Rewrite only the manifest files of some categories
+
+    Falls back to a full create_asset_manifest (with ndjson) when there is
+    no manifest to patch yet; records works as for create_asset_manifest.
+    An NDJSON stream the manifest already has is always kept up to date.
+    """
+    if catalog is None and records is None:
+        with open_catalog(CATEGORIES) as catalog:
+            return update_asset_manifest(categories, publish, catalog, placeholders=placeholders, ndjson=ndjson)
+    
+    import datetime
+    
+    with run_report.phase('manifest'):
+        if records is None:
+            records = catalog_records(catalog, categories, publish)
+        previews = {}
+        if placeholders:
+            previews = manifest_placeholders({category: records[category] for category in categories})
+        entries = {category: manifest_entries(records[category], previews) for category in categories}
+        patched = update_manifest(entries, datetime.datetime.now().isoformat())
+    
+    if patched is None:
+        if records.keys() < CATEGORIES.keys():
+            records = None
+        return create_asset_manifest(ndjson, publish, catalog, records, placeholders)
+    
+    for category in categories:
+        print(f"  📝 Manifest updated: {MANIFEST_DIR}/{category}.json ({len(entries[category])} entries)")
+    print_missing_densities(entries)
+    
+    # Budgets span all categories, so the tiers are redone from every row
+    with run_report.phase('manifest'):
+        write_boot_plan({category: records[category] if category in records else catalog.entries(category)
+                         for category in CATEGORIES})
+    return entries
+
+def watch(catalog, workers=DEFAULT_WORKERS, dedupe=DEFAULT_DEDUPE_POLICY, publish=False, optimize=False):
+    """Organize images as they are dropped into the root, until interrupted
+
+    Each debounced burst of new files is classified and moved by the same
+    rules as organize_images; then only the manifest files and gallery
+    sections of the categories they went to are rebuilt.
+    """
+    from asset_watcher import watch_batches
+    from gallery_generator import generate_html_gallery
+    
+    print()
+    generate_html_gallery(catalog=catalog)
+    try:
+        for batch in watch_batches('.', IMAGE_EXTENSIONS):
+            shown = ', '.join(batch[:5]) + (f" (+{len(batch) - 5} more)" if len(batch) > 5 else "")
+            print(f"\n📥 {len(batch)} new file(s): {shown}")
+            
+            affected = sorted({category for category in CLASSIFIER.classify_many(batch) if category})
+            if not affected:
+                print("  ⚠️  Not categorized - kept in root")
+                continue
+            
+            organize_images(workers=workers, dedupe=dedupe, catalog=catalog)
+            if optimize:
+                optimize_images(affected, catalog)
+            update_asset_manifest(affected, publish=publish, catalog=catalog)
+            generate_html_gallery(dirty=affected, catalog=catalog)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+
+def optimize_images(categories, catalog):
+    """Recompress PNGs and refresh the catalog rows of the files that shrank
+
+    Returns the categories whose files changed.
+    """
+    from png_optimizer import optimize_assets
+    
+    with run_report.phase('optimize'):
+        results = optimize_assets(categories)
+    shrunk = [path for path, before, after in results if after < before]
+    catalog.refresh(shrunk)
+    return {path.split('/')[1] for path in shrunk}
+
 def create_css_file():
     """Create basic CSS file"""
     css_content = """/* Infinity Gauntlet Game Styles */
@@ -168,8 +418,7 @@ def create_css_file():
 .stone-soul { color: var(--stone-soul); }
 """
     
-    with open('css/style.css', 'w') as f:
-        f.write(css_content)
+    write_if_changed('css/style.css', css_content)
     
     print("  ✅ CSS file created: css/style.css")
 
@@ -193,12 +442,10 @@ exclude:
   - venv/
 """
     
-    with open('_config.yml', 'w') as f:
-        f.write(config)
+    write_if_changed('_config.yml', config)
     
     # Create .nojekyll file to disable Jekyll processing
-    with open('.nojekyll', 'w') as f:
-        f.write('')
+    write_if_changed('.nojekyll', '')
     
     print("  ✅ GitHub Pages configuration created")
 
@@ -216,3 +463,84 @@ A Marvel-themed adaptation of the Love Letter card game featuring Thanos and the
 - Strategic gameplay
 
 ## 📁 Project Structure
+
+```
+index.html          # Game entry point
+styles.css          # Game styles
+js/                 # Game logic (cards, game, ui)
+assets/
+├── characters/     # Thanos & Black Order
+├── stones/         # Infinity Stones
+├── enemies/        # Outriders
+└── manifest.json   # Generated asset list
+```
+
+## 🛠️ Asset Tools
+
+1. Drop new images in the project root
+2. Run `python organizer.py` to sort them into `assets/`
+3. Run `python gallery_generator.py` to rebuild `gallery.html`
+"""
+    
+    with open('README.md', 'w', encoding='utf-8') as f:
+        f.write(readme_content)
+    
+    print("  ✅ README created: README.md")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Organize images into the assets/ folders")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"concurrent file moves (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--dedupe', choices=DEDUPE_POLICIES, default=DEFAULT_DEDUPE_POLICY,
+                        help="what to do with files whose bytes are already in assets/")
+    parser.add_argument('--recursive', action='store_true',
+                        help="also take images from folders below this one (e.g. drop/2026-10/heroes/)")
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                        help="only take images whose relative path matches GLOB (repeatable)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help="skip images and folders whose relative path matches GLOB (repeatable)")
+    parser.add_argument('--ndjson', action='store_true',
+                        help="also write assets/manifest.ndjson with one entry per line")
+    parser.add_argument('--publish', action='store_true',
+                        help="write content-hashed copies under assets/hashed/ and record them in the manifest")
+    parser.add_argument('--optimize', action='store_true',
+                        help="losslessly recompress the organized PNG files")
+    parser.add_argument('--compress', action='store_true',
+                        help="write .gz (and .br) siblings of the manifest, CSS, JS and HTML files")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and organize images as they are dropped into this folder")
+    parser.add_argument('--rescan', action='store_true',
+                        help="re-read assets/ into the catalog (after editing it by hand)")
+    run_report.add_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    print("🎮 INFINITY GAUNTLET ORGANIZER")
+    print("=" * 50)
+    
+    create_folder_structure()
+    with run_report.instrumented(args, 'organizer'), open_catalog(CATEGORIES, rescan=args.rescan) as catalog:
+        stats = organize_images(workers=args.workers, dedupe=args.dedupe, catalog=catalog,
+                                recursive=args.recursive, include=args.include, exclude=args.exclude)
+        if args.optimize:
+            optimize_images(list(CATEGORIES), catalog)
+        create_asset_manifest(ndjson=args.ndjson, publish=args.publish, catalog=catalog)
+        
+        print("\n🛠️  Creating project files...")
+        with run_report.phase('write'):
+            create_css_file()
+            create_github_pages_config()
+        if args.compress:
+            from precompress import compress_outputs
+            compress_outputs(workers=args.workers)
+        
+        print("\n" + "=" * 50)
+        print("✅ ORGANIZATION COMPLETE")
+        for category, count in stats.items():
+            print(f"  {category:12} {count} file(s)")
+        
+        if args.watch:
+            watch(catalog, workers=args.workers, dedupe=args.dedupe, publish=args.publish,
+                  optimize=args.optimize)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# placeholders.py
+import io
+import os
+import time
+import base64
+import importlib.util
+
+import run_report
+from build_cache import load_cache, save_cache
+
+# content sha256 -> {color, lqip}, or null for content that failed to decode
+PLACEHOLDER_CACHE = '.placeholder-cache.json'
+
+# Longest edge of the inlined preview, in pixels (a few hundred bytes as PNG)
+LQIP_SIZE = 16
+
+# Bits kept per channel when finding the dominant color
+COLOR_BITS = 4
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+def placeholders_available():
+    """Whether Pillow is installed to decode images (NumPy is used when present too)"""
+    return importlib.util.find_spec('PIL') is not None
+
+def _block_mean(pixels, fy, fx):
+    """Average fy x fx blocks of an (h, w, 4) premultiplied array"""
+    h, w = pixels.shape[0] // fy * fy, pixels.shape[1] // fx * fx
+    blocks = pixels[:h, :w].reshape(h // fy, fy, w // fx, fx, 4)
+    return blocks.mean(axis=(1, 3))
+
+def _numpy_placeholder(im, np):
+    """(color, preview RGBA bytes, preview size) with NumPy block averaging
+
+    Colors are averaged premultiplied by alpha so transparent edges do not
+    darken the preview. The dominant color is the alpha-weighted mean of
+    the most common COLOR_BITS-per-channel bucket of the preview grid.
+    """
+    pixels = np.asarray(im, dtype=np.float32)
+    alpha = pixels[..., 3:] / 255.0
+    pixels = np.concatenate([pixels[..., :3] * alpha, pixels[..., 3:]], axis=2)
+
+    # Square blocks, but never taller or wider than the image itself
+    factor = max(1, -(-max(im.size) // LQIP_SIZE))
+    small = _block_mean(pixels, min(factor, im.height), min(factor, im.width))
+    weight = small[..., 3] / 255.0
+    rgb = np.where(weight[..., None] > 0, small[..., :3] / np.maximum(weight[..., None], 1e-6), 0.0)
+    rgb = np.clip(rgb, 0, 255)
+
+    shift = 8 - COLOR_BITS
+    buckets = rgb.astype(np.uint8) >> shift
+    index = (buckets[..., 0].astype(np.int32) << (2 * COLOR_BITS)) | \
+        (buckets[..., 1].astype(np.int32) << COLOR_BITS) | buckets[..., 2]
+    counts = np.bincount(index.ravel(), weights=weight.ravel(), minlength=1 << (3 * COLOR_BITS))
+    if counts.max() > 0:
+        mask = (index == counts.argmax()) * weight
+        color = (rgb * mask[..., None]).sum(axis=(0, 1)) / mask.sum()
+    else:
+        color = np.zeros(3)
+
+    preview = np.concatenate([rgb, small[..., 3:]], axis=2).round().astype(np.uint8)
+    return tuple(int(c) for c in color.round()), preview.tobytes(), (preview.shape[1], preview.shape[0])
+
+def _pillow_placeholder(im):
+    """(color, preview RGBA bytes, preview size) with Pillow box filtering only"""
+    from PIL import Image
+
+    scale = LQIP_SIZE / max(im.size)
+    size = (max(1, round(im.width * scale)), max(1, round(im.height * scale))) if scale < 1 else im.size
+    preview = im.resize(size, Image.BOX)
+    color = im.resize((1, 1), Image.BOX).getpixel((0, 0))[:3]
+    return color, preview.tobytes(), size
+
+def compute_placeholder(path):
+    """Dominant color and tiny preview of one image (runs in a worker)
+
+    Returns (path, {'color': '#rrggbb', 'lqip': PNG data URI}, seconds).
+    """
+    from PIL import Image
+
+    started = time.perf_counter()
+    with Image.open(path) as im:
+        im.draft('RGB', (LQIP_SIZE * 4, LQIP_SIZE * 4))
+        im = im.convert('RGBA')
+    if importlib.util.find_spec('numpy') is not None:
+        import numpy
+        color, data, size = _numpy_placeholder(im, numpy)
+    else:
+        color, data, size = _pillow_placeholder(im)
+
+    preview = Image.frombytes('RGBA', size, data)
+    if preview.getextrema()[3][0] == 255:
+        preview = preview.convert('RGB')
+    buffer = io.BytesIO()
+    preview.save(buffer, 'PNG', optimize=True)
+    placeholder = {
+        'color': '#{:02x}{:02x}{:02x}'.format(*color),
+        'lqip': 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+    }
+    return path, placeholder, time.perf_counter() - started
+
+def build_placeholders(images, workers=DEFAULT_WORKERS, prune=False):
+    """Placeholders for a set of images, computed only for content not seen before
+
+    images is a list of (path, sha256). Results are cached by content hash
+    in PLACEHOLDER_CACHE, so renamed files and repeated builds cost nothing;
+    new ones are computed on a process pool. Content that fails to decode
+    is cached as None and skipped until it changes. With prune, cache
+    entries of content that is no longer in images are dropped. Returns a
+    dict of path -> {'color', 'lqip'} (empty without Pillow).
+    """
+    if not placeholders_available():
+        return {}
+
+    cache = load_cache(PLACEHOLDER_CACHE)
+    result = {}
+    tasks = {}
+    for path, sha256 in images:
+        if sha256 not in cache:
+            tasks.setdefault(sha256, path)
+        elif cache[sha256]:
+            result[path] = cache[sha256]
+
+    if tasks:
+        print(f"   🌫️  Computing placeholders for {len(tasks)} image(s)...")
+        if workers > 1 and len(tasks) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [(sha256, pool.submit(compute_placeholder, path)) for sha256, path in tasks.items()]
+                for sha256, future in run_report.track(futures, len(futures), 'placeholders'):
+                    try:
+                        path, placeholder, seconds = future.result()
+                    except Exception as e:
+                        print(f"   ❌ {tasks[sha256]}: {e}")
+                        cache[sha256] = None
+                        continue
+                    cache[sha256] = placeholder
+                    run_report.file_time(path, seconds, 'placeholders')
+        else:
+            for sha256, path in run_report.track(list(tasks.items()), len(tasks), 'placeholders'):
+                try:
+                    _, placeholder, seconds = compute_placeholder(path)
+                except Exception as e:
+                    print(f"   ❌ {path}: {e}")
+                    cache[sha256] = None
+                    continue
+                cache[sha256] = placeholder
+                run_report.file_time(path, seconds, 'placeholders')
+        run_report.count('placeholders_computed', sum(1 for sha256 in tasks if cache.get(sha256)))
+
+        for path, sha256 in images:
+            if cache.get(sha256):
+                result[path] = cache[sha256]
+
+    if prune:
+        keep = {sha256 for _, sha256 in images}
+        stale = cache.keys() - keep
+        for sha256 in stale:
+            del cache[sha256]
+    else:
+        stale = ()
+    if tasks or stale:
+        save_cache(PLACEHOLDER_CACHE, cache)
+    return result
@@ -0,0 +1,479 @@
+# png_optimizer.py
+import os
+import time
+import zlib
+import shutil
+import struct
+import argparse
+import importlib.util
+from array import array
+from itertools import accumulate
+from concurrent.futures import ProcessPoolExecutor
+
+import run_report
+from asset_scanner import scan_categories
+from build_cache import load_cache, save_cache, fingerprint_entry, hash_file, atomic_write
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Ancillary chunks that change how the image looks, so they are kept
+KEEP_ANCILLARY = {b'tRNS', b'gAMA', b'cHRM', b'sRGB', b'iCCP', b'cICP', b'sBIT'}
+
+# Animated PNGs are left alone
+ANIMATION_CHUNKS = {b'acTL', b'fcTL', b'fdAT'}
+
+# Channels per PNG color type
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Input content hash -> [bytes before, bytes after, output content hash]
+OPTIMIZE_CACHE = '.png-optimize-cache.json'
+
+# Candidate streams that get a full-effort deflate after the fast trial ranking
+FINALISTS = 2
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+def read_chunks(data):
+    """Split PNG bytes into a list of (type, payload)"""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        chunks.append((kind, data[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+        if kind == b'IEND':
+            break
+    return chunks
+
+def write_png(chunks):
+    """Assemble PNG bytes from a list of (type, payload)"""
+    out = [PNG_SIGNATURE]
+    for kind, payload in chunks:
+        out.append(struct.pack('>I', len(payload)))
+        out.append(kind)
+        out.append(payload)
+        out.append(struct.pack('>I', zlib.crc32(kind + payload) & 0xffffffff))
+    return b''.join(out)
+
+def _numpy():
+    """NumPy if installed (filtering and palette work then run vectorized), else None"""
+    if importlib.util.find_spec('numpy') is None:
+        return None
+    import numpy
+    return numpy
+
+def _row_geometry(width, bit_depth, color_type):
+    """(bytes per pixel for filtering, bytes per scanline)"""
+    bits = CHANNELS[color_type] * bit_depth
+    return max(1, bits // 8), (width * bits + 7) // 8
+
+def _numpy_unfilter(raw, height, bpp, stride, np):
+    """unfilter with NumPy, one anti-diagonal of pixels at a time
+
+    A byte depends only on its left, upper and upper-left neighbours, so
+    all pixels with the same x + y can be rebuilt together, whatever the
+    filter of their rows.
+    """
+    rows = np.frombuffer(raw, np.uint8, height * (stride + 1)).reshape(height, stride + 1)
+    types = rows[:, 0]
+    if height and types.max() > 4:
+        raise ValueError(f"bad filter type {types.max()}")
+    width = stride // bpp
+    line = rows[:, 1:].reshape(height, width, bpp).astype(np.int16)
+    # One row and column of zeros above and left of the image
+    out = np.zeros((height + 1, width + 1, bpp), np.int16)
+    all_rows = np.arange(height)
+    for k in range(height + width - 1):
+        ys = all_rows[max(0, k - width + 1):min(height, k + 1)]
+        xs = k - ys
+        a, b, c = out[ys + 1, xs], out[ys, xs + 1], out[ys, xs]
+        p = a + b - c
+        pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+        paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+        ft = types[ys, None]
+        predicted = np.select([ft == 1, ft == 2, ft == 3, ft == 4], [a, b, (a + b) >> 1, paeth], 0)
+        out[ys + 1, xs + 1] = (line[ys, xs] + predicted) & 255
+    return out[1:, 1:].astype(np.uint8).tobytes()
+
+def unfilter(raw, height, bpp, stride):
+    """Undo PNG scanline filters; returns the bare pixel rows joined together"""
+    np = _numpy()
+    if np is not None:
+        return _numpy_unfilter(raw, height, bpp, stride, np)
+
+    out = bytearray(height * stride)
+    prev = bytes(stride)
+    pos = 0
+    for y in range(height):
+        ft = raw[pos]
+        line = raw[pos + 1:pos + 1 + stride]
+        pos += 1 + stride
+
+        if ft == 0:
+            cur = bytearray(line)
+        elif ft == 1:
+            cur = bytearray(stride)
+            for c in range(bpp):
+                cur[c::bpp] = bytes(accumulate(line[c::bpp], lambda a, b: (a + b) & 255))
+        elif ft == 2:
+            cur = bytearray((a + b) & 255 for a, b in zip(line, prev))
+        elif ft == 3:
+            cur = bytearray(line)
+            for i in range(stride):
+                left = cur[i - bpp] if i >= bpp else 0
+                cur[i] = (cur[i] + ((left + prev[i]) >> 1)) & 255
+        elif ft == 4:
+            cur = bytearray(line)
+            for i in range(stride):
+                if i >= bpp:
+                    a, c = cur[i - bpp], prev[i - bpp]
+                else:
+                    a = c = 0
+                b = prev[i]
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                if pa <= pb and pa <= pc:
+                    cur[i] = (cur[i] + a) & 255
+                elif pb <= pc:
+                    cur[i] = (cur[i] + b) & 255
+                else:
+                    cur[i] = (cur[i] + c) & 255
+        else:
+            raise ValueError(f"bad filter type {ft}")
+
+        out[y * stride:(y + 1) * stride] = cur
+        prev = cur
+    return out
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+def _filter_row(ft, row, prev, bpp):
+    """Apply one PNG filter type to a scanline"""
+    if ft == 0:
+        return bytes(row)
+    left = bytes(bpp) + row[:-bpp]
+    if ft == 1:
+        return bytes((x - l) & 255 for x, l in zip(row, left))
+    if ft == 2:
+        return bytes((x - u) & 255 for x, u in zip(row, prev))
+    if ft == 3:
+        return bytes((x - ((l + u) >> 1)) & 255 for x, l, u in zip(row, left, prev))
+    upleft = bytes(bpp) + prev[:-bpp]
+    return bytes((x - _paeth(l, u, ul)) & 255 for x, l, u, ul in zip(row, left, prev, upleft))
+
+def _cost(filtered):
+    """Minimum-sum-of-absolute-differences score of a filtered scanline"""
+    return sum(v if v < 128 else 256 - v for v in filtered)
+
+def _numpy_filter_candidates(pixels, height, bpp, stride, np):
+    """filter_candidates with NumPy: every filter of every row at once"""
+    rows = np.frombuffer(bytes(pixels), np.uint8).reshape(height, stride).astype(np.int16)
+    up = np.vstack([np.zeros((1, stride), np.int16), rows[:-1]])
+    left = np.hstack([np.zeros((height, bpp), np.int16), rows[:, :-bpp]])
+    upleft = np.hstack([np.zeros((height, bpp), np.int16), up[:, :-bpp]])
+    p = left + up - upleft
+    pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - upleft)
+    paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upleft))
+    predictions = (0, left, up, (left + up) >> 1, paeth)
+    filtered = np.stack([(rows - predicted) & 255 for predicted in predictions]).astype(np.uint8)
+
+    # The same score as _cost, per filter and row; ties go to the lower filter type
+    costs = np.minimum(filtered, 256 - filtered.astype(np.int32)).sum(axis=2)
+    best = costs.argmin(axis=0)
+    streams = [np.hstack([np.full((height, 1), ft, np.uint8), filtered[ft]]) for ft in range(5)]
+    adaptive = np.hstack([best.astype(np.uint8)[:, None], filtered[best, np.arange(height)]])
+    return [stream.tobytes() for stream in streams + [adaptive]]
+
+def filter_candidates(pixels, height, bpp, stride, palette=False):
+    """Filtered streams worth trying: each fixed filter and a per-row adaptive pick
+
+    Palette images only get filter None, which is what compresses them best.
+    Returns a list of filtered streams.
+    """
+    if palette:
+        return [b''.join(b'\0' + bytes(pixels[y * stride:(y + 1) * stride]) for y in range(height))]
+    np = _numpy()
+    if np is not None and height:
+        return _numpy_filter_candidates(pixels, height, bpp, stride, np)
+
+    streams = [bytearray() for _ in range(5)]
+    adaptive = bytearray()
+    prev = bytes(stride)
+    for y in range(height):
+        row = bytes(pixels[y * stride:(y + 1) * stride])
+        best = None
+        for ft in range(5):
+            filtered = _filter_row(ft, row, prev, bpp)
+            streams[ft] += bytes((ft,)) + filtered
+            score = _cost(filtered)
+            if best is None or score < best[0]:
+                best = (score, ft, filtered)
+        adaptive += bytes((best[1],)) + best[2]
+        prev = row
+    return streams + [adaptive]
+
+def deflate(data, strategy=zlib.Z_DEFAULT_STRATEGY, level=9):
+    """zlib-compress a filtered stream; level 9 uses the largest match window too"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9 if level == 9 else 8, strategy)
+    return compressor.compress(bytes(data)) + compressor.flush()
+
+def _drop_alpha(pixels, count):
+    """RGBA -> RGB when every pixel is opaque, else None"""
+    if pixels[3::4] != b'\xff' * count:
+        return None
+    rgb = bytearray(count * 3)
+    rgb[0::3] = pixels[0::4]
+    rgb[1::3] = pixels[1::4]
+    rgb[2::3] = pixels[2::4]
+    return rgb
+
+def _palette_depth(count):
+    return 1 if count <= 2 else 2 if count <= 4 else 4 if count <= 16 else 8
+
+def _numpy_palette(pixels, width, height, channels, np):
+    """_to_palette with NumPy, giving the same palette order and rows"""
+    px = np.frombuffer(bytes(pixels), np.uint8).reshape(height, width, channels).astype(np.uint32)
+    alpha = px[..., 3] if channels == 4 else np.uint32(255)
+    # Sorting by alpha, then RGB, puts translucent entries first as _to_palette does
+    keys = (alpha << 24) | (px[..., 0] << 16) | (px[..., 1] << 8) | px[..., 2]
+    entries, indices = np.unique(keys, return_inverse=True)
+    if len(entries) > 256:
+        return None
+    indices = indices.reshape(height, width).astype(np.uint8)
+
+    plte = np.stack([(entries >> shift) & 255 for shift in (16, 8, 0)], axis=1).astype(np.uint8).tobytes()
+    trns = ((entries >> 24) & 255).astype(np.uint8).tobytes().rstrip(b'\xff') if channels == 4 else b''
+
+    depth = _palette_depth(len(entries))
+    if depth == 8:
+        return depth, plte, trns, bytearray(indices.tobytes())
+    per_byte = 8 // depth
+    stride = (width * depth + 7) // 8
+    padded = np.zeros((height, stride * per_byte), np.uint8)
+    padded[:, :width] = indices
+    shifts = (8 - depth * (np.arange(per_byte) + 1)).astype(np.uint8)
+    packed = (padded.reshape(height, stride, per_byte) << shifts).sum(axis=2, dtype=np.uint8)
+    return depth, plte, trns, bytearray(packed.tobytes())
+
+def _to_palette(pixels, width, height, channels):
+    """8-bit RGB/RGBA -> (bit depth, PLTE, tRNS, packed index rows) if <= 256 colours"""
+    np = _numpy()
+    if np is not None:
+        return _numpy_palette(pixels, width, height, channels, np)
+
+    if channels == 4:
+        colors = array('I', bytes(pixels))
+        seen = set()
+        for start in range(0, len(colors), width):
+            seen.update(colors[start:start + width])
+            if len(seen) > 256:
+                return None
+        values = list(colors)
+        as_bytes = lambda value: struct.pack('=I', value)
+    else:
+        values = [bytes(pixels[i:i + 3]) for i in range(0, len(pixels), 3)]
+        seen = set()
+        for start in range(0, len(values), width):
+            seen.update(values[start:start + width])
+            if len(seen) > 256:
+                return None
+        as_bytes = lambda value: value
+
+    # Translucent entries first so tRNS can stop at the last one
+    entries = sorted(seen, key=lambda value: (as_bytes(value)[3] if channels == 4 else 255, as_bytes(value)))
+    index = {value: i for i, value in enumerate(entries)}
+    plte = b''.join(as_bytes(value)[:3] for value in entries)
+    trns = b''
+    if channels == 4:
+        alphas = bytes(as_bytes(value)[3] for value in entries)
+        trns = alphas.rstrip(b'\xff')
+
+    count = len(entries)
+    depth = _palette_depth(count)
+    per_byte = 8 // depth
+    stride = (width * depth + 7) // 8
+    rows = bytearray()
+    for y in range(height):
+        indices = [index[v] for v in values[y * width:(y + 1) * width]]
+        if depth == 8:
+            rows += bytes(indices)
+            continue
+        packed = bytearray(stride)
+        for x, value in enumerate(indices):
+            packed[x // per_byte] |= value << (8 - depth * (x % per_byte + 1))
+        rows += packed
+    return depth, plte, trns, rows
+
+def optimize_png(data, palette=True):
+    """Losslessly shrink PNG bytes; returns the original if nothing is gained
+
+    Drops ancillary chunks that do not affect rendering, tries fixed and
+    adaptive scanline filters, re-deflates at maximum effort and, for 8-bit
+    true-colour images, drops an all-opaque alpha channel and converts to a
+    palette when there are at most 256 colours.
+    """
+    chunks = read_chunks(data)
+    kinds = {kind for kind, _ in chunks}
+    if kinds & ANIMATION_CHUNKS or b'IHDR' not in kinds:
+        return data
+
+    ihdr = dict(chunks)[b'IHDR']
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', ihdr)
+    idat = b''.join(payload for kind, payload in chunks if kind == b'IDAT')
+    head = [(kind, payload) for kind, payload in chunks if kind == b'PLTE' or kind in KEEP_ANCILLARY]
+
+    raw = zlib.decompress(idat)
+    candidates = [(ihdr, head, raw)]
+
+    # Re-filtering needs the pixels; interlaced images keep their filters
+    if not interlace:
+        bpp, stride = _row_geometry(width, bit_depth, color_type)
+        pixels = unfilter(raw, height, bpp, stride)
+
+        for stream in filter_candidates(pixels, height, bpp, stride, color_type == 3):
+            candidates.append((ihdr, head, stream))
+
+        reduced = None
+        if bit_depth == 8 and color_type in (2, 6) and b'tRNS' not in kinds:
+            channels = CHANNELS[color_type]
+            if channels == 4:
+                rgb = _drop_alpha(pixels, width * height)
+                if rgb is not None:
+                    pixels, channels, color_type = rgb, 3, 2
+                    reduced = (2, 8, pixels, [])
+            if palette:
+                indexed = _to_palette(pixels, width, height, channels)
+                if indexed:
+                    depth, plte, trns, rows = indexed
+                    extra = [(b'PLTE', plte)] + ([(b'tRNS', trns)] if trns else [])
+                    reduced = (3, depth, rows, extra)
+
+        if reduced:
+            new_type, new_depth, rows, extra = reduced
+            new_ihdr = struct.pack('>IIBBBBB', width, height, new_depth, new_type, 0, 0, 0)
+            # sBIT is sized for the old colour type
+            new_head = [(k, p) for k, p in head if k not in (b'sBIT', b'PLTE', b'tRNS')] + extra
+            new_bpp, new_stride = _row_geometry(width, new_depth, new_type)
+            for stream in filter_candidates(rows, height, new_bpp, new_stride, new_type == 3):
+                candidates.append((new_ihdr, new_head, stream))
+
+    # A fast trial deflate ranks the candidates; only the best get full effort
+    candidates.sort(key=lambda c: len(deflate(c[2], level=1)))
+    best = data
+    for h, body, stream in candidates[:FINALISTS]:
+        # Unfiltered streams are palette indices or flat colour, not residuals
+        strategy = zlib.Z_FILTERED if any(stream[0::len(stream) // height]) else zlib.Z_DEFAULT_STRATEGY
+        png = write_png([(b'IHDR', h)] + body + [(b'IDAT', deflate(stream, strategy)), (b'IEND', b'')])
+        if len(png) < len(best):
+            best = png
+    return best
+
+def _optimize_file(path):
+    """Optimize one file in place (runs in a worker); returns (before, after, seconds)"""
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        data = f.read()
+    optimized = optimize_png(data)
+    if len(optimized) < len(data):
+        atomic_write(path, optimized)
+    return len(data), len(optimized), time.perf_counter() - started
+
+def _share_result(source, destination, linked):
+    """Give a duplicate the optimized bytes, keeping hard links linked"""
+    part_path = f'{destination}.{os.getpid()}.part'
+    if linked:
+        os.link(source, part_path)
+    else:
+        shutil.copy2(source, part_path)
+    os.replace(part_path, destination)
+
+def optimize_assets(categories, workers=DEFAULT_WORKERS, use_cache=True):
+    """Losslessly recompress every PNG in the given asset categories
+
+    Work is spread over a process pool, one task per distinct content hash,
+    so duplicates are only optimized once. The cache maps input hashes to
+    their result; files whose content is already an optimized output are
+    never processed again. Prints a per-file before/after report and
+    returns a list of (path, before, after); with a progress line, only
+    the totals are printed.
+    """
+    print("\n🗜️  Optimizing PNG files...")
+
+    cache = load_cache(OPTIMIZE_CACHE) if use_cache else {}
+    cached_files = cache.get('files', {})
+    cached_results = cache.get('results', {})
+    optimal = {output for _, _, output in cached_results.values()}
+
+    files = {}
+    groups = {}
+    for entries in scan_categories(categories, 'assets', ('.png',)).values():
+        for entry in entries:
+            record = fingerprint_entry(entry, cached_files.get(entry.path))
+            files[entry.path] = record
+            if record['sha256'] not in optimal:
+                groups.setdefault(record['sha256'], []).append(entry)
+
+    results = []
+    if groups:
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [(sha, entries, pool.submit(_optimize_file, entries[0].path))
+                       for sha, entries in groups.items()]
+            for sha, entries, future in run_report.track(futures, len(futures), 'optimize'):
+                first = entries[0]
+                try:
+                    before, after, seconds = future.result()
+                except Exception as e:
+                    print(f"  ❌ {first.path}: {e}")
+                    continue
+                run_report.file_time(first.path, seconds, 'optimize')
+
+                output = hash_file(first.path) if after < before else sha
+                cached_results[sha] = [before, after, output]
+                for entry in entries:
+                    if entry is not first and after < before:
+                        _share_result(first.path, entry.path, entry.inode() == first.inode())
+                    st = os.stat(entry.path)
+                    files[entry.path] = {'size': st.st_size, 'mtime': st.st_mtime_ns, 'sha256': output}
+                    results.append((entry.path, before, after))
+
+    if use_cache:
+        save_cache(OPTIMIZE_CACHE, {'files': files, 'results': cached_results})
+
+    total_before = total_after = 0
+    for path, before, after in sorted(results):
+        total_before += before
+        total_after += after
+        if not run_report.progress_enabled():
+            note = f"-{(before - after) / before:.1%}" if after < before else "already optimal"
+            print(f"  {path:40} {before:>11,} → {after:>11,} bytes  {note}")
+    run_report.count('files_optimized', len(results))
+    run_report.count('bytes_saved', total_before - total_after)
+
+    cached = len(files) - sum(len(entries) for entries in groups.values())
+    if results:
+        print(f"  ✅ Saved {(total_before - total_after) / 1024:.1f} KB over {len(results)} file(s)"
+              f" ({cached} already optimized)")
+    else:
+        print(f"  ✅ Nothing to do ({cached} file(s) already optimized)")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Losslessly recompress the organized PNG assets")
+    parser.add_argument('--categories', nargs='+', default=['characters', 'stones', 'enemies'],
+                        help="asset categories to optimize (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"worker processes (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--no-cache', action='store_true', help="re-check every file")
+    args = parser.parse_args(argv)
+
+    optimize_assets(args.categories, args.workers, use_cache=not args.no_cache)
+
+if __name__ == "__main__":
+    main()
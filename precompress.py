@@ -0,0 +1,184 @@
+# precompress.py
+import os
+import gzip
+import shutil
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import run_report
+from asset_scanner import scan_images, walk_images
+from build_cache import load_cache, save_cache, fingerprint_entry, atomic_write
+
+# path -> {size, mtime, sha256, and per variant whether it was written}
+COMPRESS_CACHE = '.compress-cache.json'
+
+# Text outputs and static files served to players: (folder, extensions, recursive)
+COMPRESS_TARGETS = (
+    ('.', ('.html', '.css', '.js'), False),
+    ('css', ('.css',), True),
+    ('js', ('.js',), True),
+    ('assets', ('.json', '.ndjson'), False),
+    ('assets/manifest', ('.json',), False),
+    ('assets/atlas', ('.json',), False),
+    ('gallery', ('.html', '.json'), True)
+)
+
+# Below this a response fits in a packet or two anyway
+MIN_SIZE = 1024
+
+# A variant is only kept when it is at most this fraction of the original
+MAX_RATIO = 0.95
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+def _gzip(data):
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def _brotli_encoder():
+    """Brotli compress function from the module or the CLI, or None
+
+    The module is imported here rather than at the top, so runs that do
+    not compress anything never load it.
+    """
+    try:
+        import brotli
+    except ImportError:  # Brotli is optional; the brotli command line tool is used instead when installed
+        pass
+    else:
+        return lambda data: brotli.compress(data, quality=11)
+    binary = shutil.which('brotli')
+    if binary:
+        return lambda data: subprocess.run([binary, '-c', '-q', '11'], input=data,
+                                           stdout=subprocess.PIPE, check=True).stdout
+    return None
+
+def available_encoders():
+    """Sibling extension -> compress function, for the encoders present here"""
+    encoders = {'.gz': _gzip}
+    encoder = _brotli_encoder()
+    if encoder:
+        encoders['.br'] = encoder
+    return encoders
+
+def find_targets(targets=COMPRESS_TARGETS):
+    """Scanned entries of every file that should get compressed siblings"""
+    entries = []
+    for folder, extensions, recursive in targets:
+        if recursive:
+            for batch in walk_images(folder, extensions):
+                entries.extend(batch)
+        else:
+            entries.extend(scan_images(folder, extensions))
+    return entries
+
+def compress_file(path, encoders):
+    """Write (or remove) the compressed siblings of one file
+
+    Each variant is written only when the file is at least MIN_SIZE and the
+    variant is at most MAX_RATIO of it; otherwise a stale sibling from an
+    earlier version is removed. Siblings get the source's mtime so servers
+    report the same Last-Modified for all of them. Returns
+    {extension: compressed size or None}.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    st = os.stat(path)
+    result = {}
+    for extension, encoder in encoders.items():
+        sibling = path + extension
+        compressed = encoder(data) if len(data) >= MIN_SIZE else None
+        if compressed is not None and len(compressed) <= len(data) * MAX_RATIO:
+            atomic_write(sibling, compressed)
+            os.utime(sibling, ns=(st.st_atime_ns, st.st_mtime_ns))
+            result[extension] = len(compressed)
+        else:
+            if os.path.exists(sibling):
+                os.remove(sibling)
+            result[extension] = None
+    return result
+
+def _up_to_date(path, record, previous, encoders):
+    """Whether the siblings on disk still match the cached result for this content"""
+    if not previous or previous.get('sha256') != record['sha256']:
+        return False
+    for extension in encoders:
+        if extension not in previous or previous[extension] != os.path.exists(path + extension):
+            return False
+    return True
+
+def compress_outputs(targets=COMPRESS_TARGETS, workers=DEFAULT_WORKERS, use_cache=True):
+    """Pre-compress the web outputs so hosts can serve .gz/.br bytes as they are
+
+    Files are compressed on a thread pool (zlib and brotli release the GIL)
+    and only when their content hash changed since the last run or their
+    siblings went missing. Siblings of files that no longer exist are
+    removed. Returns (compressed, unchanged) counts.
+    """
+    print("\n🗜️  Pre-compressing web outputs...")
+
+    encoders = available_encoders()
+    cache = load_cache(COMPRESS_CACHE) if use_cache else {}
+    files = {}
+    tasks = []
+    with run_report.phase('compress'):
+        for entry in find_targets(targets):
+            path = os.path.normpath(entry.path).replace('\\', '/')
+            record = fingerprint_entry(entry, cache.get(path))
+            files[path] = record
+            if _up_to_date(path, record, cache.get(path), encoders):
+                record.update({extension: cache[path][extension] for extension in encoders})
+            else:
+                tasks.append(path)
+
+        totals = {extension: [0, 0] for extension in encoders}
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [(path, pool.submit(compress_file, path, encoders)) for path in tasks]
+            for path, future in run_report.track(futures, len(futures), 'compress'):
+                try:
+                    sizes = future.result()
+                except Exception as e:
+                    print(f"  ❌ {path}: {e}")
+                    del files[path]
+                    continue
+                for extension, size in sizes.items():
+                    files[path][extension] = size is not None
+                    if size is not None:
+                        totals[extension][0] += files[path]['size']
+                        totals[extension][1] += size
+
+        # Siblings of outputs that are gone
+        for path in cache.keys() - files.keys():
+            for extension in ('.gz', '.br'):
+                if os.path.exists(path + extension):
+                    os.remove(path + extension)
+
+    if use_cache:
+        save_cache(COMPRESS_CACHE, files)
+
+    run_report.count('files_compressed', len(tasks))
+    unchanged = len(files) - len(tasks)
+    if not tasks:
+        print(f"  ✅ Nothing to do ({unchanged} file(s) unchanged)")
+    for extension, (before, after) in totals.items():
+        if before:
+            print(f"  ✅ {extension}: {before / 1024:.1f} KB → {after / 1024:.1f} KB"
+                  f" ({1 - after / before:.0%} smaller)")
+    if tasks:
+        print(f"     {len(tasks)} changed file(s) processed, {unchanged} unchanged")
+    if tasks and '.br' not in encoders:
+        print("  ℹ️  No Brotli encoder (pip install brotli, or the brotli CLI) - .gz only")
+    return len(tasks), unchanged
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings of the generated and static web files")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"files compressed at once (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--no-cache', action='store_true', help="recompress every file")
+    args = parser.parse_args(argv)
+
+    compress_outputs(workers=args.workers, use_cache=not args.no_cache)
+
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,82 @@
 import os
-import shutil
 import re
+import argparse
 
-# More specific mapping
-CATEGORIES = {
-    'characters': {
-        'keywords': ['thanos', 'proxima', 'ebony', 'corvus', 'black-dwarf'],
-        'description': 'Thanos and Black Order members'
-    },
-    'stones': {
-        'keywords': ['power', 'time', 'mind', 'reality', 'space', 'soul'],
-        'description': 'Infinity Stones'
-    },
-    'enemies': {
-        'keywords': ['outriders'],
-        'description': 'Enemy units'
-    }
-}
+from asset_scanner import scan_images, walk_images, glob_matcher
+from asset_categories import CATEGORIES, MISC_CATEGORY
+from asset_catalog import open_catalog
+from asset_classifier import KeywordClassifier
+from asset_naming import NameIndex
+from asset_relocator import DEFAULT_WORKERS, relocate, failed_sources, print_relocation_report
+from asset_dedupe import DEDUPE_POLICIES, DEFAULT_DEDUPE_POLICY, DuplicateFinder, link_duplicates, print_dedupe_report
+
+# Compiled once from CATEGORIES; unmatched files go to misc
+CLASSIFIER = KeywordClassifier(CATEGORIES, default=MISC_CATEGORY)
+
+# Folders a recursive run never takes images from
+OUTPUT_DIRS = ('assets', 'gallery', 'js', 'css')
 
 def get_category(filename):
     """Determine which category a file belongs to"""
-    filename_lower = filename.lower()
-    
-    for category, data in CATEGORIES.items():
-        for keyword in data['keywords']:
-            if keyword in filename_lower:
-                return category
-    
-    return 'misc'
+    return CLASSIFIER.classify(filename)
+
+def scan_drops(recursive=False, include=(), exclude=()):
+    """Batches of image files to organize (nested folders too when recursive)"""
+    if recursive:
+        return walk_images('.', include=include, exclude=exclude, skip=OUTPUT_DIRS)
+    included = glob_matcher(include)
+    excluded = glob_matcher(exclude)
+    return [[entry for entry in scan_images('.')
+             if (not included or included(entry.name)) and not (excluded and excluded(entry.name))]]
 
-def organize_assets():
+def organize_assets(workers=DEFAULT_WORKERS, dedupe=DEFAULT_DEDUPE_POLICY, recursive=False, include=(), exclude=()):
     # Create all folders
     for category in CATEGORIES.keys():
         os.makedirs(f'assets/{category}', exist_ok=True)
-    os.makedirs('assets/misc', exist_ok=True)
     
-    # Get all image files
-    image_files = [f for f in os.listdir('.') 
-                   if f.lower().endswith(('.png', '.jpg', '.jpeg', '.webp', '.gif'))]
+    # Get all image files, classified batch by batch as the folders are listed
+    entries, categories = CLASSIFIER.classify_entries(scan_drops(recursive, include, exclude))
     
-    moved_count = 0
+    names = NameIndex()
+    dupes = DuplicateFinder()
     
-    for image in image_files:
-        category = get_category(image)
-        destination = f'assets/{category}/{image}'
+    # Build the full move plan first
+    plan = []
+    links = []
+    duplicate_sizes = {}
+    for entry, category in zip(entries, categories):
+        image = entry.name
+        source = os.path.normpath(entry.path)
+        folder = f'assets/{category}'
+        size = entry.stat().st_size
         
-        # Handle duplicates
-        if os.path.exists(destination):
-            name, ext = os.path.splitext(image)
-            # Check if it has @1x, @3x notation
-            if '@' in name:
-                base_name = name.split('@')[0]
-                suffix = name.split('@')[1]
-                counter = 1
-                while os.path.exists(f'assets/{category}/{base_name}@{suffix}_{counter}{ext}'):
-                    counter += 1
-                destination = f'assets/{category}/{base_name}@{suffix}_{counter}{ext}'
-            else:
-                counter = 1
-                while os.path.exists(f'assets/{category}/{name}_{counter}{ext}'):
-                    counter += 1
-                destination = f'assets/{category}/{name}_{counter}{ext}'
+        # Same bytes already in the folder (or on their way there)?
+        if dedupe != 'keep-both':
+            original = dupes.find(folder, source, size)
+            if original is not None:
+                duplicate_sizes[source] = size
+                if dedupe == 'hardlink':
+                    links.append((source, names.claim(folder, image, density=True), original))
+                continue
         
-        shutil.move(image, destination)
-        print(f"📦 {image:30} → assets/{category}/")
-        moved_count += 1
+        # Handle duplicates (@1x/@3x names become base@suffix_N)
+        destination = names.claim(folder, image, density=True)
+        dupes.add(folder, destination, source, size)
+        plan.append((source, destination))
+    
+    result = relocate(plan, workers)
+    print_relocation_report(result, indent='')
+    moved_count = result['renamed'] + result['copied']
+    
+    _, link_failures = link_duplicates(links)
+    for source, _, _ in link_failures:
+        del duplicate_sizes[source]
+    print_dedupe_report(dedupe, len(duplicate_sizes), sum(duplicate_sizes.values()), link_failures, indent='')
+    
+    # Keep the asset catalog in step with what landed in assets/
+    with open_catalog(CATEGORIES) as catalog:
+        failed = failed_sources(result) | {source for source, _, _ in link_failures}
+        catalog.refresh([destination for source, destination, *_ in plan + links if source not in failed])
     
     # Create README in assets folder
     with open('assets/README.md', 'w') as f:
@@ -77,10 +89,24 @@ def organize_assets():
     return moved_count
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Organize Marvel assets into category folders")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"concurrent file moves (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--dedupe', choices=DEDUPE_POLICIES, default=DEFAULT_DEDUPE_POLICY,
+                        help="what to do with files whose bytes are already in assets/")
+    parser.add_argument('--recursive', action='store_true',
+                        help="also take images from folders below this one (e.g. drop/2026-10/heroes/)")
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                        help="only take images whose relative path matches GLOB (repeatable)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help="skip images and folders whose relative path matches GLOB (repeatable)")
+    args = parser.parse_args()
+    
     print("🔄 Organizing Marvel assets...")
     print("-" * 50)
     
-    count = organize_assets()
+    count = organize_assets(workers=args.workers, dedupe=args.dedupe, recursive=args.recursive,
+                            include=args.include, exclude=args.exclude)
     
     print("-" * 50)
     print(f"✅ Done! Moved {count} files.")
@@ -90,5 +116,6 @@ if __name__ == "__main__":
     ├── characters/   # Thanos & Black Order
     ├── stones/       # Infinity Stones
     ├── enemies/      # Outriders
+    ├── misc/         # Everything else
     └── README.md
     """)
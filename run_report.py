@@ -0,0 +1,225 @@
+# run_report.py
+import os
+import sys
+import json
+import time
+import heapq
+import cProfile
+import datetime
+from contextlib import contextmanager
+
+# Files listed under "slowest" in a report
+SLOWEST_FILES = 10
+
+# Seconds between progress line redraws
+PROGRESS_INTERVAL = 0.25
+
+def cpu_time():
+    """CPU seconds of this process plus its finished workers"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+def proc_syscalls():
+    """(read, write) syscall counters of this process from /proc (Linux), or None"""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return int(fields['syscr']), int(fields['syscw'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+class RunReport:
+    """Per-phase wall/CPU time, counters and the slowest files of one run
+
+    Phases nest: each records its inclusive time and its self time (minus
+    the phases and explicit add() calls made while it was open), so a
+    streaming "write" phase can report its own cost separately from the
+    "render" work done inside it. Syscalls are the read/write counters
+    from /proc where available; CPU time includes worker processes once
+    they have exited.
+    """
+
+    def __init__(self, command, slowest=SLOWEST_FILES, progress=False):
+        self.command = command
+        self.slowest_count = slowest
+        self.progress = progress
+        self.phases = {}
+        self.counters = {}
+        self._slowest = []
+        self._stack = []
+        self._started = time.perf_counter()
+        self._cpu_started = cpu_time()
+        self._syscalls_started = proc_syscalls()
+        self.started_at = datetime.datetime.now().isoformat()
+
+    def _record(self, name, wall, cpu, syscalls=None, child_wall=0.0, child_cpu=0.0):
+        phase = self.phases.setdefault(name, {'calls': 0, 'wall': 0.0, 'cpu': 0.0,
+                                              'self_wall': 0.0, 'self_cpu': 0.0})
+        phase['calls'] += 1
+        phase['wall'] += wall
+        phase['cpu'] += cpu
+        phase['self_wall'] += wall - child_wall
+        phase['self_cpu'] += cpu - child_cpu
+        if syscalls is not None:
+            phase['syscalls'] = phase.get('syscalls', 0) + syscalls
+        if self._stack:
+            self._stack[-1][0] += wall
+            self._stack[-1][1] += cpu
+
+    @contextmanager
+    def phase(self, name):
+        frame = [0.0, 0.0]
+        self._stack.append(frame)
+        before = proc_syscalls()
+        wall = time.perf_counter()
+        cpu = cpu_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = cpu_time() - cpu
+            after = proc_syscalls()
+            self._stack.pop()
+            syscalls = sum(after) - sum(before) if before and after else None
+            self._record(name, wall, cpu, syscalls, frame[0], frame[1])
+
+    def add(self, name, wall, cpu=0.0):
+        """Account time measured by the caller to a phase"""
+        self._record(name, wall, cpu)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def file_time(self, path, seconds, phase):
+        """Offer a per-file timing for the slowest-files list"""
+        item = (seconds, path, phase)
+        if len(self._slowest) < self.slowest_count:
+            heapq.heappush(self._slowest, item)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def to_dict(self):
+        syscalls = proc_syscalls()
+        total = {
+            'wall': time.perf_counter() - self._started,
+            'cpu': cpu_time() - self._cpu_started
+        }
+        if syscalls and self._syscalls_started:
+            total['syscalls'] = sum(syscalls) - sum(self._syscalls_started)
+        return {
+            'command': self.command,
+            'started_at': self.started_at,
+            'total': {key: round(value, 4) if isinstance(value, float) else value for key, value in total.items()},
+            'phases': {name: {key: round(value, 4) if isinstance(value, float) else value
+                              for key, value in phase.items()}
+                       for name, phase in self.phases.items()},
+            'counters': dict(self.counters),
+            'slowest_files': [{'path': path, 'phase': phase, 'seconds': round(seconds, 4)}
+                              for seconds, path, phase in sorted(self._slowest, reverse=True)]
+        }
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"📊 Run report written to {path}")
+
+    def print_summary(self):
+        data = self.to_dict()
+        print("\n" + "=" * 50)
+        print(f"📊 PROFILE: {self.command}")
+        print(f"  {'phase':14} {'calls':>6} {'wall':>9} {'self':>9} {'cpu':>9} {'r/w syscalls':>13}")
+        for name, phase in data['phases'].items():
+            syscalls = f"{phase['syscalls']:,}" if 'syscalls' in phase else '-'
+            print(f"  {name:14} {phase['calls']:>6} {phase['wall']:>8.3f}s {phase['self_wall']:>8.3f}s "
+                  f"{phase['cpu']:>8.3f}s {syscalls:>13}")
+        total = data['total']
+        syscalls = f"{total['syscalls']:,}" if 'syscalls' in total else '-'
+        print(f"  {'total':14} {'':>6} {total['wall']:>8.3f}s {'':>9} {total['cpu']:>8.3f}s {syscalls:>13}")
+        for name, value in data['counters'].items():
+            print(f"  {name:24} {value:>14,}")
+        if data['slowest_files']:
+            print("  Slowest files:")
+            for item in data['slowest_files']:
+                print(f"    {item['seconds'] * 1000:9.1f} ms  {item['phase']:10} {item['path']}")
+
+# The report of the running command, if one was asked for
+_active = None
+
+def active():
+    return _active
+
+@contextmanager
+def phase(name):
+    """Time a block as a phase of the active report (no-op without one)"""
+    if _active is None:
+        yield
+    else:
+        with _active.phase(name):
+            yield
+
+def count(name, amount=1):
+    if _active is not None:
+        _active.count(name, amount)
+
+def file_time(path, seconds, phase_name):
+    if _active is not None:
+        _active.file_time(path, seconds, phase_name)
+
+def progress_enabled():
+    return _active is not None and _active.progress
+
+def track(iterable, total, label):
+    """Yield from iterable, drawing a throttled progress/ETA line when enabled"""
+    if not progress_enabled() or not total:
+        yield from iterable
+        return
+
+    started = last = time.perf_counter()
+    done = 0
+    for item in iterable:
+        yield item
+        done += 1
+        now = time.perf_counter()
+        if now - last >= PROGRESS_INTERVAL or done == total:
+            last = now
+            remaining = (now - started) / done * (total - done)
+            sys.stderr.write(f"\r  ⏳ {label} {done:,}/{total:,} ({done / total:.0%})"
+                             f" ETA {int(remaining) // 60}:{int(remaining) % 60:02d}  ")
+            sys.stderr.flush()
+    sys.stderr.write("\n")
+
+def add_arguments(parser):
+    """The --profile/--report/--cprofile/--progress options shared by the scripts"""
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', action='store_true',
+                       help="print per-phase wall/CPU time, counts and the slowest files at the end")
+    group.add_argument('--report', metavar='PATH', help="write the run report as JSON to PATH")
+    group.add_argument('--cprofile', metavar='PATH',
+                       help="also dump cProfile stats to PATH (read with python -m pstats)")
+    group.add_argument('--progress', action='store_true',
+                       help="show a throttled progress/ETA line instead of per-file output")
+    group.add_argument('--slowest', type=int, default=SLOWEST_FILES, metavar='N',
+                       help=f"files listed as slowest in the report (default: {SLOWEST_FILES})")
+
+@contextmanager
+def instrumented(args, command):
+    """Record a run report (and a cProfile dump) around a block, as args ask"""
+    global _active
+    report = None
+    if args.profile or args.report or args.progress:
+        report = _active = RunReport(command, args.slowest, args.progress)
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield report
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+            print(f"🔬 cProfile stats written to {args.cprofile}")
+        _active = None
+        if report and args.profile:
+            report.print_summary()
+        if report and args.report:
+            report.write(args.report)
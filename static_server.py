@@ -0,0 +1,377 @@
+# static_server.py
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import datetime
+import mimetypes
+from collections import namedtuple
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import unquote, urlsplit
+
+import run_report
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+
+# Seconds an idle keep-alive connection stays open
+KEEPALIVE_TIMEOUT = 5
+
+# Largest request head (request line plus headers) accepted
+MAX_HEADER_BYTES = 64 * 1024
+
+# Pre-compressed siblings written by precompress.py, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Content-hashed copies never change, so clients may keep them for good
+IMMUTABLE_PREFIXES = ('/assets/hashed/',)
+
+# Only revalidated on every use (a cheap 304 while they are unchanged)
+DEFAULT_CACHE_CONTROL = 'no-cache'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+SERVER_NAME = 'cardsgame-static'
+
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('application/x-ndjson', '.ndjson')
+mimetypes.add_type('text/javascript', '.js')
+
+REASONS = {
+    200: 'OK', 206: 'Partial Content', 301: 'Moved Permanently', 304: 'Not Modified', 400: 'Bad Request',
+    404: 'Not Found', 405: 'Method Not Allowed', 416: 'Range Not Satisfiable',
+    431: 'Request Header Fields Too Large'
+}
+
+Request = namedtuple('Request', 'method target version headers')
+
+def parse_request(head):
+    """Request from the raw head (request line and headers, CRLF separated)"""
+    lines = head.decode('latin-1').split('\r\n')
+    method, target, version = lines[0].split(' ', 2)
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, _, value = line.partition(':')
+        name = name.strip().lower()
+        # Repeated headers fold into one comma-separated value
+        headers[name] = f"{headers[name]}, {value.strip()}" if name in headers else value.strip()
+    return Request(method, target, version, headers)
+
+def keep_alive(request):
+    connection = request.headers.get('connection', '').lower()
+    if request.version == 'HTTP/1.0':
+        return 'keep-alive' in connection
+    return 'close' not in connection
+
+def accepted_encodings(header):
+    """Content codings a client accepts (q > 0) from its Accept-Encoding header"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single 'bytes=' range, None to send it all, or 'unsatisfiable'
+
+    Multiple ranges and malformed headers get the whole file, as RFC 9110 allows.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, dash, last = spec.strip().partition('-')
+    if not dash:
+        return None
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                return 'unsatisfiable'
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        return 'unsatisfiable'
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+def entity_tag(st, coding=None):
+    """Strong ETag from size and mtime, distinct per content coding"""
+    tag = f'{st.st_mtime_ns:x}-{st.st_size:x}'
+    return f'"{tag}-{coding}"' if coding else f'"{tag}"'
+
+def not_modified(request, etag, mtime):
+    """Whether the client's cached copy is still current (If-None-Match wins over If-Modified-Since)"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+class StaticServer:
+    """Serves a folder over HTTP/1.1 the way a CDN in front of the site would
+
+    Bodies go out with sendfile where the platform has it. Responses carry
+    ETag and Last-Modified, and conditional requests get 304. Single byte
+    ranges get 206. Directories requested without a trailing slash get a
+    301 to it. Clients that accept br or gzip get the .br/.gz sibling
+    precompress.py wrote, as long as it is as new as the file. Connections
+    are kept alive until idle for KEEPALIVE_TIMEOUT. Each request is timed
+    from its last header byte to its last body byte, then printed (unless
+    quiet), appended to the NDJSON log and fed to the run report.
+    """
+
+    def __init__(self, root='.', log_path=None, quiet=False):
+        self.root = os.path.realpath(root)
+        self.quiet = quiet
+        self.log = open(log_path, 'a', encoding='utf-8') if log_path else None
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def close(self):
+        if self.log:
+            self.log.close()
+
+    def local_path(self, url_path):
+        """Filesystem path below root for a URL path, or None when it must not be served"""
+        parts = [part for part in unquote(url_path).split('/') if part]
+        # Dotfiles hold build caches and the catalog, not site content
+        if any(part.startswith('.') for part in parts):
+            return None
+        full = os.path.realpath(os.path.join(self.root, *parts))
+        if full != self.root and not full.startswith(self.root + os.sep):
+            return None
+        return full
+
+    def resolve(self, target):
+        """File to send for a request target, or None when there is none to serve"""
+        full = self.local_path(urlsplit(target).path)
+        if full and os.path.isdir(full):
+            full = os.path.join(full, 'index.html')
+        return full if full and os.path.isfile(full) else None
+
+    def redirect(self, target):
+        """Where to send a directory requested without its trailing slash, else None
+
+        Like the CDN, /gallery redirects to /gallery/ (query kept) so that
+        relative links in its index.html resolve inside the directory.
+        """
+        url = urlsplit(target)
+        if url.path.endswith('/'):
+            return None
+        full = self.local_path(url.path)
+        if not full or not os.path.isdir(full):
+            return None
+        return url.path + '/' + (f'?{url.query}' if url.query else '')
+
+    async def handle(self, reader, writer):
+        """Serve requests on one connection until it closes or goes idle"""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.send_error(writer, 431)
+                    break
+                started = time.perf_counter()
+                try:
+                    request = parse_request(head)
+                except ValueError:
+                    await self.send_error(writer, 400)
+                    break
+                keep = keep_alive(request) and request.method in ('GET', 'HEAD')
+                status, sent, coding = await self.respond(request, writer, keep)
+                self.record(request, status, sent, coding, time.perf_counter() - started)
+                if not keep:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def respond(self, request, writer, keep):
+        """Write one response; returns (status, body bytes sent, content coding)"""
+        if request.method not in ('GET', 'HEAD'):
+            await self.send_error(writer, 405, {'Allow': 'GET, HEAD'})
+            return 405, 0, None
+        location = self.redirect(request.target)
+        if location:
+            await self.send_error(writer, 301, {'Location': location}, keep)
+            return 301, 0, None
+        path = self.resolve(request.target)
+        if path is None:
+            await self.send_error(writer, 404, keep=keep)
+            return 404, 0, None
+
+        st = os.stat(path)
+        url_path = urlsplit(request.target).path
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/json':
+            content_type += '; charset=utf-8'
+
+        # A pre-compressed sibling, unless the client asked for a byte range
+        coding = None
+        variants = [(name, path + suffix) for name, suffix in ENCODINGS if os.path.exists(path + suffix)]
+        range_header = request.headers.get('range')
+        if variants and not range_header:
+            accepted = accepted_encodings(request.headers.get('accept-encoding', ''))
+            for name, sibling in variants:
+                sibling_st = os.stat(sibling)
+                if name in accepted and sibling_st.st_mtime_ns >= st.st_mtime_ns:
+                    coding, path, st = name, sibling, sibling_st
+                    break
+
+        etag = entity_tag(st, coding)
+        headers = {
+            'Content-Type': content_type,
+            'ETag': etag,
+            'Last-Modified': formatdate(st.st_mtime, usegmt=True),
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL if url_path.startswith(IMMUTABLE_PREFIXES)
+            else DEFAULT_CACHE_CONTROL,
+            'Accept-Ranges': 'bytes'
+        }
+        if variants:
+            headers['Vary'] = 'Accept-Encoding'
+        if coding:
+            headers['Content-Encoding'] = coding
+
+        if not_modified(request, etag, st.st_mtime):
+            await self.send_head(writer, 304, headers, keep)
+            return 304, 0, coding
+
+        status = 200
+        offset, length = 0, st.st_size
+        if range_header and request.headers.get('if-range', etag) in (etag, headers['Last-Modified']):
+            byte_range = parse_range(range_header, st.st_size)
+            if byte_range == 'unsatisfiable':
+                await self.send_error(writer, 416, {'Content-Range': f'bytes */{st.st_size}'}, keep)
+                return 416, 0, None
+            if byte_range:
+                status = 206
+                offset, length = byte_range[0], byte_range[1] - byte_range[0] + 1
+                headers['Content-Range'] = f'bytes {byte_range[0]}-{byte_range[1]}/{st.st_size}'
+
+        headers['Content-Length'] = str(length)
+        await self.send_head(writer, status, headers, keep)
+        if request.method == 'HEAD' or not length:
+            return status, 0, coding
+        with open(path, 'rb') as f:
+            # Falls back to read/write where os.sendfile is not available
+            sent = await asyncio.get_running_loop().sendfile(writer.transport, f, offset, length)
+        return status, sent, coding
+
+    async def send_head(self, writer, status, headers, keep=True):
+        lines = [f'HTTP/1.1 {status} {REASONS[status]}',
+                 f'Date: {formatdate(usegmt=True)}',
+                 f'Server: {SERVER_NAME}',
+                 f'Connection: {"keep-alive" if keep else "close"}']
+        if keep:
+            lines.append(f'Keep-Alive: timeout={KEEPALIVE_TIMEOUT}')
+        lines.extend(f'{name}: {value}' for name, value in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+
+    async def send_error(self, writer, status, headers=None, keep=False):
+        body = f'{status} {REASONS[status]}\n'.encode('utf-8')
+        headers = dict(headers or {}, **{'Content-Type': 'text/plain; charset=utf-8',
+                                         'Content-Length': str(len(body))})
+        await self.send_head(writer, status, headers, keep)
+        writer.write(body)
+        await writer.drain()
+
+    def record(self, request, status, sent, coding, seconds):
+        """Log one request's timing"""
+        self.requests += 1
+        self.bytes_sent += sent
+        target = urlsplit(request.target).path
+        run_report.count('requests')
+        run_report.count('bytes_sent', sent)
+        run_report.file_time(f'{request.method} {target}', seconds, str(status))
+        if not self.quiet:
+            via = f" {coding}" if coding else ""
+            print(f"  {status} {request.method} {target} {sent:,} B{via} {seconds * 1000:.1f} ms")
+        if self.log:
+            self.log.write(json.dumps({
+                'time': datetime.datetime.now().isoformat(),
+                'method': request.method,
+                'path': target,
+                'status': status,
+                'bytes': sent,
+                'encoding': coding,
+                'range': request.headers.get('range'),
+                'ms': round(seconds * 1000, 3)
+            }) + '\n')
+            self.log.flush()
+
+async def serve(root='.', host=DEFAULT_HOST, port=DEFAULT_PORT, log_path=None, quiet=False, ready=None):
+    """Serve root until cancelled; ready(host, port) is called once it listens"""
+    server = StaticServer(root, log_path, quiet)
+    listener = await asyncio.start_server(server.handle, host, port, limit=MAX_HEADER_BYTES)
+    address = listener.sockets[0].getsockname()
+    if ready:
+        ready(address[0], address[1])
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+        print(f"\n👋 Served {server.requests:,} request(s), {server.bytes_sent / 1024:.1f} KB")
+
+def run(root='.', host=DEFAULT_HOST, port=DEFAULT_PORT, log_path=None, quiet=False, page=''):
+    """Serve root in the foreground until interrupted"""
+    def ready(bound_host, bound_port):
+        print(f"🌐 Serving {os.path.abspath(root)} at http://{bound_host}:{bound_port}/{page}")
+        print("   Press Ctrl+C to stop")
+        sys.stdout.flush()
+
+    try:
+        asyncio.run(serve(root, host, port, log_path, quiet, ready))
+    except KeyboardInterrupt:
+        pass
+
+def add_arguments(parser):
+    """The --host/--port options shared with the scripts that can serve their output"""
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f"port to listen on, 0 for any free one (default: {DEFAULT_PORT})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the site locally like the CDN would: "
+                                                 "sendfile, ETag/304, byte ranges, .br/.gz siblings, keep-alive")
+    parser.add_argument('--root', default='.', help="folder to serve (default: the current one)")
+    add_arguments(parser)
+    parser.add_argument('--log', metavar='PATH', help="append one JSON line of timing per request to PATH")
+    parser.add_argument('--quiet', action='store_true', help="do not print a line per request")
+    run_report.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with run_report.instrumented(args, 'static_server'):
+        run(args.root, args.host, args.port, args.log, args.quiet)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# test_static_server.py
+import os
+import asyncio
+import tempfile
+import unittest
+
+from static_server import StaticServer
+
+class StaticServerTest(unittest.IsolatedAsyncioTestCase):
+    """Requests against a StaticServer on a free local port"""
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp.name, 'gallery'))
+        with open(os.path.join(self.tmp.name, 'gallery', 'index.html'), 'w') as f:
+            f.write('<a href="characters-1.html">Characters</a>\n')
+        self.server = StaticServer(self.tmp.name, quiet=True)
+        self.listener = await asyncio.start_server(self.server.handle, '127.0.0.1', 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.server.close()
+        self.tmp.cleanup()
+
+    async def get(self, target):
+        """(status, headers, body) of one GET on its own connection"""
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(f'GET {target} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode('latin-1'))
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+
+        head, _, body = response.partition(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return int(lines[0].split(' ')[1]), headers, body
+
+    async def test_directory_without_slash_redirects(self):
+        status, headers, _ = await self.get('/gallery')
+        self.assertEqual(status, 301)
+        self.assertEqual(headers['location'], '/gallery/')
+
+    async def test_redirect_keeps_query(self):
+        status, headers, _ = await self.get('/gallery?page=2')
+        self.assertEqual(status, 301)
+        self.assertEqual(headers['location'], '/gallery/?page=2')
+
+    async def test_directory_with_slash_serves_index(self):
+        status, headers, body = await self.get('/gallery/')
+        self.assertEqual(status, 200)
+        self.assertTrue(headers['content-type'].startswith('text/html'))
+        self.assertIn(b'characters-1.html', body)
+
+    async def test_missing_directory_is_not_redirected(self):
+        status, _, _ = await self.get('/nowhere')
+        self.assertEqual(status, 404)
+
+if __name__ == "__main__":
+    unittest.main()
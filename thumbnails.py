@@ -0,0 +1,173 @@
+# thumbnails.py
+import os
+import time
+import importlib.util
+
+import run_report
+from build_cache import load_cache, save_cache
+
+THUMB_DIR = 'assets/.thumbs'
+
+# content sha256 -> error, for sources that could not be rendered
+THUMB_FAILURES = '.thumbnail-failures.json'
+
+# Tile widths to generate (the gallery tiles are ~280-340px wide)
+THUMB_WIDTHS = (160, 320, 640)
+
+# Matches the .gallery grid: full width on phones, one column otherwise
+GALLERY_SIZES = '(max-width: 768px) 100vw, 340px'
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+def thumbnails_available():
+    """Whether Pillow is installed so derivatives can be generated
+
+    Pillow is optional (without it the gallery uses the originals) and slow
+    to import, so this only looks it up; it is imported when a derivative
+    actually has to be rendered.
+    """
+    return importlib.util.find_spec('PIL') is not None
+
+def fallback_format(path):
+    """Format for the non-WebP derivative: JPEG stays JPEG, the rest PNG"""
+    return 'jpg' if os.path.splitext(path)[1].lower() in ('.jpg', '.jpeg') else 'png'
+
+def plan_derivatives(path, sha256, width, thumb_dir=THUMB_DIR, widths=THUMB_WIDTHS):
+    """List the derivatives for one source image
+
+    Returns [(width, format, output path)]. Names are keyed on the source
+    content hash, so renamed or moved files reuse their thumbnails and
+    changed files get new ones. Sizes larger than the source are skipped.
+    """
+    fallback_ext = fallback_format(path)
+    derivatives = []
+    for target in widths:
+        if width and target >= width:
+            continue
+        stem = f'{thumb_dir}/{sha256[:16]}-{target}w'
+        derivatives.append((target, 'webp', f'{stem}.webp'))
+        derivatives.append((target, fallback_ext, f'{stem}.{fallback_ext}'))
+    return derivatives
+
+def _render_derivatives(task):
+    """Resize one source into all of its missing derivatives (runs in a worker)
+
+    Returns (path, derivatives rendered, seconds).
+    """
+    from PIL import Image
+
+    started = time.perf_counter()
+    path, derivatives = task
+    with Image.open(path) as im:
+        im.load()
+        if im.mode not in ('RGB', 'RGBA'):
+            im = im.convert('RGBA' if im.mode in ('LA', 'PA') or 'transparency' in im.info else 'RGB')
+        for target, fmt, output in derivatives:
+            height = max(1, round(im.height * target / im.width))
+            thumb = im.resize((target, height), Image.LANCZOS)
+            part_path = f'{output}.{os.getpid()}.part'
+            if fmt == 'webp':
+                thumb.save(part_path, 'WEBP', quality=WEBP_QUALITY, method=4)
+            elif fmt == 'jpg':
+                thumb.convert('RGB').save(part_path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+            else:
+                thumb.save(part_path, 'PNG', optimize=True)
+            os.replace(part_path, output)
+    return path, len(derivatives), time.perf_counter() - started
+
+def build_derivatives(images, workers=DEFAULT_WORKERS, thumb_dir=THUMB_DIR, widths=THUMB_WIDTHS, prune=False):
+    """Make sure thumbnails and WebP variants exist for a set of images
+
+    images is a list of (path, sha256, width). Only missing derivatives are
+    rendered, spread over a process pool. Content that fails to render is
+    recorded in THUMB_FAILURES and not tried again until it changes; with
+    prune, records of content no longer in images are dropped. Returns a
+    dict of path -> [(width, format, output path)] for every derivative
+    available.
+    """
+    if not thumbnails_available():
+        return {}
+
+    os.makedirs(thumb_dir, exist_ok=True)
+    existing = set(os.listdir(thumb_dir))
+    failures = load_cache(THUMB_FAILURES)
+    stale = failures.keys() - {sha256 for _, sha256, _ in images} if prune else set()
+    for sha256 in stale:
+        del failures[sha256]
+
+    available = {}
+    hashes = {}
+    tasks = []
+    for path, sha256, width in images:
+        if sha256 in failures:
+            available[path] = []
+            continue
+        hashes[path] = sha256
+        derivatives = plan_derivatives(path, sha256, width, thumb_dir, widths)
+        available[path] = derivatives
+        missing = [d for d in derivatives if os.path.basename(d[2]) not in existing]
+        if missing:
+            tasks.append((path, missing))
+
+    if not tasks:
+        if stale:
+            save_cache(THUMB_FAILURES, failures)
+        return available
+
+    print(f"   🖼️  Rendering derivatives for {len(tasks)} image(s)...")
+    failed = {}
+    if workers > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(task[0], pool.submit(_render_derivatives, task)) for task in tasks]
+            for path, future in run_report.track(futures, len(futures), 'thumbnails'):
+                try:
+                    _, rendered, seconds = future.result()
+                except Exception as e:
+                    print(f"   ❌ {path}: {e}")
+                    failed[path] = str(e)
+                    continue
+                run_report.file_time(path, seconds, 'thumbnails')
+                run_report.count('thumbnails_rendered', rendered)
+    else:
+        for task in run_report.track(tasks, len(tasks), 'thumbnails'):
+            try:
+                _, rendered, seconds = _render_derivatives(task)
+            except Exception as e:
+                print(f"   ❌ {task[0]}: {e}")
+                failed[task[0]] = str(e)
+                continue
+            run_report.file_time(task[0], seconds, 'thumbnails')
+            run_report.count('thumbnails_rendered', rendered)
+
+    for path, error in failed.items():
+        available[path] = []
+        failures[hashes[path]] = error
+    if failed or stale:
+        save_cache(THUMB_FAILURES, failures)
+    return available
+
+def prune_derivatives(available, thumb_dir=THUMB_DIR):
+    """Remove derivatives no longer referenced by any source image"""
+    keep = {os.path.basename(output) for derivatives in available.values() for _, _, output in derivatives}
+    removed = 0
+    try:
+        names = os.listdir(thumb_dir)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        if name not in keep and not name.endswith('.part'):
+            os.remove(os.path.join(thumb_dir, name))
+            removed += 1
+    return removed
+
+def srcset(derivatives, fmt, original=None, original_width=None, prefix=''):
+    """Build a srcset attribute value for one format of the derivatives"""
+    candidates = [f'{prefix}{output} {width}w' for width, f, output in derivatives if f == fmt]
+    if original and original_width:
+        candidates.append(f'{prefix}{original} {original_width}w')
+    return ', '.join(candidates)